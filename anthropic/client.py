@@ -9,6 +9,7 @@ import requests
 from datetime import datetime
 
 from config import DATA_DIR
+from memory.similar_travellers import load_similar_travellers, format_similar_travellers
 
 
 class AnthropicClient:
@@ -105,6 +106,9 @@ class AnthropicClient:
                         session_data["budget"] = line.split(':', 1)[1].strip()
                         break
 
+        # Load similar past travellers found at the end of the interview
+        session_data["similar_travellers"] = load_similar_travellers(session_dir)
+
         # Load metadata
         metadata_file = session_dir / "metadata.json"
         if metadata_file.exists():
@@ -124,6 +128,16 @@ class AnthropicClient:
         budget = session_data.get("budget", "Not specified")
         hotels_found = session_data.get("hotels_found", 0)
 
+        # Outcomes of similar past sessions give the analysis a head start
+        similar_section = ""
+        similar_travellers = format_similar_travellers(session_data.get("similar_travellers", []))
+        if similar_travellers:
+            similar_section = f"""
+SIMILAR PAST TRAVELLERS (nearest earlier interviews, with their top hotels and your earlier analysis):
+{similar_travellers}
+Use these as evidence of what people with this profile end up needing; don't re-derive what they already show.
+"""
+
         prompt = f"""You are an expert travel psychology analyst and hotel consultant. Read between the lines of this conversation and provide brutally honest analysis of what the customer ACTUALLY needs vs what they're saying.
 
 CUSTOMER CONVERSATION:
@@ -136,7 +150,7 @@ Customer's Stated Budget: {budget}
 Hotels Found: {hotels_found}
 
 {hotel_results}
-
+{similar_section}
 ANALYSIS TASK:
 1. Decode their real motivations and concerns
 2. Challenge their assumptions with evidence
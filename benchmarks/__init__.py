@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the hotel recommendation system.
+Run from the project root, e.g. `python -m benchmarks.vector_search`.
+"""
@@ -0,0 +1,94 @@
+"""
+Recall@k vs latency for the approximate index tiers against the flat baseline.
+
+Use the report to pick efSearch / nprobe operating points for
+VECTOR_CONFIG["index_tiers"].
+
+Usage:
+    python -m benchmarks.ann_recall --size 200000 --ef 16 --ef 64 --nprobe 8 --nprobe 32
+"""
+import time
+
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from config import VECTOR_CONFIG
+from vector.storage import build_index
+
+console = Console()
+
+
+def clustered_vectors(count: int, dimension: int, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """Normalized vectors drawn around random centroids, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((clusters, dimension)).astype('float32')
+    vectors = centroids[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dimension)).astype('float32')
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def measure(index, queries: np.ndarray, ground_truth: np.ndarray, top_k: int):
+    """Return (recall@k, mean latency in ms per query)."""
+    started = time.perf_counter()
+    for query in queries:
+        index.search(query.reshape(1, -1), top_k)
+    latency_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    _, found = index.search(queries, top_k)
+    hits = sum(len(set(found[i]) & set(ground_truth[i])) for i in range(len(queries)))
+    return hits / ground_truth.size, latency_ms
+
+
+@click.command()
+@click.option("--size", default=200_000, help="Number of stored vectors.")
+@click.option("--queries", default=200, help="Number of queries.")
+@click.option("--top-k", "-k", default=10, help="k for recall@k.")
+@click.option("--ef", multiple=True, type=int, default=[16, 32, 64, 128, 256], help="HNSW efSearch values.")
+@click.option("--nprobe", multiple=True, type=int, default=[4, 8, 16, 32, 64], help="IVF-PQ nprobe values.")
+@click.option("--nlist", default=None, type=int, help="Override ivf_nlist for small benchmark sizes.")
+def main(size, queries, top_k, ef, nprobe, nlist):
+    """Report recall@k and latency per tier and operating point."""
+    dimension = VECTOR_CONFIG["vector_dimension"]
+    if nlist:
+        VECTOR_CONFIG["index_tiers"]["ivf_nlist"] = nlist
+
+    vectors = clustered_vectors(size, dimension)
+    query_vectors = clustered_vectors(queries, dimension, seed=1)
+
+    table = Table(title=f"Recall@{top_k} vs latency ({size:,} vectors, d={dimension})")
+    table.add_column("Tier")
+    table.add_column("Parameter")
+    table.add_column(f"Recall@{top_k}", justify="right")
+    table.add_column("Latency (ms/query)", justify="right")
+    table.add_column("Build (s)", justify="right")
+
+    started = time.perf_counter()
+    flat = build_index("flat", dimension, vectors)
+    build_s = time.perf_counter() - started
+    _, ground_truth = flat.search(query_vectors, top_k)
+    recall, latency = measure(flat, query_vectors, ground_truth, top_k)
+    table.add_row("flat", "exact", f"{recall:.3f}", f"{latency:.3f}", f"{build_s:.1f}")
+
+    started = time.perf_counter()
+    hnsw = build_index("hnsw", dimension, vectors)
+    build_s = time.perf_counter() - started
+    for value in ef:
+        hnsw.hnsw.efSearch = value
+        recall, latency = measure(hnsw, query_vectors, ground_truth, top_k)
+        table.add_row("hnsw", f"efSearch={value}", f"{recall:.3f}", f"{latency:.3f}", f"{build_s:.1f}")
+
+    started = time.perf_counter()
+    ivfpq = build_index("ivfpq", dimension, vectors)
+    build_s = time.perf_counter() - started
+    for value in nprobe:
+        ivfpq.nprobe = value
+        recall, latency = measure(ivfpq, query_vectors, ground_truth, top_k)
+        table.add_row("ivfpq", f"nprobe={value}", f"{recall:.3f}", f"{latency:.3f}", f"{build_s:.1f}")
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark ConversationLogger event latency: inline appends (open, write and
+close per file per event) against the buffered background writer.
+
+log_llm_reasoning runs inside OllamaClient.generate, so its latency is paid
+on every LLM request. Sessions are written under data/sessions and removed
+afterwards.
+
+Usage:
+    python -m benchmarks.conversation_logger --events 500
+"""
+import shutil
+import time
+
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.finalize_embedding import SAMPLE_ANSWERS
+from config import CONVERSATION_LOG_CONFIG
+
+console = Console()
+
+SYSTEM_PROMPT = "You are evaluating hotel preference answers for usefulness in conversation context. " * 3
+USER_PROMPT = "Evaluate this answer in the context of the ongoing hotel preference conversation. " * 12
+
+
+def log_events(logger, events: int) -> dict:
+    """Log question/answer/reasoning events; return per-call latencies and the finalize time."""
+    reasoning, answers = [], []
+    for i in range(events):
+        answer = SAMPLE_ANSWERS[i % len(SAMPLE_ANSWERS)]
+        logger.log_question(f"question_{i}", f"Question {i}?")
+
+        started = time.perf_counter()
+        logger.log_user_response(f"question_{i}", answer)
+        answers.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        logger.log_llm_reasoning("coherence_check", SYSTEM_PROMPT, USER_PROMPT, f"COHERENT: {answer}",
+                                 context=f"Question {i}", decision="accepted")
+        reasoning.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    logger.finalize_session()
+    finalize_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "reasoning_p50_ms": float(np.percentile(reasoning, 50)),
+        "reasoning_p99_ms": float(np.percentile(reasoning, 99)),
+        "answer_p50_ms": float(np.percentile(answers, 50)),
+        "finalize_ms": finalize_ms,
+    }
+
+
+@click.command()
+@click.option("--events", "-n", default=500, help="Question/answer/reasoning events per mode.")
+def main(events):
+    """Compare inline and buffered logging latency."""
+    from conversation.logger import ConversationLogger
+
+    table = Table(title=f"ConversationLogger, {events} events")
+    table.add_column("Mode")
+    table.add_column("log_llm_reasoning p50 (ms)", justify="right")
+    table.add_column("p99 (ms)", justify="right")
+    table.add_column("log_user_response p50 (ms)", justify="right")
+    table.add_column("finalize_session (ms)", justify="right")
+
+    buffered_setting = CONVERSATION_LOG_CONFIG["buffered"]
+    try:
+        for mode, buffered in (("inline", False), ("buffered", True)):
+            CONVERSATION_LOG_CONFIG["buffered"] = buffered
+            logger = ConversationLogger(f"benchmark_logger_{mode}_{int(time.time())}")
+            try:
+                result = log_events(logger, events)
+            finally:
+                logger.close()
+                shutil.rmtree(logger.session_dir, ignore_errors=True)
+            table.add_row(mode, f"{result['reasoning_p50_ms']:.3f}", f"{result['reasoning_p99_ms']:.3f}",
+                          f"{result['answer_p50_ms']:.3f}", f"{result['finalize_ms']:.1f}")
+    finally:
+        CONVERSATION_LOG_CONFIG["buffered"] = buffered_setting
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
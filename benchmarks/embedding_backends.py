@@ -0,0 +1,129 @@
+"""
+Compare embedding backends: load time, memory, latency and agreement.
+
+Each backend runs in a fresh interpreter so its import cost and resident
+memory are measured in isolation. Agreement is the cosine similarity of each
+backend's embeddings with the sentence_transformers (PyTorch) ones, which
+must stay within VECTOR_CONFIG["onnx_cosine_tolerance"] for the backends to
+share an index.
+
+Usage:
+    python -m benchmarks.embedding_backends
+    python -m benchmarks.embedding_backends --backend onnx --backend sentence_transformers
+"""
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.finalize_embedding import SAMPLE_ANSWERS
+from config import PROJECT_ROOT, VECTOR_CONFIG
+
+console = Console()
+
+BACKENDS = ["sentence_transformers", "onnx"]
+
+
+def measure_backend(backend: str, texts: list, rounds: int, output: Path) -> dict:
+    """Load a backend and time it (runs inside the worker process); saves embeddings to output."""
+    from vector.embeddings import load_embedding_model
+
+    started = time.perf_counter()
+    model = load_embedding_model(backend)
+    model.encode(texts[:1], normalize_embeddings=True)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    single, batch = [], []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        model.encode(texts[0], normalize_embeddings=True)
+        single.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        embeddings = model.encode(texts, normalize_embeddings=True)
+        batch.append((time.perf_counter() - started) * 1000)
+
+    np.save(output, np.asarray(embeddings, dtype='float32'))
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+    return {
+        "load_ms": load_ms,
+        "single_ms": float(np.median(single)),
+        "batch_ms": float(np.median(batch)),
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+
+@click.command()
+@click.option("--backend", "backends", multiple=True, type=click.Choice(BACKENDS), default=BACKENDS,
+              help="Backends to compare (repeatable).")
+@click.option("--batch-size", default=32, help="Texts per batch call.")
+@click.option("--rounds", default=20, help="Timed rounds per backend.")
+@click.option("--worker", type=click.Choice(BACKENDS), default=None, hidden=True)
+@click.option("--output", type=click.Path(), default=None, hidden=True)
+def main(backends, batch_size, rounds, worker, output):
+    """Report load time, peak memory, latency and cosine agreement per backend."""
+    texts = (SAMPLE_ANSWERS * (batch_size // len(SAMPLE_ANSWERS) + 1))[:batch_size]
+
+    if worker:
+        print(json.dumps(measure_backend(worker, texts, rounds, Path(output))))
+        return
+
+    results, embeddings = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            output_file = Path(tmp) / f"{backend}.npy"
+            run = subprocess.run(
+                [sys.executable, "-m", "benchmarks.embedding_backends", "--worker", backend,
+                 "--output", str(output_file), "--batch-size", str(batch_size), "--rounds", str(rounds)],
+                cwd=PROJECT_ROOT, capture_output=True, text=True
+            )
+            if run.returncode != 0:
+                console.print(f"[red]{backend} failed:[/red] {run.stderr.strip().splitlines()[-1]}")
+                continue
+            results[backend] = json.loads(run.stdout.strip().splitlines()[-1])
+            embeddings[backend] = np.load(output_file)
+
+    reference = embeddings.get("sentence_transformers")
+    tolerance = VECTOR_CONFIG["onnx_cosine_tolerance"]
+
+    table = Table(title=f"Embedding backends ({VECTOR_CONFIG['embedding_model']}, batch {batch_size})")
+    table.add_column("Backend")
+    table.add_column("Load + first call (ms)", justify="right")
+    table.add_column("Peak RSS (MB)", justify="right")
+    table.add_column("Single text (ms)", justify="right")
+    table.add_column(f"Batch of {batch_size} (ms)", justify="right")
+    table.add_column("Min cosine vs PyTorch", justify="right")
+
+    for backend, result in results.items():
+        agreement = "-"
+        if reference is not None and backend != "sentence_transformers":
+            min_cosine = float(np.einsum('nd,nd->n', reference, embeddings[backend]).min())
+            style = "green" if min_cosine >= 1 - tolerance else "red"
+            agreement = f"[{style}]{min_cosine:.4f}[/{style}]"
+        table.add_row(
+            backend,
+            f"{result['load_ms']:.0f}",
+            f"{result['peak_rss_mb']:.0f}",
+            f"{result['single_ms']:.2f}",
+            f"{result['batch_ms']:.2f}",
+            agreement,
+        )
+
+    console.print(table)
+    console.print(f"[dim]Backends agree when min cosine >= {1 - tolerance:.3f} "
+                  f"(onnx_cosine_tolerance {tolerance})[/dim]")
+
+
+if __name__ == "__main__":
+    main()
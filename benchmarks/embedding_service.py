@@ -0,0 +1,95 @@
+"""
+Concurrent-session embedding throughput: in-process model against the
+embedding worker pool with micro-batching.
+
+Each simulated session embeds its interview answers from its own thread, as
+parallel interviews would in a server process.
+
+Usage:
+    python -m benchmarks.embedding_service --sessions 32 --workers 2
+"""
+import threading
+import time
+
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.finalize_embedding import SAMPLE_ANSWERS
+from config import VECTOR_CONFIG
+
+console = Console()
+
+
+def run_sessions(model, sessions: int, rounds: int) -> dict:
+    """Embed every session's answers concurrently; return latency percentiles and throughput."""
+    latencies = []
+    latencies_lock = threading.Lock()
+
+    def session(session_id: int):
+        for round_id in range(rounds):
+            texts = [f"{answer} (session {session_id}, round {round_id})" for answer in SAMPLE_ANSWERS]
+            started = time.perf_counter()
+            model.encode(texts, normalize_embeddings=True)
+            with latencies_lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "texts_per_second": sessions * rounds * len(SAMPLE_ANSWERS) / elapsed,
+    }
+
+
+@click.command()
+@click.option("--sessions", "-s", default=32, help="Concurrent sessions (threads).")
+@click.option("--rounds", "-r", default=5, help="Embedding calls per session.")
+@click.option("--workers", "-w", default=2, help="Worker processes for the pool.")
+@click.option("--batch-window-ms", default=VECTOR_CONFIG["embedding_service"]["batch_window_ms"],
+              help="Micro-batching window.")
+def main(sessions, rounds, workers, batch_window_ms):
+    """Compare concurrent embedding latency and throughput with and without the worker pool."""
+    from vector.embedding_service import EmbeddingService
+    from vector.embeddings import load_embedding_model
+
+    table = Table(title=f"{sessions} concurrent sessions x {rounds} calls x {len(SAMPLE_ANSWERS)} texts "
+                        f"({VECTOR_CONFIG['embedding_backend']})")
+    table.add_column("Mode")
+    table.add_column("p50 (ms/call)", justify="right")
+    table.add_column("p95 (ms/call)", justify="right")
+    table.add_column("Texts/s", justify="right")
+    table.add_column("Merged batches", justify="right")
+
+    model = load_embedding_model()
+    model.encode(SAMPLE_ANSWERS, normalize_embeddings=True)  # warm-up
+    result = run_sessions(model, sessions, rounds)
+    table.add_row("in-process", f"{result['p50_ms']:.1f}", f"{result['p95_ms']:.1f}",
+                  f"{result['texts_per_second']:.0f}", "-")
+
+    service = EmbeddingService(workers=workers, batch_window_ms=batch_window_ms)
+    try:
+        if not service.wait_ready(120):
+            raise click.ClickException("Embedding workers failed to start")
+        service.encode(SAMPLE_ANSWERS)  # warm-up
+        batches_before = service.stats["batches"]
+        result = run_sessions(service, sessions, rounds)
+        table.add_row(f"pool ({workers} workers, {batch_window_ms} ms window)", f"{result['p50_ms']:.1f}",
+                      f"{result['p95_ms']:.1f}", f"{result['texts_per_second']:.0f}",
+                      str(service.stats["batches"] - batches_before))
+    finally:
+        service.close()
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
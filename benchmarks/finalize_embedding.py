@@ -0,0 +1,117 @@
+"""
+Benchmark the interview finalize step: per-answer embedding and storage
+against one batched encode and one bulk store.
+
+The per-answer path is what process_preferences used to do (embed_text and
+store_vector per answer, plus the conversation vector); the batched path is
+embed_batch over all texts followed by a single VectorStore.store_batch.
+The embedding cache is turned off, so both paths time the model rather than
+cache lookups, and data/embedding_cache.db is left untouched.
+
+Usage:
+    python -m benchmarks.finalize_embedding --rounds 20
+    python -m benchmarks.finalize_embedding --store-only   # without loading the model
+"""
+import tempfile
+import time
+
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from config import VECTOR_CONFIG
+from vector.storage import VectorStore
+
+console = Console()
+
+SAMPLE_ANSWERS = [
+    "Lisbon, ideally in Alfama or somewhere walkable near the river",
+    "Five nights from the 12th of September, flexible by a day either side",
+    "Two adults and a seven year old, so a family room or two connecting rooms",
+    "Around 180 euros a night, could stretch a little for somewhere special",
+    "A pool would be great, breakfast included, and air conditioning is a must",
+    "Quiet and characterful rather than a big chain, with helpful staff",
+]
+
+
+def random_embeddings(count: int, dimension: int, rng: np.random.Generator) -> np.ndarray:
+    """Normalized random vectors standing in for model output."""
+    vectors = rng.standard_normal((count, dimension)).astype('float32')
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@click.command()
+@click.option("--rounds", "-r", default=20, help="Finalize rounds per path.")
+@click.option("--existing", default=10_000, help="Vectors already in the store.")
+@click.option("--store-only", is_flag=True, help="Skip the model and time storage with random vectors.")
+def main(rounds, existing, store_only):
+    """Compare per-answer and batched finalize timings."""
+    dimension = VECTOR_CONFIG["vector_dimension"]
+    texts = SAMPLE_ANSWERS + ["Hotel preference conversation:\n" + "\n".join(SAMPLE_ANSWERS)]
+    rng = np.random.default_rng(0)
+    # Every round embeds the same texts; with the cache on they would all be hits
+    VECTOR_CONFIG["embedding_cache"]["enabled"] = False
+
+    if store_only:
+        embed_one = lambda text: random_embeddings(1, dimension, rng)[0]
+        embed_many = lambda batch: random_embeddings(len(batch), dimension, rng)
+    else:
+        from vector.embeddings import embed_batch, embed_text, get_embedding_model
+        get_embedding_model()
+        embed_batch(texts)  # warm-up
+        embed_one, embed_many = embed_text, embed_batch
+
+    timings = {"per-answer": {"embed": [], "store": []}, "batched": {"embed": [], "store": []}}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VectorStore(db_path=tmp)
+        store.store_batch(random_embeddings(existing, dimension, rng))
+
+        for _ in range(rounds):
+            embed_ms = store_ms = 0.0
+            for text in texts:
+                started = time.perf_counter()
+                embedding = embed_one(text)
+                embed_ms += (time.perf_counter() - started) * 1000
+
+                started = time.perf_counter()
+                store.store(embedding, {"question_id": "benchmark"})
+                store_ms += (time.perf_counter() - started) * 1000
+            timings["per-answer"]["embed"].append(embed_ms)
+            timings["per-answer"]["store"].append(store_ms)
+
+            started = time.perf_counter()
+            embeddings = embed_many(texts)
+            timings["batched"]["embed"].append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            store.store_batch(embeddings, [{"question_id": "benchmark"}] * len(texts))
+            timings["batched"]["store"].append((time.perf_counter() - started) * 1000)
+
+        store.close()
+
+    table = Table(title=f"Finalize embedding ({len(texts)} texts, {rounds} rounds"
+                        f"{', random vectors' if store_only else ''})")
+    table.add_column("Path")
+    table.add_column("embed p50 (ms)", justify="right")
+    table.add_column("store p50 (ms)", justify="right")
+    table.add_column("total p50 (ms)", justify="right")
+    table.add_column("total p95 (ms)", justify="right")
+
+    for path, timing in timings.items():
+        totals = np.add(timing["embed"], timing["store"])
+        table.add_row(
+            path,
+            f"{np.percentile(timing['embed'], 50):.2f}",
+            f"{np.percentile(timing['store'], 50):.2f}",
+            f"{np.percentile(totals, 50):.2f}",
+            f"{np.percentile(totals, 95):.2f}",
+        )
+
+    console.print(table)
+    console.print(f"[dim]dimension={dimension}, existing vectors={existing:,}, "
+                  f"wal_fsync={VECTOR_CONFIG['wal_fsync']}, embedding cache off[/dim]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Import-time budget for CLI startup.
+
+Runs `python -X importtime main.py <args>` in fresh interpreters and fails
+(exit status 1) when the median wall time exceeds the budget or when a heavy
+dependency is imported at all. Heavy modules must be imported lazily, at
+first use.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --args "--version" --budget-ms 300
+"""
+import shlex
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from config import PROJECT_ROOT
+
+console = Console()
+
+HEAVY_MODULES = ["sentence_transformers", "torch", "transformers", "faiss", "onnxruntime"]
+
+
+def run_once(args: list) -> tuple:
+    """Run main.py once; return (wall ms, {outermost imported module: cumulative µs}, all module names)."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(Path(PROJECT_ROOT) / "main.py"), *args],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    imports, loaded = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.replace("import time:", "", 1).split("|")
+        module = name.strip()
+        loaded.add(module.split(".")[0])
+        # Nested imports are indented under their importer; keep the outermost ones
+        if name[1:] == module:
+            imports[module] = imports.get(module, 0) + int(cumulative_us)
+    return wall_ms, imports, loaded
+
+
+@click.command()
+@click.option("--args", "cli_args", default="--help", help="Arguments passed to main.py.")
+@click.option("--runs", default=5, help="Fresh interpreter runs.")
+@click.option("--budget-ms", default=500.0, help="Maximum median wall time.")
+@click.option("--top", default=10, help="Slowest top-level imports to list.")
+def main(cli_args, runs, budget_ms, top):
+    """Check CLI startup against the import-time budget."""
+    args = shlex.split(cli_args)
+    timings, imports, loaded = [], {}, set()
+    for _ in range(runs):
+        wall_ms, imports, loaded = run_once(args)
+        timings.append(wall_ms)
+
+    table = Table(title=f"Slowest imports for `main.py {cli_args}`")
+    table.add_column("Module")
+    table.add_column("Cumulative (ms)", justify="right")
+    for module, cumulative_us in sorted(imports.items(), key=lambda item: -item[1])[:top]:
+        table.add_row(module, f"{cumulative_us / 1000:.1f}")
+    console.print(table)
+
+    median_ms = float(np.median(timings))
+    heavy = [module for module in HEAVY_MODULES if module in loaded]
+    console.print(f"Median wall time: {median_ms:.0f} ms (budget {budget_ms:.0f} ms, {runs} runs)")
+
+    failed = False
+    if heavy:
+        console.print(f"[bold red]Heavy modules imported at startup: {', '.join(heavy)}[/bold red]")
+        failed = True
+    if median_ms > budget_ms:
+        console.print(f"[bold red]Over budget by {median_ms - budget_ms:.0f} ms[/bold red]")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    console.print("[green]Within budget.[/green]")
+
+
+if __name__ == "__main__":
+    main()
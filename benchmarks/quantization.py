@@ -0,0 +1,89 @@
+"""
+Recall and size of scalar-quantized indexes against the float32 baseline.
+
+Reports index bytes per vector, recall@k with and without full-precision
+re-ranking, and search latency, to choose VECTOR_CONFIG["quantization"].
+
+Usage:
+    python -m benchmarks.quantization --size 200000 --rerank-factor 4
+"""
+import time
+
+import click
+import faiss
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.ann_recall import clustered_vectors
+from config import VECTOR_CONFIG
+from vector.storage import build_index
+
+console = Console()
+
+
+def search(index, queries: np.ndarray, top_k: int, full: np.ndarray = None, rerank_factor: int = 1):
+    """Return (positions, mean latency in ms per query), optionally re-ranking at full precision."""
+    fetch_k = top_k * rerank_factor if full is not None else top_k
+    started = time.perf_counter()
+    found = []
+    for query in queries:
+        query = query.reshape(1, -1)
+        _, indices = index.search(query, fetch_k)
+        if full is not None:
+            candidates = indices[0][indices[0] != -1]
+            exact = full[candidates] @ query[0]
+            indices = candidates[np.argsort(-exact, kind='stable')[:top_k]].reshape(1, -1)
+        found.append(indices[0][:top_k])
+    latency_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    return found, latency_ms
+
+
+@click.command()
+@click.option("--size", default=200_000, help="Number of stored vectors.")
+@click.option("--queries", default=200, help="Number of queries.")
+@click.option("--top-k", "-k", default=10, help="k for recall@k.")
+@click.option("--rerank-factor", default=VECTOR_CONFIG["rerank_factor"], help="Candidates per result to re-rank.")
+@click.option("--tier", type=click.Choice(["flat", "hnsw"]), default="flat", help="Index tier to quantize.")
+def main(size, queries, top_k, rerank_factor, tier):
+    """Report size and recall for float32, fp16 and int8 encodings."""
+    dimension = VECTOR_CONFIG["vector_dimension"]
+    vectors = clustered_vectors(size, dimension)
+    query_vectors = clustered_vectors(queries, dimension, seed=1)
+    _, ground_truth = build_index("flat", dimension, vectors).search(query_vectors, top_k)
+
+    table = Table(title=f"Scalar quantization, {tier} tier ({size:,} vectors, d={dimension})")
+    table.add_column("Encoding")
+    table.add_column("Index (MB)", justify="right")
+    table.add_column("Bytes/vector", justify="right")
+    table.add_column(f"Recall@{top_k}", justify="right")
+    table.add_column(f"Recall@{top_k} re-ranked", justify="right")
+    table.add_column("Latency (ms/query)", justify="right")
+    table.add_column("Re-ranked latency (ms/query)", justify="right")
+
+    for quantization in [None, "fp16", "int8"]:
+        index = build_index(tier, dimension, vectors, quantization)
+        index_bytes = len(faiss.serialize_index(index))
+
+        found, latency = search(index, query_vectors, top_k)
+        reranked, rerank_latency = search(index, query_vectors, top_k, vectors, rerank_factor)
+        recall = sum(len(set(f) & set(g)) for f, g in zip(found, ground_truth)) / ground_truth.size
+        rerank_recall = sum(len(set(f) & set(g)) for f, g in zip(reranked, ground_truth)) / ground_truth.size
+
+        table.add_row(
+            quantization or "float32",
+            f"{index_bytes / 1e6:.1f}",
+            f"{index_bytes / size:.0f}",
+            f"{recall:.3f}",
+            f"{rerank_recall:.3f}",
+            f"{latency:.3f}",
+            f"{rerank_latency:.3f}",
+        )
+
+    console.print(table)
+    console.print(f"[dim]Re-ranking reads {rerank_factor}x top_k float32 rows "
+                  f"({4 * dimension} bytes each) from vectors.f32 per query.[/dim]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark VectorStore.search latency as the store grows.
+
+Also reports per-query cost when all queries go through one search_batch
+call, and compares the keyed position lookup for resolving search hits against the
+previous linear scan over metadata.json.
+
+Usage:
+    python -m benchmarks.vector_search --sizes 10000 100000 1000000
+"""
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from config import VECTOR_CONFIG
+from vector.storage import VectorStore
+
+console = Console()
+
+
+def populate_store(store: VectorStore, size: int, batch_size: int = 50_000) -> Dict[str, Dict]:
+    """
+    Fill a store with random normalized vectors without going through the WAL.
+
+    Returns:
+        Dict[str, Dict]: The equivalent legacy metadata.json mapping, for the linear-scan comparison
+    """
+    rng = np.random.default_rng(0)
+    legacy = {}
+    for start in range(0, size, batch_size):
+        count = min(batch_size, size - start)
+        vectors = rng.standard_normal((count, store.vector_dim)).astype('float32')
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        store._index.add(vectors)
+
+        entries = [(str(uuid.uuid4()), position, {"question_id": "benchmark"})
+                   for position in range(start, start + count)]
+        store._metadata.insert_many(entries)
+        legacy.update((vector_id, {**meta, "_index": position}) for vector_id, position, meta in entries)
+    return legacy
+
+
+def linear_scan_resolve(legacy: Dict[str, Dict], positions: List[int]) -> List[str]:
+    """Resolve hits the old way, scanning all metadata per hit."""
+    ids = []
+    for idx in positions:
+        for vid, meta in legacy.items():
+            if meta.get("_index") == idx:
+                ids.append(vid)
+                break
+    return ids
+
+
+@click.command()
+@click.option("--sizes", "-s", multiple=True, type=int, default=[10_000, 100_000, 1_000_000],
+              help="Store sizes to benchmark (repeatable).")
+@click.option("--queries", "-q", default=50, help="Queries per size.")
+@click.option("--top-k", "-k", default=5, help="Results per query.")
+@click.option("--scan-limit", default=100_000, help="Skip the legacy linear scan above this size.")
+def main(sizes, queries, top_k, scan_limit):
+    """Report search latency at several store sizes."""
+    table = Table(title="VectorStore.search latency")
+    table.add_column("Vectors", justify="right")
+    table.add_column("search p50 (ms)", justify="right")
+    table.add_column("search p95 (ms)", justify="right")
+    table.add_column("search_batch (ms/query)", justify="right")
+    table.add_column("hit resolution (µs)", justify="right")
+    table.add_column("legacy scan resolution (ms)", justify="right")
+
+    rng = np.random.default_rng(1)
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = VectorStore(db_path=tmp)
+            legacy = populate_store(store, size)
+
+            query_vectors = rng.standard_normal((queries, store.vector_dim)).astype('float32')
+            latencies = []
+            for query in query_vectors:
+                started = time.perf_counter()
+                store.search(query, top_k)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            store.search_batch(query_vectors, top_k)
+            batch_ms = (time.perf_counter() - started) * 1000 / queries
+
+            _, indices = store._index.search(query_vectors[:1], top_k)
+            positions = [int(i) for i in indices[0] if i != -1]
+
+            started = time.perf_counter()
+            for _ in range(1000):
+                store._resolve_positions(positions)
+            resolve_us = (time.perf_counter() - started) * 1000
+
+            legacy_ms = "skipped"
+            if size <= scan_limit:
+                started = time.perf_counter()
+                linear_scan_resolve(legacy, positions)
+                legacy_ms = f"{(time.perf_counter() - started) * 1000:.1f}"
+            store.close()
+
+            table.add_row(
+                f"{size:,}",
+                f"{np.percentile(latencies, 50):.2f}",
+                f"{np.percentile(latencies, 95):.2f}",
+                f"{batch_ms:.2f}",
+                f"{resolve_us:.2f}",
+                legacy_ms,
+            )
+
+    console.print(table)
+    console.print(f"[dim]dimension={VECTOR_CONFIG['vector_dimension']}, top_k={top_k}, queries={queries}[/dim]")
+
+
+if __name__ == "__main__":
+    main()
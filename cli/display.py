@@ -76,6 +76,32 @@ def display_summary(preferences: Dict) -> None:
     console.print("\n")
 
 
+def format_hotel_batch(hotels: List[Dict], start: int = 1) -> Table:
+    """
+    Format a batch of hotel search results for display in the CLI.
+
+    Args:
+        hotels: Hotel records from one results page
+        start: Number of the first hotel in the batch
+
+    Returns:
+        Table: A rich Table with one row per hotel
+    """
+    table = Table(show_header=start == 1, box=None, padding=(0, 1))
+
+    table.add_column("#", style="dim", justify="right")
+    table.add_column("Hotel", style="cyan")
+    table.add_column("Per night", style="green", justify="right")
+    table.add_column("Rating", style="yellow", justify="right")
+
+    for i, hotel in enumerate(hotels, start):
+        price = f"${hotel['price_per_night']:.0f}" if hotel.get("price_per_night") else "-"
+        rating = f"{hotel['rating']}/10" if hotel.get("rating") else "-"
+        table.add_row(str(i), hotel.get("name", ""), price, rating)
+
+    return table
+
+
 def display_error(error_message: str) -> None:
     """
     Display an error message in the CLI.
@@ -9,7 +9,8 @@ import sys
 from rich.console import Console
 
 from core.workflow import InterviewWorkflow
-from cli.display import format_question, format_response, display_summary
+from vector.embeddings import preload_embedding_model
+from cli.display import format_question, format_response, display_summary, format_hotel_batch
 
 console = Console()
 
@@ -86,6 +87,9 @@ def run_cli() -> Dict:
         "Please provide detailed answers to help find the best match.\n"
     )
 
+    # Load the embedding model while the customer answers; it's first needed at finalize
+    preload_embedding_model()
+
     # Initialize the workflow
     workflow = InterviewWorkflow()
 
@@ -154,6 +158,12 @@ def run_cli() -> Dict:
         # Process the collected preferences
         processed_preferences = workflow.process_preferences(preferences)
 
+        similar = workflow.similar_travellers
+        if similar["travellers"]:
+            destinations = ", ".join(t["destination"] for t in similar["travellers"] if t.get("destination"))
+            console.print(f"[dim]Found {len(similar['travellers'])} similar past travellers "
+                          f"({destinations or 'no searches yet'}) in {similar['elapsed_ms']} ms[/dim]")
+
         # Display a summary - use only the text part of processed preferences
         text_preferences = {k: data["text"] if isinstance(data, dict) and "text" in data else data
                            for k, data in processed_preferences.items()}
@@ -176,35 +186,34 @@ def run_cli() -> Dict:
 
             try:
                 # Import here to avoid circular imports
-                from hotel_search import search_hotels_for_session
+                from hotel_search import HotelSearcher
 
                 # Get the current session directory from workflow
                 session_dir_path = workflow.get_session_directory()
                 session_dir = Path(session_dir_path)
 
-                success = search_hotels_for_session(session_dir)
-                if success:
+                # Render each page of results as soon as it arrives
+                searcher = HotelSearcher()
+                shown = 0
+                for batch in searcher.stream_hotels_for_session(session_dir):
+                    if shown == 0:
+                        console.print("\n[bold cyan]Hotel Search Results (loading more pages...):[/bold cyan]")
+                    console.print(format_hotel_batch(batch, start=shown + 1))
+                    shown += len(batch)
+
+                if searcher.search_succeeded:
                     console.print("[green]✓ Hotel search completed! Results saved to session directory.[/green]")
 
-                    # Show results file location
+                    stats = searcher.search_stats
+                    console.print(
+                        f"[dim]First results in {stats.get('time_to_first_result_s')}s, "
+                        f"all {shown} hotels in {stats.get('total_search_time_s')}s[/dim]"
+                    )
+
+                    # Show results file location (final ranking with distances and amenities)
                     results_file = session_dir / "hotel_results.txt"
                     if results_file.exists():
-                        console.print(f"[blue]📄 Results saved to:[/blue] {results_file}")
-
-                        # Ask if user wants to see results preview
-                        show_preview = safe_yes_no_input("Show a preview of the results?", default="y")
-                        if show_preview:
-                            try:
-                                with open(results_file, 'r', encoding='utf-8') as f:
-                                    lines = f.readlines()
-                                    console.print("\n[bold cyan]Hotel Search Results Preview:[/bold cyan]")
-                                    # Show first 15 lines
-                                    for line in lines[:15]:
-                                        console.print(line.rstrip())
-                                    if len(lines) > 15:
-                                        console.print(f"[dim]... and {len(lines) - 15} more lines in the full results file[/dim]")
-                            except Exception as e:
-                                console.print(f"[yellow]Could not preview results: {str(e)}[/yellow]")
+                        console.print(f"[blue]📄 Ranked results saved to:[/blue] {results_file}")
                 else:
                     console.print("[yellow]⚠ Hotel search completed but no results found.[/yellow]")
 
@@ -287,6 +296,7 @@ def run_cli() -> Dict:
         return processed_preferences
 
     except KeyboardInterrupt:
+        workflow.logger.flush()
         console.print("\n[yellow]Interview interrupted by user. Your progress has been saved.[/yellow]")
         return preferences
     except Exception as e:
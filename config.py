@@ -18,6 +18,9 @@ MEMORY_CONFIG = {
     "conversation_dir": str(DATA_DIR / "conversations"),
     "enable_vector_storage": True,
     "llm_analysis_timeout": 30,  # seconds
+    "async_turn_analysis": True,  # analyze turns on a background thread, off the interactive path
+    "incremental_insights": True,  # build the insight profile turn by turn instead of one final LLM call
+    "turn_log": True,  # append turns and analyses to <conversation_dir>/<session>.turns.jsonl (for resume)
 }
 
 # Ollama LLM configuration
@@ -25,13 +28,84 @@ OLLAMA_CONFIG = {
     "base_url": "http://localhost:11434",
     "model": "qwen3:8b",  # or another model you have installed
     "timeout": 60,  # seconds
+    "pool_size": 4,  # kept-alive HTTP connections shared by all clients in a process
+    "embedding_model": "all-minilm:l6-v2",  # for the ollama embedding backend (same model as ours)
+    "embed_batch_size": 64,  # texts per /api/embed request
 }
 
 # Vector configuration
 VECTOR_CONFIG = {
     "embedding_model": "all-MiniLM-L6-v2",  # SentenceTransformers model
     "vector_dimension": 384,  # Depends on embedding model
+    # "sentence_transformers" (PyTorch), "onnx" (int8 ONNX Runtime export of the same model,
+    # created with `python main.py vectors export-onnx`; no PyTorch needed at runtime) or
+    # "ollama" (OLLAMA_CONFIG["embedding_model"] served by Ollama; re-embed existing stores
+    # with `python main.py vectors reembed` when switching to a different model)
+    "embedding_backend": "sentence_transformers",
+    "onnx_model_dir": str(DATA_DIR / "models" / "all-MiniLM-L6-v2-onnx-int8"),
+    # ONNX embeddings must have cosine similarity >= 1 - this with the PyTorch model's,
+    # so both can share one index (checked at export)
+    "onnx_cosine_tolerance": 0.02,
+    "onnx_threads": 0,  # intra-op threads (0 = ONNX Runtime default)
+    # Server deployments: run the model in a pool of worker processes shared by all threads,
+    # merging concurrent requests that arrive within batch_window_ms (0 workers = in-process model)
+    "embedding_service": {
+        "workers": 0,
+        "batch_window_ms": 5,
+        "max_batch": 64,
+        "timeout_seconds": 60,
+    },
     "vector_db_path": str(DATA_DIR / "vector_store"),
+    "wal_checkpoint_bytes": 4 * 1024 * 1024,  # rewrite the index once the WAL reaches this size
+    "wal_checkpoint_seconds": 300,  # ...or when the last checkpoint is this old
+    "wal_fsync": False,  # fsync every WAL append (survives power loss, slower)
+    # Embeddings cached per (model, normalized text): an in-process LRU over a SQLite store
+    "embedding_cache": {
+        "enabled": True,
+        "memory_entries": 10_000,
+        "path": str(DATA_DIR / "embedding_cache.db"),
+    },
+    "lock_timeout_seconds": 30,  # wait for another process's writer lock / SQLite write
+    "index_versions_kept": 2,  # index snapshots kept on disk for readers still on an older one
+    "quantization": None,  # "fp16" or "int8" scalar quantization for new stores (flat/HNSW tiers)
+    "keep_full_precision": True,  # keep float32 copies in vectors.f32 to re-rank quantized hits
+    "rerank_factor": 4,  # quantized searches fetch top_k * this candidates for exact re-ranking
+    "retention": {
+        "max_age_days": None,  # delete vectors older than this (None keeps everything)
+        "compact_min_deleted": 1000,  # rebuild the index once this many vectors are deleted...
+        "compact_deleted_fraction": 0.1,  # ...and they are at least this fraction of the store
+        "compaction_interval_seconds": 3600,  # background retention + compaction (0 disables)
+    },
+    # Exact search up to hnsw_threshold vectors, then approximate tiers (promoted at checkpoint)
+    "index_tiers": {
+        "hnsw_threshold": 50_000,
+        "ivfpq_threshold": 2_000_000,
+        "hnsw_m": 32,
+        "hnsw_ef_construction": 80,
+        "hnsw_ef_search": 64,  # higher = better recall, slower search
+        "ivf_nlist": 4096,
+        "pq_m": 48,  # sub-quantizers; must divide vector_dimension
+        "pq_nbits": 8,
+        "ivf_nprobe": 32,  # higher = better recall, slower search
+        # Filters matching at most this many vectors are scored exactly instead of
+        # walking the HNSW graph, whose recall collapses on very selective filters
+        "filter_exact_max": 4096,
+    },
+}
+
+# Similar-traveller lookup over stored conversation vectors
+SIMILAR_TRAVELLERS_CONFIG = {
+    "top_k": 5,  # past sessions to return
+    "min_similarity": 0.5,  # ignore sessions less similar than this (cosine)
+    "hotels_per_session": 3,  # top-ranked hotels taken from each past session
+    "summary_chars": 600,  # length of each Claude summary excerpt
+}
+
+# Conversation logger configuration
+CONVERSATION_LOG_CONFIG = {
+    "buffered": True,  # hand log writes to a background writer thread instead of writing inline
+    "flush_interval_seconds": 1.0,  # flush buffered writes at least this often
+    "flush_bytes": 64 * 1024,  # ...or as soon as this much is buffered
 }
 
 # Question configuration
@@ -54,10 +128,26 @@ BOOKING_CONFIG = {
     "default_children": 0,
     "default_rooms": 1,
     "timeout": 30,  # seconds
+    "max_pages": 3,  # pages fetched for an unfiltered search (20 hotels each)
+    "filtered_max_pages": 2,  # pages fetched when budget/class filters are pushed down
+    "page_size": 20,  # hotels per Booking.com results page
+    "max_hotels": 60,
+    "baseline_categories_filter": "class::2,class::4,free_cancellation::1",
+    "details_top_k": 15,  # hotels enriched with facilities and descriptions
+    "details_max_workers": 4,  # concurrent detail requests
+    "details_cache_dir": str(DATA_DIR / "hotel_cache"),
+    "details_cache_ttl_hours": 24 * 30,  # hotel details change rarely
     # Add your RapidAPI key here or use environment variable
     "api_key": None,  # Set via environment variable BOOKING_API_KEY
 }
 
+# Neighbourhood-aware ranking configuration
+GEO_CONFIG = {
+    "gazetteer_path": str(DATA_DIR / "gazetteer.json"),  # Offline city -> area -> [lat, lon]
+    "neighbourhood_radius_km": 3.0,  # Hotels within this distance of a named area rank first
+    "grid_cell_km": 1.0,  # Cell size of the local spatial index
+}
+
 # Booking parser configuration
 BOOKING_PARSER_CONFIG = {
     "require_exact_dates": True,  # Reject vague dates
@@ -4,11 +4,178 @@ Stores conversation flow according to the plaintext storage schema.
 """
 import os
 import json
+import atexit
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, TextIO
 
-from config import DATA_DIR
+from config import DATA_DIR, CONVERSATION_LOG_CONFIG
+
+
+class BufferedLogWriter:
+    """
+    Background writer for append-only log files.
+
+    Callers queue text and return straight away; one thread keeps the files
+    open and flushes them on an interval or once enough text is buffered.
+    Whatever is queued is written out at close(), which also runs at exit
+    (including after a KeyboardInterrupt).
+    """
+
+    def __init__(self, flush_interval: float = 1.0, flush_bytes: int = 64 * 1024):
+        """
+        Start the writer thread.
+
+        Args:
+            flush_interval: Seconds buffered text may wait before it is flushed
+            flush_bytes: Flush as soon as this many characters are buffered
+        """
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self._queue: "queue.Queue" = queue.Queue()
+        self._files: Dict[Path, TextIO] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="conversation-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, path: Path, text: str) -> None:
+        """
+        Queue text to append to a file.
+
+        Args:
+            path: File to append to
+            text: Text to append
+        """
+        with self._lock:
+            if not self._closed:
+                self._queue.put((path, text))
+                return
+
+        # Late writes after close (e.g. during interpreter shutdown) go straight to the file
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Wait until everything queued so far is written to the files.
+
+        If the writer thread has died, the queued text is written from the
+        calling thread instead and later writes go straight to the files.
+
+        Args:
+            fsync: Also fsync the files so the text survives a power loss
+        """
+        done = threading.Event()
+        with self._lock:
+            if self._closed:
+                return
+            self._queue.put((None, (done, fsync)))
+
+        while not done.wait(timeout=max(self.flush_interval, 0.1)):
+            if not self._thread.is_alive():
+                print("Warning: conversation log writer stopped, writing logs directly")
+                with self._lock:
+                    self._closed = True
+                self._write_queued(fsync)
+                return
+
+    def close(self) -> None:
+        """Write out everything queued, close the files and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+        # Only finds anything if the writer thread died before reaching the stop marker
+        self._write_queued(fsync=False)
+
+    def _run(self) -> None:
+        """Writer thread: append queued text, flushing on the interval or size threshold."""
+        buffered = 0
+        last_flush = time.monotonic()
+
+        while True:
+            timeout = max(0.0, last_flush + self.flush_interval - time.monotonic()) if buffered else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = (None, (None, False))  # flush interval elapsed
+
+            if item is None:
+                self._flush_files(fsync=False)
+                for f in self._files.values():
+                    f.close()
+                self._files.clear()
+                return
+
+            path, payload = item
+            if path is None:
+                done, fsync = payload
+                self._flush_files(fsync)
+                buffered, last_flush = 0, time.monotonic()
+                if done is not None:
+                    done.set()
+                continue
+
+            try:
+                if path not in self._files:
+                    self._files[path] = open(path, 'a', encoding='utf-8', buffering=self.flush_bytes)
+                self._files[path].write(payload)
+            except OSError as e:
+                print(f"Warning: Could not write to {path.name}: {e}")
+                continue
+
+            buffered += len(payload)
+            if buffered >= self.flush_bytes:
+                self._flush_files(fsync=False)
+                buffered, last_flush = 0, time.monotonic()
+
+    def _write_queued(self, fsync: bool) -> None:
+        """Write out what a stopped writer thread left open or queued, from the calling thread."""
+        self._flush_files(fsync)
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                continue
+
+            path, payload = item
+            if path is None:
+                if payload[0] is not None:
+                    payload[0].set()
+                continue
+
+            try:
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(payload)
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+            except OSError as e:
+                print(f"Warning: Could not write to {path.name}: {e}")
+
+    def _flush_files(self, fsync: bool) -> None:
+        """Flush every open file, optionally fsyncing it."""
+        for path, f in self._files.items():
+            try:
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+            except OSError as e:
+                print(f"Warning: Could not flush {path.name}: {e}")
 
 
 class ConversationLogger:
@@ -50,6 +217,14 @@ class ConversationLogger:
         # Initialize files
         self._init_files()
 
+        # Appends go through a background writer unless buffering is disabled
+        self._writer: Optional[BufferedLogWriter] = None
+        if CONVERSATION_LOG_CONFIG["buffered"]:
+            self._writer = BufferedLogWriter(
+                flush_interval=CONVERSATION_LOG_CONFIG["flush_interval_seconds"],
+                flush_bytes=CONVERSATION_LOG_CONFIG["flush_bytes"],
+            )
+
     def _generate_session_id(self) -> str:
         """Generate a unique session ID based on timestamp."""
         return datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -74,6 +249,30 @@ class ConversationLogger:
             f.write(f"=== LLM REASONING CHAIN ===\n")
             f.write(f"Session: {self.session_id}\n\n")
 
+    def _append(self, file_path: Path, text: str) -> None:
+        """Append text to a log file (via the background writer when buffered)."""
+        if self._writer is not None:
+            self._writer.write(file_path, text)
+            return
+
+        with open(file_path, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Wait until every logged event is written to the session files.
+
+        Args:
+            fsync: Also fsync the files
+        """
+        if self._writer is not None:
+            self._writer.flush(fsync)
+
+    def close(self) -> None:
+        """Write out pending events and stop the background writer."""
+        if self._writer is not None:
+            self._writer.close()
+
     def log_question(self, question_id: str, question_text: str) -> None:
         """
         Log a question being asked.
@@ -97,12 +296,10 @@ class ConversationLogger:
         self.metadata['total_questions'] += 1
 
         # Write to full context file
-        with open(self.full_context_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] QUESTION ({question_id}): {question_text}\n\n")
+        self._append(self.full_context_file, f"[{timestamp}] QUESTION ({question_id}): {question_text}\n\n")
 
         # Write to conversation only file
-        with open(self.conversation_only_file, 'a', encoding='utf-8') as f:
-            f.write(f"Q: {question_text}\n")
+        self._append(self.conversation_only_file, f"Q: {question_text}\n")
 
     def log_user_response(self, question_id: str, response: str, is_revision: bool = False) -> None:
         """
@@ -134,15 +331,13 @@ class ConversationLogger:
             self.metadata['total_revisions'] += 1
 
         # Write to full context file
-        with open(self.full_context_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] {response_type}: {response}\n\n")
+        self._append(self.full_context_file, f"[{timestamp}] {response_type}: {response}\n\n")
 
         # Write to conversation only file
-        with open(self.conversation_only_file, 'a', encoding='utf-8') as f:
-            if is_revision:
-                f.write(f"A: (REVISED) {response}\n")
-            else:
-                f.write(f"A: {response}\n")
+        if is_revision:
+            self._append(self.conversation_only_file, f"A: (REVISED) {response}\n")
+        else:
+            self._append(self.conversation_only_file, f"A: {response}\n")
 
     def log_suggestions(self, question_id: str, suggestions: List[Dict]) -> None:
         """
@@ -164,27 +359,25 @@ class ConversationLogger:
         self.conversation_entries.append(entry)
 
         # Write to full context file
-        with open(self.full_context_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] SUGGESTIONS:\n")
-            for i, suggestion in enumerate(suggestions, 1):
-                if isinstance(suggestion, dict):
-                    suggestion_text = suggestion.get('text', suggestion)
-                    suggestion_type = suggestion.get('type', 'general')
-                    f.write(f"  {i}. [{suggestion_type}] {suggestion_text}\n")
-                else:
-                    f.write(f"  {i}. {suggestion}\n")
-            f.write("\n")
+        lines = [f"[{timestamp}] SUGGESTIONS:\n"]
+        for i, suggestion in enumerate(suggestions, 1):
+            if isinstance(suggestion, dict):
+                suggestion_text = suggestion.get('text', suggestion)
+                suggestion_type = suggestion.get('type', 'general')
+                lines.append(f"  {i}. [{suggestion_type}] {suggestion_text}\n")
+            else:
+                lines.append(f"  {i}. {suggestion}\n")
+        lines.append("\n")
+        self._append(self.full_context_file, "".join(lines))
 
         # Write to conversation only file
-        with open(self.conversation_only_file, 'a', encoding='utf-8') as f:
-            f.write("SUGGESTIONS: ")
-            suggestion_texts = []
-            for suggestion in suggestions:
-                if isinstance(suggestion, dict):
-                    suggestion_texts.append(suggestion.get('text', str(suggestion)))
-                else:
-                    suggestion_texts.append(str(suggestion))
-            f.write("; ".join(suggestion_texts) + "\n")
+        suggestion_texts = []
+        for suggestion in suggestions:
+            if isinstance(suggestion, dict):
+                suggestion_texts.append(suggestion.get('text', str(suggestion)))
+            else:
+                suggestion_texts.append(str(suggestion))
+        self._append(self.conversation_only_file, "SUGGESTIONS: " + "; ".join(suggestion_texts) + "\n")
 
     def log_llm_reasoning(self, interaction_type: str, system_prompt: str,
                          user_prompt: str, llm_response: str,
@@ -218,28 +411,28 @@ class ConversationLogger:
         self.metadata['llm_interactions'] += 1
 
         # Write to full context file
-        with open(self.full_context_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] {interaction_type.upper()}:\n")
-            if context:
-                f.write(f"Context: {context}\n")
-            f.write(f"System Prompt: \"{system_prompt[:100]}...\"\n")
-            f.write(f"User Prompt: \"{user_prompt[:100]}...\"\n")
-            f.write(f"LLM Response: \"{llm_response}\"\n")
-            if decision:
-                f.write(f"Decision: {decision}\n")
-            f.write("\n")
+        lines = [f"[{timestamp}] {interaction_type.upper()}:\n"]
+        if context:
+            lines.append(f"Context: {context}\n")
+        lines.append(f"System Prompt: \"{system_prompt[:100]}...\"\n")
+        lines.append(f"User Prompt: \"{user_prompt[:100]}...\"\n")
+        lines.append(f"LLM Response: \"{llm_response}\"\n")
+        if decision:
+            lines.append(f"Decision: {decision}\n")
+        lines.append("\n")
+        self._append(self.full_context_file, "".join(lines))
 
         # Write to reasoning log file
-        with open(self.reasoning_log_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{interaction_type.upper()} - {timestamp}]\n")
-            if context:
-                f.write(f"Context: {context}\n")
-            f.write(f"System: \"{system_prompt}\"\n")
-            f.write(f"Input: \"{user_prompt}\"\n")
-            f.write(f"Output: \"{llm_response}\"\n")
-            if decision:
-                f.write(f"Decision: {decision}\n")
-            f.write("\n")
+        lines = [f"[{interaction_type.upper()} - {timestamp}]\n"]
+        if context:
+            lines.append(f"Context: {context}\n")
+        lines.append(f"System: \"{system_prompt}\"\n")
+        lines.append(f"Input: \"{user_prompt}\"\n")
+        lines.append(f"Output: \"{llm_response}\"\n")
+        if decision:
+            lines.append(f"Decision: {decision}\n")
+        lines.append("\n")
+        self._append(self.reasoning_log_file, "".join(lines))
 
     def finalize_session(self, search_terms: Optional[Dict] = None) -> None:
         """
@@ -262,22 +455,25 @@ class ConversationLogger:
                 f.write(f"{readable_q}: {response}\n\n")
 
         # Add final sections to full context file
-        with open(self.full_context_file, 'a', encoding='utf-8') as f:
-            f.write(f"=== FINAL PREFERENCES ===\n")
-            for question_id, response in self.final_responses.items():
-                readable_q = question_id.replace("_", " ").title()
-                f.write(f"{readable_q}: {response}\n")
-
-            if search_terms:
-                f.write(f"\n=== EXTRACTED SEARCH TERMS ===\n")
-                for category, terms in search_terms.items():
-                    f.write(f"{category}: {', '.join(terms)}\n")
-
-            f.write(f"\n=== SESSION SUMMARY ===\n")
-            f.write(f"Questions: {self.metadata['total_questions']}\n")
-            f.write(f"Revisions: {self.metadata['total_revisions']}\n")
-            f.write(f"LLM Interactions: {self.metadata['llm_interactions']}\n")
-            f.write(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        lines = [f"=== FINAL PREFERENCES ===\n"]
+        for question_id, response in self.final_responses.items():
+            readable_q = question_id.replace("_", " ").title()
+            lines.append(f"{readable_q}: {response}\n")
+
+        if search_terms:
+            lines.append(f"\n=== EXTRACTED SEARCH TERMS ===\n")
+            for category, terms in search_terms.items():
+                lines.append(f"{category}: {', '.join(terms)}\n")
+
+        lines.append(f"\n=== SESSION SUMMARY ===\n")
+        lines.append(f"Questions: {self.metadata['total_questions']}\n")
+        lines.append(f"Revisions: {self.metadata['total_revisions']}\n")
+        lines.append(f"LLM Interactions: {self.metadata['llm_interactions']}\n")
+        lines.append(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        self._append(self.full_context_file, "".join(lines))
+
+        # The session files are read as soon as the interview ends: write out and fsync every event
+        self.flush(fsync=True)
 
         # Write metadata file
         with open(self.metadata_file, 'w', encoding='utf-8') as f:
@@ -321,6 +517,8 @@ def get_conversation_logger(session_id: Optional[str] = None) -> ConversationLog
     global _current_logger
 
     if _current_logger is None or session_id:
+        if _current_logger is not None:
+            _current_logger.close()
         _current_logger = ConversationLogger(session_id)
 
     return _current_logger
@@ -3,12 +3,31 @@ Main workflow for the hotel recommendation system with conversation logging.
 """
 from typing import Dict, List, Tuple, Any
 
+import numpy as np
+
 from questions.question_bank import get_questions, get_question_by_id
 from questions.suggestion import generate_suggestions
 from llm.coherence import check_coherence, check_logical_consistency
-from vector.embeddings import embed_text
-from vector.storage import store_vector
+from vector.embeddings import embed_batch
 from conversation.logger import get_conversation_logger  # Fixed import path
+from memory.similar_travellers import find_similar_travellers, save_similar_travellers
+
+
+def build_conversation_text(preferences: Dict[str, str]) -> str:
+    """
+    Render a whole interview as one text for the conversation embedding.
+
+    Args:
+        preferences: Question ID -> answer
+
+    Returns:
+        str: Each question followed by its answer
+    """
+    questions = {q["id"]: q["text"] for q in get_questions()}
+    return "Hotel preference conversation:\n" + "\n".join(
+        f"{questions.get(question_id, question_id)}: {answer}"
+        for question_id, answer in preferences.items()
+    )
 
 
 class InterviewWorkflow:
@@ -21,6 +40,7 @@ class InterviewWorkflow:
         self.questions = get_questions()
         self.collected_answers = {}
         self.logger = get_conversation_logger()
+        self.similar_travellers: Dict[str, Any] = {"travellers": [], "elapsed_ms": 0.0}
 
     def get_questions(self) -> List[Dict]:
         """
@@ -125,28 +145,62 @@ class InterviewWorkflow:
         Returns:
             Dict[str, Any]: Processed preferences with additional metadata
         """
-        processed_data = {}
-
-        # For each preference, add the processed data
-        for question_id, answer in preferences.items():
-            # Embed the answer text
-            embedding = embed_text(answer)
-
-            # Store the embedding
-            vector_id = store_vector(question_id, embedding)
+        from vector.storage import store_vectors  # faiss is loaded on first use
+
+        question_ids = list(preferences.keys())
+        answers = [preferences[question_id] for question_id in question_ids]
+        conversation_text = build_conversation_text(preferences)
+
+        # Embed every answer and the whole conversation in one batched forward pass
+        embeddings = embed_batch(answers + [conversation_text])
+        answer_embeddings, conversation_embedding = embeddings[:-1], embeddings[-1]
+
+        # Look up similar past travellers before this conversation joins the store
+        self._find_similar_travellers(conversation_embedding)
+
+        # Store all answers and the conversation vector in one bulk write
+        session_dir = self.get_session_directory()
+        vector_ids = store_vectors(
+            question_ids + ["conversation"],
+            embeddings,
+            self.logger.session_id,
+            metadata=[{"text": answer} for answer in answers] + [{
+                "type": "conversation",
+                "conversation_type": "hotel_preference_interview",
+                "session_dir": str(session_dir),
+                "text": conversation_text,
+            }],
+        )
 
-            # Add to processed data
-            processed_data[question_id] = {
+        processed_data = {
+            question_id: {
                 "text": answer,
                 "vector_id": vector_id,
                 "embedding": embedding,
             }
+            for question_id, answer, vector_id, embedding in zip(question_ids, answers, vector_ids,
+                                                                   answer_embeddings)
+        }
 
         # Finalize the conversation session
         self.logger.finalize_session()
 
         return processed_data
 
+    def _find_similar_travellers(self, conversation_embedding: np.ndarray) -> None:
+        """
+        Find past sessions similar to this interview and save them to the session directory.
+
+        Args:
+            conversation_embedding: Embedding of the whole interview
+        """
+        try:
+            self.similar_travellers = find_similar_travellers(conversation_embedding,
+                                                              exclude_session_id=self.logger.session_id)
+            save_similar_travellers(self.get_session_directory(), self.similar_travellers)
+        except Exception as e:
+            print(f"Warning: Could not look up similar travellers: {e}")
+
     def get_session_directory(self):
         """Get the current session directory."""
         session_info = self.logger.get_session_info()
@@ -0,0 +1,285 @@
+"""
+Per-hotel detail enrichment for the top-ranked search results.
+Fetches facilities and descriptions from Booking.com with a bounded worker
+pool over a pooled HTTP session, caching details per hotel id on disk.
+"""
+import json
+import re
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Any
+
+from requests.adapters import HTTPAdapter
+
+from config import BOOKING_CONFIG
+
+# Amenity vocabulary matched against the amenities answer and hotel facilities
+AMENITY_KEYWORDS = {
+    "pool": ["pool"],
+    "spa": ["spa", "sauna", "hot tub", "massage"],
+    "gym": ["gym", "fitness"],
+    "restaurant": ["restaurant"],
+    "bar": ["bar", "lounge"],
+    "room service": ["room service"],
+    "breakfast": ["breakfast"],
+    "parking": ["parking"],
+    "wifi": ["wifi", "wi-fi", "internet"],
+    "pet-friendly": ["pet", "pets allowed"],
+    "family-friendly": ["family", "kids", "children"],
+    "beach": ["beach", "beachfront"],
+    "kitchen": ["kitchen", "kitchenette"],
+    "balcony": ["balcony", "terrace"],
+    "airport shuttle": ["airport shuttle", "shuttle"],
+    "ski": ["ski", "skiing"],
+}
+
+
+def _mentions(term: str, text: str) -> bool:
+    """Whole-word match of an amenity term (allowing a plural 's')."""
+    return re.search(rf'\b{re.escape(term)}s?\b', text) is not None
+
+
+def create_http_session(pool_size: int) -> requests.Session:
+    """
+    Create a pooled HTTP session for Booking.com requests.
+
+    Args:
+        pool_size: Maximum number of kept-alive connections
+
+    Returns:
+        requests.Session: Session with a connection pool of the given size
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def extract_requested_amenities(amenities_answer: str) -> List[str]:
+    """
+    Extract the amenities a customer asked for.
+
+    Args:
+        amenities_answer: The customer's answer to the amenities question
+
+    Returns:
+        List[str]: Canonical amenity names mentioned in the answer
+    """
+    answer = (amenities_answer or "").lower()
+    requested = []
+    for amenity, terms in AMENITY_KEYWORDS.items():
+        for term in terms:
+            # Skip explicitly unwanted amenities like "no pool"
+            if _mentions(term, answer) and not _mentions(f"no {term}", answer):
+                requested.append(amenity)
+                break
+    return requested
+
+
+def score_amenity_match(hotel: Dict[str, Any], requested: List[str]) -> List[str]:
+    """
+    Find which requested amenities a hotel's enriched details mention.
+
+    Args:
+        hotel: Hotel record with facilities/description fields
+        requested: Canonical amenity names from extract_requested_amenities
+
+    Returns:
+        List[str]: Requested amenities the hotel offers
+    """
+    text = " ".join(hotel.get("facilities", [])).lower() + " " + (hotel.get("description") or "").lower()
+    return [
+        amenity for amenity in requested
+        if any(_mentions(term, text) for term in AMENITY_KEYWORDS[amenity])
+    ]
+
+
+class HotelDetailsEnricher:
+    """Fetches and caches per-hotel details for the top-K ranked hotels."""
+
+    def __init__(self, api_key: str, http: Optional[requests.Session] = None):
+        """
+        Initialize the enricher.
+
+        Args:
+            api_key: RapidAPI key
+            http: Optional pooled session shared with the searcher
+        """
+        self.api_key = api_key
+        self.max_workers = BOOKING_CONFIG["details_max_workers"]
+        self.http = http or create_http_session(self.max_workers)
+        self.cache_dir = Path(BOOKING_CONFIG["details_cache_dir"])
+        self.cache_ttl = BOOKING_CONFIG["details_cache_ttl_hours"] * 3600
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+
+        self._memory_cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_lock = Lock()
+        self.stats = {"cache_hits": 0, "fetched": 0, "failed": 0}
+
+    def enrich(self, hotels: List[Dict], locale: str = "en-us", top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Add facilities and description to the top-K hotels in place.
+
+        Args:
+            hotels: Ranked hotel records
+            locale: Locale code
+            top_k: Number of hotels to enrich, defaults to BOOKING_CONFIG
+
+        Returns:
+            List[Dict]: The same hotel list, with the top-K enriched
+        """
+        top_k = top_k or BOOKING_CONFIG["details_top_k"]
+        targets = [h for h in hotels[:top_k] if h.get("hotel_id")]
+        if not targets:
+            return hotels
+
+        print(f"🔍 Fetching details for top {len(targets)} hotels ({self.max_workers} workers)...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            details = list(executor.map(lambda h: self.get_details(h["hotel_id"], locale), targets))
+
+        for hotel, detail in zip(targets, details):
+            if detail:
+                hotel["facilities"] = detail.get("facilities", [])
+                hotel["description"] = detail.get("description", "")
+
+        print(f"   ✅ Details: {self.stats['fetched']} fetched, {self.stats['cache_hits']} cached, "
+              f"{self.stats['failed']} failed")
+        return hotels
+
+    def get_details(self, hotel_id: Any, locale: str = "en-us") -> Optional[Dict[str, Any]]:
+        """
+        Get details for one hotel, from cache when fresh.
+
+        Args:
+            hotel_id: Booking.com hotel ID
+            locale: Locale code
+
+        Returns:
+            Optional[Dict[str, Any]]: Details with facilities and description
+        """
+        key = f"{hotel_id}_{locale}"
+        cached = self._read_cache(key)
+        if cached is not None:
+            with self._cache_lock:
+                self.stats["cache_hits"] += 1
+            return cached
+
+        try:
+            details = {
+                "facilities": self._fetch_facilities(hotel_id, locale),
+                "description": self._fetch_description(hotel_id, locale),
+                "fetched_at": time.time(),
+            }
+        except Exception as e:
+            print(f"   ❌ Details for hotel {hotel_id} failed: {str(e)}")
+            with self._cache_lock:
+                self.stats["failed"] += 1
+            return None
+
+        self._write_cache(key, details)
+        with self._cache_lock:
+            self.stats["fetched"] += 1
+        return details
+
+    def _get(self, endpoint: str, hotel_id: Any, locale: str) -> Any:
+        """GET a per-hotel Booking.com endpoint."""
+        response = self.http.get(
+            f"{BOOKING_CONFIG['api_base_url']}/hotels/{endpoint}",
+            headers={
+                "X-RapidAPI-Key": self.api_key,
+                "X-RapidAPI-Host": "booking-com.p.rapidapi.com"
+            },
+            params={"hotel_id": str(hotel_id), "locale": locale},
+            timeout=BOOKING_CONFIG["timeout"]
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _fetch_facilities(self, hotel_id: Any, locale: str) -> List[str]:
+        """Fetch facility names for a hotel."""
+        data = self._get("facilities", hotel_id, locale)
+        names = []
+        for facility in data or []:
+            name = facility.get("facility_name") or facility.get("name")
+            if name and name not in names:
+                names.append(name)
+        return names
+
+    def _fetch_description(self, hotel_id: Any, locale: str) -> str:
+        """Fetch the description text for a hotel."""
+        data = self._get("description", hotel_id, locale)
+        if isinstance(data, dict):
+            return data.get("description", "")
+        if isinstance(data, list) and data:
+            return data[0].get("description", "")
+        return ""
+
+    def _read_cache(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read cached details if still within the TTL."""
+        with self._cache_lock:
+            details = self._memory_cache.get(key)
+
+        if details is None:
+            cache_file = self.cache_dir / f"{key}.json"
+            if not cache_file.exists():
+                return None
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    details = json.load(f)
+            except Exception:
+                return None
+
+        if time.time() - details.get("fetched_at", 0) > self.cache_ttl:
+            return None
+
+        with self._cache_lock:
+            self._memory_cache[key] = details
+        return details
+
+    def _write_cache(self, key: str, details: Dict[str, Any]) -> None:
+        """Write details to the in-process and on-disk caches."""
+        with self._cache_lock:
+            self._memory_cache[key] = details
+
+        cache_file = self.cache_dir / f"{key}.json"
+        temp_file = cache_file.with_suffix(".tmp")
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(details, f)
+            temp_file.replace(cache_file)
+        except Exception as e:
+            print(f"Warning: Could not cache hotel details: {e}")
+
+
+def rank_by_amenities(hotels: List[Dict], amenities_answer: str, top_k: Optional[int] = None) -> List[Dict]:
+    """
+    Re-rank the enriched top-K hotels by how many requested amenities they offer.
+
+    Hotels that similar past travellers were shown (similar_travellers_score)
+    break ties, then earlier ranking (e.g. neighbourhood distance) since the
+    sort is stable; hotels beyond top-K keep their order.
+
+    Args:
+        hotels: Ranked hotel records, top-K enriched
+        amenities_answer: The customer's answer to the amenities question
+        top_k: Number of enriched hotels, defaults to BOOKING_CONFIG
+
+    Returns:
+        List[Dict]: Re-ordered hotel records with matched_amenities on the top-K
+    """
+    requested = extract_requested_amenities(amenities_answer)
+    top_k = top_k or BOOKING_CONFIG["details_top_k"]
+    head, tail = hotels[:top_k], hotels[top_k:]
+    if not requested and not any(h.get("similar_travellers_score") for h in head):
+        return hotels
+
+    for hotel in head:
+        if requested and "facilities" in hotel:
+            hotel["matched_amenities"] = score_amenity_match(hotel, requested)
+
+    head.sort(key=lambda h: (-len(h.get("matched_amenities", [])), -h.get("similar_travellers_score", 0)))
+    return head + tail
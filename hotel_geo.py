@@ -0,0 +1,230 @@
+"""
+Neighbourhood-aware ranking for hotel search results.
+Resolves areas named in the destination answer through an offline gazetteer
+and ranks hotels by distance using a local grid index.
+"""
+import json
+import math
+import re
+import numpy as np
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import GEO_CONFIG
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 110.574
+
+
+def haversine_km(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distance in kilometres (vectorized, broadcasts like numpy).
+
+    Args:
+        lat1, lon1: Coordinates of the first set of points (degrees)
+        lat2, lon2: Coordinates of the second set of points (degrees)
+
+    Returns:
+        np.ndarray: Distances in kilometres
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class HotelGridIndex:
+    """
+    Uniform grid over hotel coordinates for fast radius queries.
+
+    Coordinates are projected to a local equirectangular plane (km) around the
+    mean latitude; candidates from neighbouring cells are checked exactly with
+    the haversine distance.
+    """
+
+    def __init__(self, coordinates: np.ndarray, cell_km: Optional[float] = None):
+        """
+        Build the index.
+
+        Args:
+            coordinates: Array of shape (n, 2) with (latitude, longitude) rows
+            cell_km: Grid cell size in kilometres
+        """
+        self.coordinates = np.asarray(coordinates, dtype='float64').reshape(-1, 2)
+        self.cell_km = cell_km or GEO_CONFIG["grid_cell_km"]
+        self._lat0 = float(self.coordinates[:, 0].mean()) if len(self.coordinates) else 0.0
+        self._km_per_degree_lon = 111.320 * math.cos(math.radians(self._lat0))
+
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for position, cell in enumerate(self._cell_of(self.coordinates)):
+            self._cells[(int(cell[0]), int(cell[1]))].append(position)
+
+    def _cell_of(self, coordinates: np.ndarray) -> np.ndarray:
+        """Map (lat, lon) rows to integer grid cells."""
+        y = coordinates[:, 0] * KM_PER_DEGREE_LAT
+        x = coordinates[:, 1] * self._km_per_degree_lon
+        return np.floor(np.stack([y, x], axis=1) / self.cell_km).astype('int64')
+
+    def query_radius_batch(self, points: np.ndarray, radius_km: float) -> List[np.ndarray]:
+        """
+        Find hotels within a radius of each query point.
+
+        Args:
+            points: Array of shape (m, 2) with (latitude, longitude) rows
+            radius_km: Search radius in kilometres
+
+        Returns:
+            List[np.ndarray]: For each point, hotel positions sorted by distance
+        """
+        points = np.asarray(points, dtype='float64').reshape(-1, 2)
+        reach = int(math.ceil(radius_km / self.cell_km))
+        results = []
+
+        for point, cell in zip(points, self._cell_of(points)):
+            candidates = []
+            for dy in range(-reach, reach + 1):
+                for dx in range(-reach, reach + 1):
+                    candidates.extend(self._cells.get((int(cell[0]) + dy, int(cell[1]) + dx), ()))
+
+            if not candidates:
+                results.append(np.empty(0, dtype='int64'))
+                continue
+
+            candidates = np.asarray(candidates, dtype='int64')
+            distances = haversine_km(point[0], point[1],
+                                     self.coordinates[candidates, 0], self.coordinates[candidates, 1])
+            keep = distances <= radius_km
+            order = np.argsort(distances[keep], kind='stable')
+            results.append(candidates[keep][order])
+
+        return results
+
+    def nearest_distances(self, points: np.ndarray,
+                          positions: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distance from hotels to their closest query point.
+
+        Args:
+            points: Array of shape (m, 2) with (latitude, longitude) rows
+            positions: Hotel positions to measure, defaults to every hotel
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (distance_km, index of closest point) per hotel
+        """
+        points = np.asarray(points, dtype='float64').reshape(-1, 2)
+        coordinates = self.coordinates if positions is None else self.coordinates[positions]
+        distances = haversine_km(coordinates[:, 0:1], coordinates[:, 1:2],
+                                 points[None, :, 0], points[None, :, 1])
+        closest = distances.argmin(axis=1)
+        return distances[np.arange(len(distances)), closest], closest
+
+
+_gazetteer = None
+
+
+def keyword_pattern(keyword: str) -> re.Pattern:
+    """Whole-word pattern for a keyword, allowing a plural 's' and skipping 'not'/'no' before it."""
+    return re.compile(rf'(?<![\w&-])(?<!not )(?<!no ){re.escape(keyword)}s?(?![\w&-])')
+
+
+def load_gazetteer(path: Optional[Path] = None) -> Dict[str, Dict[str, List[float]]]:
+    """
+    Load the offline gazetteer of neighbourhood points.
+
+    Args:
+        path: Optional override for GEO_CONFIG["gazetteer_path"]
+
+    Returns:
+        Dict[str, Dict[str, List[float]]]: City -> area name -> [lat, lon]
+    """
+    global _gazetteer
+
+    if path is None and _gazetteer is not None:
+        return _gazetteer
+
+    gazetteer_path = Path(path or GEO_CONFIG["gazetteer_path"])
+    gazetteer = {}
+    if gazetteer_path.exists():
+        try:
+            with open(gazetteer_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            gazetteer = {
+                city.lower(): {name.lower(): coords for name, coords in areas.items()}
+                for city, areas in raw.items()
+            }
+        except Exception as e:
+            print(f"Warning: Could not load gazetteer: {e}")
+
+    if path is None:
+        _gazetteer = gazetteer
+    return gazetteer
+
+
+def resolve_neighbourhoods(city: str, destination_answer: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Resolve areas named in the destination answer to coordinates.
+
+    Args:
+        city: Extracted destination city
+        destination_answer: The customer's answer to the destination question
+
+    Returns:
+        Dict[str, Tuple[float, float]]: Area name -> (lat, lon)
+    """
+    gazetteer = load_gazetteer()
+    city_key = (city or "").lower()
+    answer = (destination_answer or "").lower()
+
+    areas = {}
+    for gazetteer_city, places in gazetteer.items():
+        if gazetteer_city not in city_key and city_key not in gazetteer_city:
+            continue
+        for name, coords in places.items():
+            if keyword_pattern(name).search(answer):
+                areas[name] = (float(coords[0]), float(coords[1]))
+
+    return areas
+
+
+def rank_hotels_by_neighbourhood(hotels: List[Dict], areas: Dict[str, Tuple[float, float]],
+                                 radius_km: Optional[float] = None) -> List[Dict]:
+    """
+    Rank hotels by distance to the requested neighbourhoods.
+
+    Hotels within the radius of any area come first, ordered by distance; the
+    rest keep their original order. The in-radius hotels come from the grid
+    index and gain distance_km and nearest_area fields.
+
+    Args:
+        hotels: Hotel records with latitude/longitude
+        areas: Area name -> (lat, lon) from resolve_neighbourhoods
+        radius_km: Neighbourhood radius, defaults to GEO_CONFIG
+
+    Returns:
+        List[Dict]: Re-ordered hotel records
+    """
+    if not areas or not hotels:
+        return hotels
+
+    radius_km = radius_km or GEO_CONFIG["neighbourhood_radius_km"]
+    located = [i for i, h in enumerate(hotels) if h.get("latitude") is not None and h.get("longitude") is not None]
+    if not located:
+        return hotels
+
+    names = list(areas.keys())
+    points = np.array([areas[name] for name in names], dtype='float64')
+    index = HotelGridIndex(np.array([[hotels[i]["latitude"], hotels[i]["longitude"]] for i in located]))
+    candidates = np.unique(np.concatenate(index.query_radius_batch(points, radius_km)))
+    if not len(candidates):
+        return hotels
+
+    # Exact distances to every area only for the in-radius hotels, to pick the closest one
+    distances, closest = index.nearest_distances(points, candidates)
+    for position, distance, area in zip(candidates, distances, closest):
+        hotels[located[position]]["distance_km"] = round(float(distance), 2)
+        hotels[located[position]]["nearest_area"] = names[area]
+
+    nearby = {located[p] for p in candidates}
+    inside = sorted(nearby, key=lambda i: hotels[i]["distance_km"])
+    outside = [i for i in range(len(hotels)) if i not in nearby]
+    return [hotels[i] for i in inside + outside]
@@ -2,23 +2,189 @@
 Hotel search integration for the interview workflow.
 Extracts city/dates from conversation and searches for hotels.
 UPDATED: Added pagination to get 60 hotels instead of 20.
+UPDATED: Budget, star class and property type filters are pushed down to Booking.com.
 """
 import os
+import re
 import json
-import requests
+import time
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Any, Iterator
 from pathlib import Path
 
+from config import BOOKING_CONFIG
+from hotel_geo import keyword_pattern, resolve_neighbourhoods, rank_hotels_by_neighbourhood
+from hotel_details import HotelDetailsEnricher, create_http_session, rank_by_amenities
+from memory.similar_travellers import load_similar_travellers, similar_traveller_hotel_scores
 from llm.ollama_client import get_ollama_client
 
 
+# Booking.com star classes implied by budget category words. Matched as whole
+# words; "budget" itself is left out since most answers to the budget question use it.
+BUDGET_CLASS_KEYWORDS = {
+    "luxury": [4, 5],
+    "luxurious": [4, 5],
+    "upscale": [4, 5],
+    "high-end": [4, 5],
+    "mid-range": [3, 4],
+    "midrange": [3, 4],
+    "mid range": [3, 4],
+    "moderate": [3, 4],
+    "cheap": [1, 2, 3],
+    "affordable": [2, 3],
+}
+
+# Booking.com property type ids implied by stay experience keywords. Only words
+# that name a distinct kind of property; generic ones ("hotel", "boutique") would
+# narrow the search for nearly every answer.
+PROPERTY_TYPE_KEYWORDS = {
+    "resort": 206,
+    "b&b": 208,
+    "bed and breakfast": 208,
+    "guest house": 216,
+    "guesthouse": 216,
+    "hostel": 203,
+    "motel": 205,
+    "apartment": 201,
+    "villa": 213,
+}
+
+STAR_NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5}
+_STAR_NUMBER = r'([1-5]|one|two|three|four|five)'
+# "5 star", "4-star", "four stars", "4-5 star", "4 or 5 star"
+STAR_CLASS_PATTERN = re.compile(
+    rf'\b{_STAR_NUMBER}(?:\s*(?:-|to|or)\s*{_STAR_NUMBER})?[\s-]*stars?\b'
+)
+
+# Sanity bounds for a nightly price mentioned in an answer
+MIN_NIGHTLY_PRICE = 20
+MAX_NIGHTLY_PRICE = 5000
+
+
+def load_final_answers(session_dir: Path) -> Dict[str, str]:
+    """
+    Load the final interview answers from a session directory.
+
+    Args:
+        session_dir: Path to session directory
+
+    Returns:
+        Dict[str, str]: Question IDs mapped to final answers
+    """
+    answers = {}
+    final_responses_file = session_dir / "final_responses.txt"
+    if not final_responses_file.exists():
+        return answers
+
+    with open(final_responses_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if ':' not in line or line.startswith('==='):
+                continue
+            label, value = line.split(':', 1)
+            if label.strip() == "Session":
+                continue
+            question_id = label.strip().lower().replace(" ", "_")
+            answers[question_id] = value.strip()
+
+    return answers
+
+
+def _parse_budget_range(budget_answer: str) -> Tuple[Optional[int], Optional[int]]:
+    """Parse a nightly price range like '$150-250', 'up to $400' or 'around 200'."""
+    text = budget_answer.lower().replace(',', '')
+    amounts = [
+        int(float(value) * (1000 if suffix == 'k' else 1))
+        for value, suffix in re.findall(r'\$?\s*(\d+(?:\.\d+)?)\s*(k?)\b', text)
+    ]
+    amounts = [a for a in amounts if MIN_NIGHTLY_PRICE <= a <= MAX_NIGHTLY_PRICE]
+    if not amounts:
+        return None, None
+
+    if len(amounts) >= 2 and re.search(r'\d\s*(-|to|and)\s*\$?\s*\d', text):
+        return min(amounts[:2]), max(amounts[:2])
+
+    amount = amounts[0]
+    if re.search(r'(up to|under|max|maximum|less than|no more than|below|at most)', text):
+        return None, amount
+    if re.search(r'(at least|over|more than|above|minimum|min)\b', text):
+        return amount, None
+
+    # A single figure is treated as a target with some slack on either side
+    return int(amount * 0.75), int(amount * 1.25)
+
+
+def _matching_keywords(text: str, keywords: Dict[str, Any]) -> List[Any]:
+    """Return the values of the keywords that appear in the text as whole words."""
+    return [value for keyword, value in keywords.items() if keyword_pattern(keyword).search(text)]
+
+
+def _parse_star_classes(text: str) -> List[int]:
+    """Parse explicit star classes like '5 star', '4-star' or '4-5 stars'."""
+    classes = set()
+    for low, high in STAR_CLASS_PATTERN.findall(text):
+        low = STAR_NUMBER_WORDS.get(low) or int(low)
+        high = (STAR_NUMBER_WORDS.get(high) or int(high)) if high else low
+        classes.update(range(min(low, high), max(low, high) + 1))
+    return sorted(classes)
+
+
+def derive_search_filters(answers: Dict[str, str], currency: str = "USD") -> Dict[str, Any]:
+    """
+    Derive Booking.com server-side filters from the interview answers.
+
+    Args:
+        answers: Question IDs mapped to final answers
+        currency: Currency for the price filter
+
+    Returns:
+        Dict[str, Any]: Derived filters plus the categories_filter_ids string
+    """
+    budget_answer = answers.get("budget_preference", "")
+    experience_answer = answers.get("stay_experience", "").lower()
+
+    price_min, price_max = _parse_budget_range(budget_answer) if budget_answer else (None, None)
+
+    # An explicit star rating (in either answer) wins over budget category words
+    star_classes = set(_parse_star_classes(f"{budget_answer.lower()} {experience_answer}"))
+    if not star_classes:
+        for classes in _matching_keywords(budget_answer.lower(), BUDGET_CLASS_KEYWORDS):
+            star_classes.update(classes)
+
+    property_types = set(_matching_keywords(experience_answer, PROPERTY_TYPE_KEYWORDS))
+
+    filter_ids = []
+    if price_min is not None or price_max is not None:
+        filter_ids.append(f"price::{currency}-{price_min or 0}-{price_max or MAX_NIGHTLY_PRICE}")
+    filter_ids.extend(f"class::{c}" for c in sorted(star_classes))
+    filter_ids.extend(f"property_type::{t}" for t in sorted(property_types))
+
+    applied = bool(filter_ids)
+    if applied:
+        filter_ids.append("free_cancellation::1")
+        categories_filter_ids = ",".join(filter_ids)
+    else:
+        categories_filter_ids = BOOKING_CONFIG["baseline_categories_filter"]
+
+    return {
+        "price_min": price_min,
+        "price_max": price_max,
+        "star_classes": sorted(star_classes),
+        "property_types": sorted(property_types),
+        "categories_filter_ids": categories_filter_ids,
+        "applied": applied,
+    }
+
+
 class HotelSearcher:
     """Searches for hotels based on conversation data."""
 
     def __init__(self):
         self.client = get_ollama_client()
         self.api_key = os.getenv('RAPIDAPI_KEY')
+        self.search_stats = {}
+        self.search_succeeded = False
+        # Pooled connections shared by search pages and detail enrichment
+        self.http = create_http_session(BOOKING_CONFIG["details_max_workers"])
 
     def search_hotels_for_session(self, session_dir: Path) -> bool:
         """
@@ -30,6 +196,27 @@ class HotelSearcher:
         Returns:
             bool: True if search was successful, False otherwise
         """
+        for _ in self.stream_hotels_for_session(session_dir):
+            pass
+        return self.search_succeeded
+
+    def stream_hotels_for_session(self, session_dir: Path) -> Iterator[List[Dict]]:
+        """
+        Search for hotels, yielding one batch of formatted hotels per results page.
+
+        Ranking, enrichment and the result files happen once after the last
+        page; check search_succeeded once the generator is exhausted.
+
+        Args:
+            session_dir: Path to session directory
+
+        Yields:
+            List[Dict]: Hotels from each results page as it arrives
+        """
+        self.search_succeeded = False
+        started = time.perf_counter()
+        first_result_at = None
+
         try:
             # Comment out debug code but keep working extraction
             # print("🚨 BYPASSING CLASS METHOD - USING EMBEDDED WORKING FUNCTION")
@@ -100,41 +287,88 @@ If anything is unclear or missing, use NONE for that field.
 
             if not city or not checkin or not checkout:
                 self._save_no_results(session_dir, "Could not extract city and dates from conversation")
-                return False
-
-            # Search for hotels with NEW PAGINATION
-            hotels = self._search_booking_com_with_pagination(city, checkin, checkout, locale)
+                return
+
+            # Push budget/class/property type filters down to Booking.com
+            answers = load_final_answers(session_dir)
+            filters = derive_search_filters(answers, BOOKING_CONFIG["default_currency"])
+            if filters["applied"]:
+                print(f"🔎 Server-side filters: {filters['categories_filter_ids']}")
+
+            # Search for hotels with NEW PAGINATION, streaming each page to the caller
+            hotels = []
+            for batch in self.iter_hotel_batches(city, checkin, checkout, locale, filters):
+                if first_result_at is None:
+                    first_result_at = time.perf_counter()
+                hotels.extend(batch)
+                yield batch
             print(f"🏨 Search result: {len(hotels)} hotels found")
 
             if not hotels:
                 self._save_no_results(session_dir, f"No hotels found for {city} on {checkin} to {checkout}")
-                return False
+                return
+
+            # Rank hotels near the neighbourhoods named in the destination answer
+            areas = resolve_neighbourhoods(city, answers.get("destination", ""))
+            if areas:
+                print(f"📍 Ranking by distance to: {', '.join(areas)}")
+                hotels = rank_hotels_by_neighbourhood(hotels, areas)
+
+            # Hotels that similar past travellers got near the top break ranking ties
+            seeds = similar_traveller_hotel_scores(load_similar_travellers(session_dir))
+            for hotel in hotels:
+                if str(hotel.get("hotel_id")) in seeds:
+                    hotel["similar_travellers_score"] = round(seeds[str(hotel["hotel_id"])], 3)
+
+            # Fetch facilities/descriptions for the top-ranked hotels only
+            enricher = HotelDetailsEnricher(self.api_key, self.http)
+            hotels = enricher.enrich(hotels, locale)
+            hotels = rank_by_amenities(hotels, answers.get("amenities_features", ""))
+            self.search_stats["details"] = enricher.stats
+            self.search_stats["api_calls"] = self.search_stats.get("api_calls", 0) + 2 * enricher.stats["fetched"]
+
+            # Time-to-first-result is tracked separately from total search time
+            finished = time.perf_counter()
+            self.search_stats["time_to_first_result_s"] = round(first_result_at - started, 2)
+            self.search_stats["total_search_time_s"] = round(finished - started, 2)
+            print(f"⏱️ First results after {self.search_stats['time_to_first_result_s']}s, "
+                  f"search complete after {self.search_stats['total_search_time_s']}s")
 
             # Save results
-            self._save_results(session_dir, city, checkin, checkout, hotels, locale)
-            return True
+            self._save_results(session_dir, city, checkin, checkout, hotels, locale, filters)
+            self.search_succeeded = True
 
         except Exception as e:
             print(f"❌ Error during hotel search: {str(e)}")
             self._save_no_results(session_dir, f"Error during hotel search: {str(e)}")
-            return False
 
-    def _search_booking_com_with_pagination(self, city: str, checkin: str, checkout: str, locale: str = "en-us") -> List[Dict]:
+    def iter_hotel_batches(self, city: str, checkin: str, checkout: str, locale: str = "en-us",
+                           filters: Optional[Dict[str, Any]] = None) -> Iterator[List[Dict]]:
         """
-        Search Booking.com for hotels using pagination to get more results.
+        Search Booking.com page by page, yielding formatted hotels as each page arrives.
 
         Args:
             city: Destination city
             checkin: Check-in date (YYYY-MM-DD)
             checkout: Check-out date (YYYY-MM-DD)
             locale: Locale code
+            filters: Optional server-side filters from derive_search_filters
 
-        Returns:
-            List[Dict]: List of hotel data (up to 60 hotels)
+        Yields:
+            List[Dict]: Formatted hotels from one results page (up to 60 in total)
         """
         if not self.api_key:
             print("⚠️ No RAPIDAPI_KEY found - cannot search hotels")
-            return []
+            return
+
+        filters = filters or {"applied": False, "categories_filter_ids": BOOKING_CONFIG["baseline_categories_filter"]}
+        baseline_pages = BOOKING_CONFIG["max_pages"]
+        self.search_stats = {
+            "filters_applied": filters["applied"],
+            "categories_filter_ids": filters["categories_filter_ids"],
+            "pages_fetched": 0,
+            "api_calls": 0,
+        }
 
         # Get destination ID
         dest_id = self._get_destination_id(city, locale)
@@ -142,7 +376,7 @@ If anything is unclear or missing, use NONE for that field.
 
         if not dest_id:
             print(f"❌ Could not find destination ID for '{city}'")
-            return []
+            return
 
         # Search hotels with pagination
         url = "https://booking-com.p.rapidapi.com/v1/hotels/search"
@@ -164,13 +398,25 @@ If anything is unclear or missing, use NONE for that field.
             "locale": locale,
             "dest_type": "city",
             "dest_id": dest_id,
-            "categories_filter_ids": "class::2,class::4,free_cancellation::1",
+            "categories_filter_ids": filters["categories_filter_ids"],
             "include_adjacency": "true"
         }
 
+        # Calculate actual nights from our dates
+        try:
+            checkin_dt = datetime.strptime(checkin, '%Y-%m-%d')
+            checkout_dt = datetime.strptime(checkout, '%Y-%m-%d')
+            actual_nights = (checkout_dt - checkin_dt).days
+            print(f"📅 Calculated nights: {actual_nights} ({checkin} to {checkout})")
+        except:
+            actual_nights = 1  # Fallback
+
         # NEW: Paginate through multiple pages
-        all_hotels = []
-        max_pages = 3  # Get up to 60 hotels (3 pages × 20 each)
+        # Filtered results are more relevant, so fewer pages are needed
+        hotels_processed = 0
+        max_hotels = BOOKING_CONFIG["max_hotels"]
+        max_pages = BOOKING_CONFIG["filtered_max_pages"] if filters["applied"] else baseline_pages
+        page_size = BOOKING_CONFIG["page_size"]
 
         print(f"📡 Searching hotels with pagination (up to {max_pages} pages)...")
 
@@ -182,7 +428,9 @@ If anything is unclear or missing, use NONE for that field.
             params["page_number"] = str(page)
 
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=30)
+                self.search_stats["pages_fetched"] += 1
+                self.search_stats["api_calls"] += 1
+                response = self.http.get(url, headers=headers, params=params, timeout=BOOKING_CONFIG["timeout"])
                 print(f"   📡 Page {page} API Response: {response.status_code}")
 
                 if response.status_code == 200:
@@ -194,8 +442,21 @@ If anything is unclear or missing, use NONE for that field.
                         print(f"   📝 No more results on page {page}, stopping pagination")
                         break
 
-                    # Add hotels from this page
-                    all_hotels.extend(page_hotels)
+                    # Format and hand over hotels from this page (up to 60 in total)
+                    batch = [
+                        self._format_hotel(hotel, actual_nights)
+                        for hotel in page_hotels[:max_hotels - hotels_processed]
+                    ]
+                    hotels_processed += len(batch)
+                    if batch:
+                        yield batch
+
+                    # A short page means the filtered result set is exhausted
+                    if len(page_hotels) < page_size:
+                        print(f"   📝 Page {page} was not full, stopping pagination")
+                        break
+                    if hotels_processed >= max_hotels:
+                        break
                 else:
                     print(f"   ❌ Page {page} API Error {response.status_code}: {response.text[:100]}")
                     # Continue to next page on error
@@ -206,62 +467,57 @@ If anything is unclear or missing, use NONE for that field.
                 # Continue to next page on exception
                 continue
 
-        print(f"✅ Pagination complete: {len(all_hotels)} total hotels from {max_pages} pages")
-
-        if not all_hotels:
+        pages_fetched = self.search_stats["pages_fetched"]
+        print(f"✅ Pagination complete: {hotels_processed} total hotels from {pages_fetched} pages "
+              f"({self.search_stats['api_calls']} API calls used)")
+        if filters["applied"]:
+            # Unfiltered results are a superset of the filtered ones, so an unfiltered
+            # search fills whole pages up to the hotel cap; only then is the saving real
+            baseline = min(baseline_pages, -(-max_hotels // page_size))
+            self.search_stats["baseline_pages"] = baseline
+            self.search_stats["pages_saved"] = max(0, baseline - pages_fetched)
+            self.search_stats["calls_saved"] = self.search_stats["pages_saved"]
+            print(f"📉 Saved {self.search_stats['pages_saved']} of the {baseline} pages "
+                  f"an unfiltered search would need")
+
+        if not hotels_processed:
             print("❌ No hotels found across all pages")
-            return []
 
-        # Format hotel data (process up to 60 hotels)
-        hotel_list = []
+    def _format_hotel(self, hotel: Dict, actual_nights: int) -> Dict:
+        """Format a raw Booking.com result using our calculated nights for pricing."""
+        price = hotel.get('min_total_price', 0)
+        api_nights = hotel.get('nights', actual_nights)
 
-        # Calculate actual nights from our dates
-        try:
-            checkin_dt = datetime.strptime(checkin, '%Y-%m-%d')
-            checkout_dt = datetime.strptime(checkout, '%Y-%m-%d')
-            actual_nights = (checkout_dt - checkin_dt).days
-            print(f"📅 Calculated nights: {actual_nights} ({checkin} to {checkout})")
-        except:
-            actual_nights = 1  # Fallback
-
-        # Process all hotels (now up to 60 instead of 40)
-        max_hotels_to_process = min(60, len(all_hotels))
-        print(f"🔢 Processing {max_hotels_to_process} hotels...")
-
-        for hotel in all_hotels[:max_hotels_to_process]:
-            price = hotel.get('min_total_price', 0)
-            api_nights = hotel.get('nights', actual_nights)
-
-            # Use our calculated nights for pricing
-            price_per_night = 0
-            if price and actual_nights:
-                try:
-                    # If API gave us total price for different nights, recalculate
-                    if api_nights and api_nights != actual_nights:
-                        # API price might be for different duration
-                        api_price_per_night = float(price) / api_nights
-                        price_per_night = api_price_per_night
-                        total_price = api_price_per_night * actual_nights
-                    else:
-                        price_per_night = float(price) / actual_nights
-                        total_price = price
-                except:
-                    price_per_night = 0
+        # Use our calculated nights for pricing
+        price_per_night = 0
+        if price and actual_nights:
+            try:
+                # If API gave us total price for different nights, recalculate
+                if api_nights and api_nights != actual_nights:
+                    # API price might be for different duration
+                    api_price_per_night = float(price) / api_nights
+                    price_per_night = api_price_per_night
+                    total_price = api_price_per_night * actual_nights
+                else:
+                    price_per_night = float(price) / actual_nights
                     total_price = price
-            else:
+            except:
+                price_per_night = 0
                 total_price = price
-
-            hotel_list.append({
-                "name": hotel.get('hotel_name', ''),
-                "total_price": total_price,
-                "price_per_night": round(price_per_night, 0) if price_per_night else 0,
-                "currency": hotel.get('currency', 'USD'),
-                "rating": hotel.get('review_score', 0),
-                "nights": actual_nights
-            })
-
-        print(f"🎉 Successfully processed {len(hotel_list)} hotels with pagination!")
-        return hotel_list
+        else:
+            total_price = price
+
+        return {
+            "hotel_id": hotel.get('hotel_id'),
+            "name": hotel.get('hotel_name', ''),
+            "total_price": total_price,
+            "price_per_night": round(price_per_night, 0) if price_per_night else 0,
+            "currency": hotel.get('currency', 'USD'),
+            "rating": hotel.get('review_score', 0),
+            "nights": actual_nights,
+            "latitude": hotel.get('latitude'),
+            "longitude": hotel.get('longitude')
+        }
 
     def _get_destination_id(self, city: str, locale: str = "en-us") -> Optional[str]:
         """Get Booking.com destination ID for city."""
@@ -290,7 +546,8 @@ If anything is unclear or missing, use NONE for that field.
                     "locale": locale
                 }
 
-                response = requests.get(url, headers=headers, params=params, timeout=15)
+                self.search_stats["api_calls"] = self.search_stats.get("api_calls", 0) + 1
+                response = self.http.get(url, headers=headers, params=params, timeout=15)
                 print(f"   Status: {response.status_code}")
 
                 if response.status_code == 200:
@@ -310,8 +567,10 @@ If anything is unclear or missing, use NONE for that field.
 
         return None
 
-    def _save_results(self, session_dir: Path, city: str, checkin: str, checkout: str, hotels: List[Dict], locale: str = "en-us") -> None:
+    def _save_results(self, session_dir: Path, city: str, checkin: str, checkout: str, hotels: List[Dict],
+                      locale: str = "en-us", filters: Optional[Dict[str, Any]] = None) -> None:
         """Save hotel search results."""
+        stats = self.search_stats
 
         # Human-readable text file
         text_file = session_dir / "hotel_results.txt"
@@ -321,6 +580,13 @@ If anything is unclear or missing, use NONE for that field.
             f.write(f"Dates: {checkin} to {checkout}\n")
             f.write(f"Locale: {locale}\n")
             f.write(f"Found: {len(hotels)} hotels (with pagination)\n")
+            if filters and filters.get("applied"):
+                f.write(f"Filters: {filters['categories_filter_ids']}\n")
+            if stats and "baseline_pages" in stats:
+                f.write(f"Pages: {stats.get('pages_fetched', 0)} fetched, "
+                        f"{stats['pages_saved']} saved vs {stats['baseline_pages']}-page unfiltered baseline\n")
+            elif stats:
+                f.write(f"Pages: {stats.get('pages_fetched', 0)} fetched\n")
             f.write("=" * 50 + "\n\n")
 
             for i, hotel in enumerate(hotels, 1):
@@ -335,6 +601,17 @@ If anything is unclear or missing, use NONE for that field.
                     f.write(f"    💰 ${price_per_night:.0f}/night × {nights} nights = ${total_price} total\n")
                 if rating:
                     f.write(f"    ⭐ Rating: {rating}/10\n")
+                if hotel.get('distance_km') is not None:
+                    f.write(f"    📍 {hotel['distance_km']:.1f} km from {hotel['nearest_area']}\n")
+                if hotel.get('matched_amenities'):
+                    f.write(f"    ✅ Has requested: {', '.join(hotel['matched_amenities'])}\n")
+                if hotel.get('facilities'):
+                    f.write(f"    🏷️ Facilities: {', '.join(hotel['facilities'][:12])}\n")
+                if hotel.get('description'):
+                    description = hotel['description']
+                    if len(description) > 300:
+                        description = description[:297] + "..."
+                    f.write(f"    📝 {description}\n")
                 f.write("\n")
 
         # JSON backup for future LLM consumption
@@ -348,6 +625,8 @@ If anything is unclear or missing, use NONE for that field.
                     "locale": locale,
                     "hotels_found": len(hotels),
                     "pagination_used": True,
+                    "filters": filters or {},
+                    "search_stats": stats,
                     "searched_at": datetime.now().isoformat()
                 },
                 "hotels": hotels
@@ -4,13 +4,36 @@ Modified OllamaClient with conversation logging integration
 import json
 import time
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from requests.adapters import HTTPAdapter
 from rich.console import Console
 from rich.panel import Panel
 from rich.status import Status
 
 from config import OLLAMA_CONFIG
 
+# Connection pool shared by every client in the process
+_http = None
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the pooled HTTP session for Ollama requests, creating it if necessary.
+
+    Returns:
+        requests.Session: Session keeping up to OLLAMA_CONFIG["pool_size"] connections alive
+    """
+    global _http
+
+    if _http is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=OLLAMA_CONFIG["pool_size"])
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _http = session
+
+    return _http
+
 
 class OllamaClient:
     """
@@ -29,6 +52,7 @@ class OllamaClient:
         self.timeout = OLLAMA_CONFIG["timeout"]
         self.verbose = verbose
         self.console = Console()
+        self.http = get_http_session()
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None,
                 interaction_type: str = "general", context: Optional[str] = None) -> str:
@@ -76,7 +100,7 @@ class OllamaClient:
                 status.update(status="[bold yellow]Waiting for Ollama response...")
 
                 # Send the request
-                response = requests.post(url, json=payload, timeout=self.timeout)
+                response = self.http.post(url, json=payload, timeout=self.timeout)
                 response.raise_for_status()
 
                 # Process response
@@ -114,6 +138,33 @@ class OllamaClient:
             except requests.exceptions.RequestException as e:
                 raise Exception(f"Error communicating with Ollama: {str(e)}")
 
+    def embed(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """
+        Embed texts with Ollama's /api/embed endpoint in one request.
+
+        Args:
+            texts: Texts to embed
+            model: Embedding model, defaults to OLLAMA_CONFIG["embedding_model"]
+
+        Returns:
+            List[List[float]]: One embedding per text, in order
+        """
+        payload = {
+            "model": model or OLLAMA_CONFIG["embedding_model"],
+            "input": texts,
+        }
+
+        try:
+            response = self.http.post(f"{self.base_url}/api/embed", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            embeddings = response.json().get("embeddings", [])
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Error communicating with Ollama: {str(e)}")
+
+        if len(embeddings) != len(texts):
+            raise Exception(f"Ollama returned {len(embeddings)} embeddings for {len(texts)} texts")
+        return embeddings
+
     def is_server_running(self) -> bool:
         """
         Check if the Ollama server is running.
@@ -123,7 +174,7 @@ class OllamaClient:
         """
         try:
             with self.console.status("[bold blue]Checking Ollama server...", spinner="dots"):
-                response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+                response = self.http.get(f"{self.base_url}/api/tags", timeout=5)
                 running = response.status_code == 200
 
                 if running:
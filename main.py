@@ -3,6 +3,7 @@
 Main entry point for the hotel recommendation system.
 """
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 
 # Add project root to Python path to allow imports from modules
@@ -12,7 +13,6 @@ sys.path.insert(0, str(project_root))
 import click
 from rich.console import Console
 
-from cli.interface import run_cli
 from config import CLI_CONFIG
 
 console = Console()
@@ -29,6 +29,8 @@ def app():
 def interview():
     """Start the hotel preference interview process with conversation logging."""
     console.print("\n[bold green]Starting Hotel Preference Interview[/bold green]")
+    # Imported here so --help, --version and setup don't load the interview stack
+    from cli.interface import run_cli
     try:
         run_cli()
     except KeyboardInterrupt:
@@ -47,5 +49,98 @@ def setup():
     console.print("[green]Setup complete![/green]")
 
 
+@app.group()
+def vectors():
+    """Manage the vector store."""
+    pass
+
+
+@vectors.command()
+@click.option("--type", "quantization", type=click.Choice(["fp16", "int8", "none"]), required=True,
+              help="Scalar quantization for the index (none = float32).")
+@click.option("--keep-full-precision/--no-keep-full-precision", default=True,
+              help="Keep float32 copies on disk to re-rank quantized search results.")
+def quantize(quantization, keep_full_precision):
+    """Migrate the vector index to a scalar-quantized (or full-precision) encoding."""
+    from vector.storage import get_vector_store
+    store = get_vector_store()
+    before = store.index_file()
+    before_bytes = before.stat().st_size if before else 0
+
+    console.print(f"\n[bold green]Re-encoding {store._ntotal()} vectors as {quantization}...[/bold green]")
+    store.requantize(None if quantization == "none" else quantization, keep_full_precision)
+
+    after_bytes = store.index_file().stat().st_size
+    console.print(f"[green]Index size: {before_bytes / 1e6:.1f} MB -> {after_bytes / 1e6:.1f} MB[/green]")
+    if store.full_vectors_path.exists():
+        console.print(f"[dim]Full-precision copies: {store.full_vectors_path.stat().st_size / 1e6:.1f} MB "
+                      f"({store.full_vectors_path})[/dim]")
+
+
+@vectors.command("export-onnx")
+@click.option("--output", type=click.Path(file_okay=False), default=None,
+              help="Target directory (defaults to VECTOR_CONFIG onnx_model_dir).")
+def export_onnx(output):
+    """Export the embedding model to int8 ONNX for the onnx embedding backend (needs PyTorch)."""
+    from vector.onnx_export import export_onnx_model
+    try:
+        export_onnx_model(output)
+    except ValueError as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        sys.exit(1)
+    console.print('[green]Set VECTOR_CONFIG["embedding_backend"] = "onnx" to use it.[/green]')
+
+
+@vectors.command()
+@click.option("--batch-size", default=256, help="Texts embedded and stored per batch.")
+@click.option("--drop-missing", is_flag=True, help="Leave out vectors whose text can't be recovered.")
+def reembed(batch_size, drop_missing):
+    """Re-embed every stored vector with the configured embedding backend."""
+    from vector.reembed import reembed_vector_store
+    try:
+        reembed_vector_store(batch_size=batch_size, drop_missing=drop_missing)
+    except (ValueError, FileExistsError) as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        sys.exit(1)
+
+
+@vectors.command()
+@click.option("--id", "vector_ids", multiple=True, help="Vector ID to delete (repeatable).")
+@click.option("--session", "session_id", default=None, help="Delete all vectors from an interview session.")
+@click.option("--older-than-days", type=int, default=None, help="Delete vectors created more than N days ago.")
+@click.option("--compact/--no-compact", default=False, help="Rebuild the index right away.")
+def delete(vector_ids, session_id, older_than_days, compact):
+    """Delete vectors by ID, session or age."""
+    filters = {}
+    if session_id:
+        filters["session_id"] = session_id
+    if older_than_days is not None:
+        filters["created_before"] = datetime.now() - timedelta(days=older_than_days)
+    if not vector_ids and not filters:
+        raise click.UsageError("Give --id, --session or --older-than-days.")
+
+    from vector.storage import get_vector_store
+    store = get_vector_store()
+    deleted = store.delete(list(vector_ids)) if vector_ids else 0
+    if filters:
+        deleted += store.delete_where(filters)
+    console.print(f"[green]Deleted {deleted} vectors.[/green]")
+
+    if compact:
+        store.compact()
+
+
+@vectors.command()
+def compact():
+    """Apply the retention policy and rebuild the index without deleted vectors."""
+    from vector.storage import get_vector_store
+    store = get_vector_store()
+    deleted = store.apply_retention()
+    if deleted:
+        console.print(f"[yellow]Retention: deleted {deleted} expired vectors.[/yellow]")
+    removed = store.compact()
+    console.print(f"[green]Removed {removed} vectors from the index.[/green]")
+
+
 if __name__ == "__main__":
     app()
@@ -1,7 +1,20 @@
 '''
 Memory management for hotel preference conversations.
 '''
-from .simple_memory_workflow import LLMMemoryWorkflow
-from .llm_conversation_memory import ConversationMemory, get_conversation_memory
+import importlib
+
+# Exports resolve on first access, so importing a light submodule such as
+# memory.similar_travellers doesn't pull in the whole memory workflow
+_EXPORTS = {
+    'LLMMemoryWorkflow': '.simple_memory_workflow',
+    'ConversationMemory': '.llm_conversation_memory',
+    'get_conversation_memory': '.llm_conversation_memory',
+}
 
 __all__ = ['LLMMemoryWorkflow', 'ConversationMemory', 'get_conversation_memory']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
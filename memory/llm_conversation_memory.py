@@ -2,19 +2,28 @@
 LLM-powered conversation memory system that builds context progressively.
 Uses the LLM to understand, synthesize, and evaluate the entire conversation.
 """
+import copy
 import json
+import threading
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_for_futures
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+from config import MEMORY_CONFIG
 from llm.ollama_client import get_ollama_client
 from vector.embeddings import embed_text
-from vector.storage import get_vector_store
 
+# Insight profile fields: single values, and lists merged by union
+PROFILE_SCALAR_FIELDS = ["destination", "trip_type", "budget", "style"]
+PROFILE_LIST_FIELDS = ["amenities", "activities", "requirements", "revealed_preferences", "search_keywords"]
+NOT_SPECIFIED = "Not specified"
 
-@dataclass
+
+@dataclass(slots=True)
 class ConversationTurn:
     """Represents a single turn in the conversation."""
     turn_id: str
@@ -24,7 +33,7 @@ class ConversationTurn:
     raw_answer: str
     final_answer: str
     suggestions_offered: List[str]
-    llm_analysis: Dict[str, Any]  # LLM's analysis of this turn
+    llm_analysis: Dict[str, Any]  # LLM's analysis of this turn (empty until it completes)
 
 
 class ConversationMemory:
@@ -32,21 +41,61 @@ class ConversationMemory:
     Manages conversation memory using LLM for understanding and synthesis.
     """
 
-    def __init__(self, session_id: Optional[str] = None):
+    def __init__(self, session_id: Optional[str] = None, resume: bool = False):
+        """
+        Start a conversation, or resume one from its turn log.
+
+        Args:
+            session_id: Session ID, generated if not given
+            resume: Rebuild history, analyses and insight profile from the session's turn log
+                (no LLM calls, except for analyses that hadn't completed)
+        """
+        from vector.storage import get_vector_store  # faiss is loaded on first use
+
         self.session_id = session_id or str(uuid.uuid4())
         self.conversation_history: List[ConversationTurn] = []
         self.vector_store = get_vector_store()
         self.client = get_ollama_client()
 
+        # One worker: analyses run in turn order, so each sees the earlier turns' results
+        self._analysis_executor: Optional[ThreadPoolExecutor] = None
+        self._pending_analyses: Dict[str, Future] = {}
+        # Turns given up on by wait_for_analyses; their late results are discarded
+        self._abandoned_analyses: Set[str] = set()
+        self._analysis_lock = threading.Lock()
+
+        # Running insight profile, merged after each turn analysis (on the analysis thread)
+        self.insight_profile: Dict[str, Any] = {
+            **{field: NOT_SPECIFIED for field in PROFILE_SCALAR_FIELDS},
+            **{field: [] for field in PROFILE_LIST_FIELDS},
+        }
+        self._profile_snapshots: Dict[str, Dict[str, Any]] = {}  # turn ID -> profile before its merge
+        self._contributing_turns: Set[str] = set()  # turns whose merge changed the profile
+
+        # Append-only JSONL log of turns, analyses and profile merges, written as they happen
+        self.turn_log_path = Path(MEMORY_CONFIG["conversation_dir"]) / f"{self.session_id}.turns.jsonl"
+        self._turn_log = None
+        self._turn_log_mode = 'a' if resume else 'w'
+        self._turn_log_lock = threading.Lock()
+
+        if resume:
+            self._replay_turn_log()
+            for i, turn in enumerate(list(self.conversation_history)):
+                if not turn.llm_analysis:
+                    self._schedule_analysis(turn, self.conversation_history[:i])
+
     def add_turn(self, question_id: str, question_text: str,
                  raw_answer: str, final_answer: str,
                  suggestions_offered: List[str] = None) -> ConversationTurn:
-        """Add a new conversation turn and analyze with LLM."""
+        """
+        Add a new conversation turn and analyze it with the LLM.
 
-        # Get LLM analysis of this turn in context
-        llm_analysis = self._analyze_turn_with_llm(
-            question_id, question_text, final_answer
-        )
+        With MEMORY_CONFIG["async_turn_analysis"] the analysis runs in the
+        background and the turn is returned straight away; its llm_analysis is
+        filled in when the analysis completes (see wait_for_analyses).
+        """
+        # Earlier turns only: the analysis runs after later turns may have been added
+        previous_turns = list(self.conversation_history)
 
         turn = ConversationTurn(
             turn_id=str(uuid.uuid4()),
@@ -56,17 +105,300 @@ class ConversationMemory:
             raw_answer=raw_answer,
             final_answer=final_answer,
             suggestions_offered=suggestions_offered or [],
-            llm_analysis=llm_analysis
+            llm_analysis={}
         )
-
         self.conversation_history.append(turn)
+        self._log_event("turn", **self._turn_record(turn))
+
+        self._schedule_analysis(turn, previous_turns)
         return turn
 
-    def _analyze_turn_with_llm(self, question_id: str, question_text: str,
-                              answer: str) -> Dict[str, Any]:
-        """Use LLM to analyze this turn in conversation context."""
+    def _schedule_analysis(self, turn: ConversationTurn, previous_turns: List[ConversationTurn]) -> None:
+        """Analyze a turn now, or queue it on the analysis thread with MEMORY_CONFIG["async_turn_analysis"]."""
+        if not MEMORY_CONFIG["async_turn_analysis"]:
+            self._analyze_turn(turn, previous_turns)
+            return
 
-        conversation_context = self._build_conversation_context()
+        if self._analysis_executor is None:
+            self._analysis_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="turn-analysis")
+        self._pending_analyses[turn.turn_id] = self._analysis_executor.submit(
+            self._analyze_turn, turn, previous_turns
+        )
+
+    def _analyze_turn(self, turn: ConversationTurn,
+                      previous_turns: List[ConversationTurn]) -> Dict[str, Any]:
+        """Analyze a turn, record the result on it and in the turn log, and merge it into the profile."""
+        analysis = self._analyze_turn_with_llm(
+            turn.question_id, turn.question_text, turn.final_answer, previous_turns
+        )
+        profile = self._merged_profile(turn, analysis)
+
+        with self._analysis_lock:
+            if turn.turn_id in self._abandoned_analyses:
+                return analysis  # timed out in wait_for_analyses, which recorded a fallback
+            turn.llm_analysis = analysis
+            self._log_event("analysis", turn_id=turn.turn_id, llm_analysis=analysis)
+            if profile is not None:
+                self._profile_snapshots[turn.turn_id] = self.insight_profile
+                self._contributing_turns.add(turn.turn_id)
+                self.insight_profile = profile
+                self._log_event("profile", turn_id=turn.turn_id, profile=profile)
+        return analysis
+
+    @staticmethod
+    def _turn_record(turn: ConversationTurn) -> Dict[str, Any]:
+        """JSON-serializable form of a turn."""
+        record = asdict(turn)
+        record["timestamp"] = turn.timestamp.isoformat()
+        return record
+
+    def _log_event(self, event: str, **fields: Any) -> None:
+        """Append one event to the session's turn log."""
+        if not MEMORY_CONFIG["turn_log"]:
+            return
+
+        line = json.dumps({"event": event, **fields}, default=str)
+        try:
+            with self._turn_log_lock:
+                if self._turn_log is None:
+                    self.turn_log_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._turn_log = open(self.turn_log_path, self._turn_log_mode, encoding='utf-8')
+                    self._turn_log_mode = 'a'  # don't truncate if reopened after close()
+                self._turn_log.write(line + "\n")
+                self._turn_log.flush()
+        except OSError as e:
+            print(f"Warning: Could not write turn log: {e}")
+
+    def _replay_turn_log(self) -> None:
+        """Rebuild history, analyses and the insight profile from the turn log."""
+        if not self.turn_log_path.exists():
+            raise FileNotFoundError(f"No turn log for session {self.session_id} at {self.turn_log_path}")
+
+        with open(self.turn_log_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        lines = content.split("\n")
+        if lines[-1]:
+            # Drop a line torn by a crash so appends start on a fresh line
+            with open(self.turn_log_path, 'w', encoding='utf-8') as f:
+                f.write("".join(line + "\n" for line in lines[:-1]))
+        lines = lines[:-1]
+
+        turns: Dict[str, ConversationTurn] = {}
+        for line in lines:
+            record = json.loads(line)
+            event = record.pop("event")
+
+            if event == "turn":
+                record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+                turn = ConversationTurn(**record)
+                turns[turn.turn_id] = turn
+                self.conversation_history.append(turn)
+                continue
+
+            turn = turns.get(record["turn_id"])
+            if turn is None or turn not in self.conversation_history:
+                continue  # events for a turn that was already replaced
+            if event == "analysis":
+                turn.llm_analysis = record["llm_analysis"]
+            elif event == "profile":
+                if record["profile"] != self.insight_profile:
+                    self._contributing_turns.add(turn.turn_id)
+                self._profile_snapshots[turn.turn_id] = self.insight_profile
+                self.insight_profile = record["profile"]
+            elif event == "remove":
+                self.conversation_history.remove(turn)
+                self._restore_profile(turn.turn_id)
+
+    def _merged_profile(self, turn: ConversationTurn, analysis: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Merge a turn's analysis into a copy of the insight profile, resolving conflicting values with the LLM.
+
+        Returns:
+            Optional[Dict[str, Any]]: The merged profile, or None if the analysis changes nothing
+        """
+        if not any(current is turn for current in self.conversation_history):
+            return None  # replaced while it was being analyzed
+        if analysis.get("fallback"):
+            return None  # nothing to merge from a failed or timed-out analysis
+
+        profile = copy.deepcopy(self.insight_profile)
+        updates = analysis.get("profile_updates")
+        updates = dict(updates) if isinstance(updates, dict) else {}
+        updates.setdefault("revealed_preferences", analysis.get("revealed_preferences", []))
+        updates.setdefault("search_keywords", analysis.get("search_keywords", []))
+
+        for field in PROFILE_LIST_FIELDS:
+            values = updates.get(field) or []
+            if isinstance(values, str):
+                values = [values]
+            known = {str(value).strip().lower() for value in profile[field]}
+            for value in values:
+                value = str(value).strip()
+                if value and value.lower() not in known:
+                    profile[field].append(value)
+                    known.add(value.lower())
+
+        conflicts = {}
+        for field in PROFILE_SCALAR_FIELDS:
+            value = updates.get(field)
+            if isinstance(value, list):
+                value = ", ".join(str(item) for item in value)
+            value = str(value).strip() if value else ""
+            if not value or value.lower() == NOT_SPECIFIED.lower():
+                continue
+            current = profile[field]
+            if current == NOT_SPECIFIED:
+                profile[field] = value
+            elif current.lower() != value.lower():
+                conflicts[field] = (current, value)
+
+        if conflicts:
+            profile.update(self._resolve_profile_conflicts(conflicts, turn))
+        return profile if profile != self.insight_profile else None
+
+    def _resolve_profile_conflicts(self, conflicts: Dict[str, Tuple[str, str]],
+                                   turn: ConversationTurn) -> Dict[str, str]:
+        """
+        Ask the LLM to reconcile profile fields the latest answer disagrees with.
+
+        Args:
+            conflicts: Field -> (current value, value from the latest answer)
+            turn: The turn that produced the new values
+
+        Returns:
+            Dict[str, str]: Field -> resolved value (the newer value if the LLM can't help)
+        """
+        conflict_lines = "\n".join(
+            f"- {field}: current \"{current}\", latest answer suggests \"{new}\""
+            for field, (current, new) in conflicts.items()
+        )
+
+        resolution_prompt = f"""
+A traveller's hotel preference profile disagrees with their latest answer.
+
+LATEST ANSWER:
+Question: {turn.question_text}
+Answer: {turn.final_answer}
+
+CONFLICTING FIELDS:
+{conflict_lines}
+
+For each field give the value that best describes the traveller now: keep both if they
+can both apply, take the latest answer if it corrects or refines the earlier one.
+
+Respond with a JSON object mapping each field name to its resolved value, e.g.
+{{"{next(iter(conflicts))}": "resolved value"}}
+"""
+
+        resolved = {field: new for field, (_, new) in conflicts.items()}
+        try:
+            response = self.client.generate(
+                prompt=resolution_prompt,
+                system_prompt="You reconcile hotel preference profiles. Respond with JSON only."
+            )
+            answer = json.loads(response)
+            for field in conflicts:
+                if isinstance(answer.get(field), str) and answer[field].strip():
+                    resolved[field] = answer[field].strip()
+        except json.JSONDecodeError:
+            pass  # keep the latest answer's values
+        except Exception as e:
+            print(f"Warning: Could not resolve profile conflicts with LLM: {e}")
+
+        return resolved
+
+    def _restore_profile(self, turn_id: str) -> None:
+        """Undo a removed turn's merge into the insight profile."""
+        self._contributing_turns.discard(turn_id)
+        snapshot = self._profile_snapshots.pop(turn_id, None)
+        if snapshot is not None:
+            self.insight_profile = snapshot
+
+    def get_insight_profile(self) -> Dict[str, Any]:
+        """Get a copy of the insight profile built so far (after waiting for outstanding analyses)."""
+        self.wait_for_analyses()
+        return copy.deepcopy(self.insight_profile)
+
+    def remove_last_turn(self) -> Optional[ConversationTurn]:
+        """Drop the latest turn (e.g. to replace its answer), cancelling its analysis if not yet started."""
+        if not self.conversation_history:
+            return None
+        turn = self.conversation_history.pop()
+        self._log_event("remove", turn_id=turn.turn_id)
+        future = self._pending_analyses.pop(turn.turn_id, None)
+        if future is not None and future.cancel():
+            return turn
+
+        if self._analysis_executor is not None:
+            # Runs after the turn's own analysis has merged into the profile
+            self._analysis_executor.submit(self._restore_profile, turn.turn_id)
+        else:
+            self._restore_profile(turn.turn_id)
+        return turn
+
+    def wait_for_analyses(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for outstanding turn analyses.
+
+        Args:
+            timeout: Seconds to wait for all of them, defaults to MEMORY_CONFIG["llm_analysis_timeout"]
+
+        Analyses still running at the deadline are abandoned: their turns get a
+        fallback analysis and whatever the LLM returns later is discarded.
+        """
+        timeout = MEMORY_CONFIG["llm_analysis_timeout"] if timeout is None else timeout
+        futures = dict(self._pending_analyses)
+        self._pending_analyses.clear()
+        if not futures:
+            return
+
+        turns = {turn.turn_id: turn for turn in self.conversation_history}
+        _, not_done = wait_for_futures(futures.values(), timeout=timeout)
+
+        for turn_id, future in futures.items():
+            if future in not_done:
+                future.cancel()
+                with self._analysis_lock:
+                    if turn_id in turns and turns[turn_id].llm_analysis:
+                        continue  # recorded while we were getting here
+                    self._abandoned_analyses.add(turn_id)
+                    if turn_id in turns:
+                        print(f"Warning: Turn analysis for {turns[turn_id].question_id} timed out")
+                        turns[turn_id].llm_analysis = self._fallback_analysis(
+                            turns[turn_id].final_answer, "Analysis timed out"
+                        )
+            elif future.exception() is not None:
+                print(f"Warning: Could not analyze turn with LLM: {future.exception()}")
+
+    def close(self) -> None:
+        """Wait for outstanding turn analyses, stop the analysis thread and close the turn log."""
+        self.wait_for_analyses()
+        if self._analysis_executor is not None:
+            # Don't block on abandoned analyses; their results are discarded anyway
+            self._analysis_executor.shutdown(wait=False)
+            self._analysis_executor = None
+        with self._turn_log_lock:
+            if self._turn_log is not None:
+                self._turn_log.close()
+                self._turn_log = None
+
+    @staticmethod
+    def _fallback_analysis(answer: str, reason: str) -> Dict[str, Any]:
+        """Minimal analysis used when the LLM analysis is unavailable."""
+        return {
+            "extracted_info": [answer],
+            "connections": reason,
+            "revealed_preferences": [],
+            "search_keywords": [],
+            "overall_coherence": "Analysis unavailable",
+            "fallback": True
+        }
+
+    def _analyze_turn_with_llm(self, question_id: str, question_text: str, answer: str,
+                              previous_turns: Optional[List[ConversationTurn]] = None) -> Dict[str, Any]:
+        """Use LLM to analyze this turn in the context of the turns before it."""
+
+        conversation_context = self._build_conversation_context(previous_turns)
 
         analysis_prompt = f"""
 Analyze this turn in the hotel preference conversation:
@@ -83,6 +415,7 @@ Please analyze this turn and provide:
 2. How this connects to previous answers
 3. Any preferences or requirements this reveals
 4. Useful keywords or concepts for hotel search
+5. Profile fields this answer settles (leave out fields it says nothing about)
 
 Respond in this JSON format:
 {{
@@ -90,7 +423,16 @@ Respond in this JSON format:
     "connections": "how this relates to previous answers",
     "revealed_preferences": ["preference1", "preference2"],
     "search_keywords": ["keyword1", "keyword2"],
-    "overall_coherence": "assessment of how this fits the conversation"
+    "overall_coherence": "assessment of how this fits the conversation",
+    "profile_updates": {{
+        "destination": "primary location",
+        "trip_type": "type and travelers",
+        "budget": "range and category (budget/mid-range/luxury)",
+        "style": "preferred hotel style",
+        "amenities": ["key", "amenities"],
+        "activities": ["planned", "activities"],
+        "requirements": ["special", "needs"]
+    }}
 }}
 """
 
@@ -123,21 +465,16 @@ real intent and preferences, not just surface details.
 
         except Exception as e:
             print(f"Warning: Could not analyze turn with LLM: {e}")
-            return {
-                "extracted_info": [answer],
-                "connections": "Analysis failed",
-                "revealed_preferences": [],
-                "search_keywords": [],
-                "overall_coherence": "Analysis unavailable"
-            }
-
-    def _build_conversation_context(self) -> str:
-        """Build conversation context for LLM analysis."""
-        if not self.conversation_history:
+            return self._fallback_analysis(answer, "Analysis failed")
+
+    def _build_conversation_context(self, turns: Optional[List[ConversationTurn]] = None) -> str:
+        """Build conversation context for LLM analysis (from the whole history unless turns are given)."""
+        turns = self.conversation_history if turns is None else turns
+        if not turns:
             return "No previous conversation."
 
         context_parts = []
-        for i, turn in enumerate(self.conversation_history, 1):
+        for i, turn in enumerate(turns, 1):
             context_parts.append(f"{i}. Q: {turn.question_text}")
             context_parts.append(f"   A: {turn.final_answer}")
             if turn.llm_analysis.get("extracted_info"):
@@ -314,7 +651,17 @@ considering the conversation context.
             return ["Could you provide a bit more detail?"]
 
     def synthesize_conversation_insights(self) -> Dict[str, Any]:
-        """Use LLM to synthesize insights from the complete conversation."""
+        """
+        Synthesize insights from the complete conversation.
+
+        With MEMORY_CONFIG["incremental_insights"] this is the profile merged
+        turn by turn; the full-conversation LLM synthesis only runs when no
+        turn contributed to it (e.g. every analysis failed).
+        """
+        self.wait_for_analyses()
+
+        if MEMORY_CONFIG["incremental_insights"] and self._contributing_turns:
+            return copy.deepcopy(self.insight_profile)
 
         conversation_summary = self._build_conversation_summary()
 
@@ -400,12 +747,12 @@ Be specific and practical.
 
         return "\n".join(summary_parts)
 
-    def get_conversation_embedding(self) -> Optional[Any]:
-        """Get embedding for the synthesized conversation."""
-        insights = self.synthesize_conversation_insights()
+    def get_conversation_text(self, insights: Optional[Dict[str, Any]] = None) -> str:
+        """Build the text embedded for the conversation (synthesizes insights unless given)."""
+        insights = insights or self.synthesize_conversation_insights()
 
         # Create a rich text summary for embedding
-        embedding_text = f"""
+        return f"""
 Hotel preference conversation summary:
 Destination: {insights.get('destination', 'Not specified')}
 Trip type: {insights.get('trip_type', 'Not specified')}
@@ -419,8 +766,10 @@ Full conversation:
 {self._build_conversation_summary()}
 """
 
+    def get_conversation_embedding(self, insights: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Get embedding for the synthesized conversation (synthesizes insights unless given)."""
         try:
-            return embed_text(embedding_text)
+            return embed_text(self.get_conversation_text(insights))
         except Exception as e:
             print(f"Warning: Could not embed conversation: {e}")
             return None
@@ -438,15 +787,11 @@ Full conversation:
         conversation_data = {
             "session_id": self.session_id,
             "timestamp": datetime.now().isoformat(),
-            "conversation_history": [asdict(turn) for turn in self.conversation_history],
+            "conversation_history": [self._turn_record(turn) for turn in self.conversation_history],
             "final_insights": final_insights,
             "conversation_summary": self._build_conversation_summary()
         }
 
-        # Convert datetime objects to strings for JSON serialization
-        for turn in conversation_data["conversation_history"]:
-            turn["timestamp"] = turn["timestamp"].isoformat()
-
         with open(file_path, 'w') as f:
             json.dump(conversation_data, f, indent=2, default=str)
 
@@ -472,35 +817,60 @@ def start_new_conversation(session_id: Optional[str] = None) -> ConversationMemo
     return _current_conversation
 
 
-def end_conversation() -> Optional[Path]:
-    """End current conversation and save it."""
+def resume_conversation(session_id: str) -> ConversationMemory:
+    """
+    Resume a conversation from its turn log (e.g. after a crash mid-interview).
+
+    Args:
+        session_id: Session ID of the interrupted conversation
+
+    Returns:
+        ConversationMemory: The rebuilt conversation, now the current one
+    """
+    global _current_conversation
+    _current_conversation = ConversationMemory(session_id, resume=True)
+    return _current_conversation
+
+
+def end_conversation(store_embedding: bool = True) -> Optional[Path]:
+    """
+    End current conversation and save it.
+
+    Args:
+        store_embedding: Also store the conversation vector for similar-traveller lookups
+            (callers that already stored it pass False)
+    """
     global _current_conversation
     if _current_conversation is None:
         return None
 
-    # Save conversation
+    # Save conversation (waits for outstanding turn analyses)
     file_path = _current_conversation.save_conversation()
 
     # Store as vector for future similarity search
-    embedding = _current_conversation.get_conversation_embedding()
+    insights = _current_conversation.synthesize_conversation_insights() if store_embedding else {}
+    embedding = _current_conversation.get_conversation_embedding(insights) if store_embedding else None
     if embedding is not None:
-        insights = _current_conversation.synthesize_conversation_insights()
         metadata = {
             "session_id": _current_conversation.session_id,
+            "type": "conversation",
             "conversation_type": "hotel_preference_interview",
             "destination": insights.get("destination"),
             "trip_type": insights.get("trip_type"),
             "budget": insights.get("budget"),
+            "text": _current_conversation.get_conversation_text(insights),
             "timestamp": datetime.now().isoformat()
         }
 
         try:
+            from vector.storage import get_vector_store
             vector_store = get_vector_store()
             vector_store.store(embedding, metadata)
         except Exception as e:
             print(f"Warning: Could not store conversation vector: {e}")
 
     # Clear current conversation
+    _current_conversation.close()
     _current_conversation = None
 
     return file_path
@@ -0,0 +1,219 @@
+"""
+"Similar travellers" lookup over stored conversation vectors.
+Finds the nearest past interviews and gathers what came of them (destination,
+top-ranked hotels, Claude's summary) from their session directories.
+"""
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from config import DATA_DIR, SIMILAR_TRAVELLERS_CONFIG
+
+SIMILAR_TRAVELLERS_FILE = "similar_travellers.json"
+
+# Session outcomes keyed by directory, reused while their files are unchanged
+_outcome_cache: Dict[str, Tuple[Tuple[float, float], Dict[str, Any]]] = {}
+
+
+def _session_dir(metadata: Dict[str, Any]) -> Optional[Path]:
+    """Locate the session directory of a stored conversation vector."""
+    if metadata.get("session_dir"):
+        return Path(metadata["session_dir"])
+    if metadata.get("session_id"):
+        candidate = Path(DATA_DIR) / "sessions" / metadata["session_id"]
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _mtime(path: Path) -> float:
+    """Modification time of a file, 0 if it doesn't exist."""
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def load_session_outcome(session_dir: Path) -> Dict[str, Any]:
+    """
+    Load the destination, top hotels and Claude summary of a past session.
+
+    Args:
+        session_dir: Path to the session directory
+
+    Returns:
+        Dict[str, Any]: destination, dates, hotels and claude_summary (missing parts are empty)
+    """
+    hotel_data_file = session_dir / "hotel_data.json"
+    analysis_file = session_dir / "claude_analysis.json"
+    signature = (_mtime(hotel_data_file), _mtime(analysis_file))
+
+    cached = _outcome_cache.get(str(session_dir))
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    outcome = {"destination": None, "dates": None, "hotels": [], "claude_summary": ""}
+
+    if signature[0]:
+        try:
+            with open(hotel_data_file, 'r', encoding='utf-8') as f:
+                hotel_data = json.load(f)
+            search_info = hotel_data.get("search_info", {})
+            outcome["destination"] = search_info.get("city")
+            outcome["dates"] = f"{search_info.get('checkin')} to {search_info.get('checkout')}"
+            outcome["hotels"] = [
+                {
+                    "hotel_id": hotel.get("hotel_id"),
+                    "name": hotel.get("name"),
+                    "price_per_night": hotel.get("price_per_night"),
+                    "currency": hotel.get("currency"),
+                    "rating": hotel.get("rating"),
+                }
+                for hotel in hotel_data.get("hotels", [])[:SIMILAR_TRAVELLERS_CONFIG["hotels_per_session"]]
+            ]
+        except Exception as e:
+            print(f"Warning: Could not read {hotel_data_file}: {e}")
+
+    if signature[1]:
+        try:
+            with open(analysis_file, 'r', encoding='utf-8') as f:
+                analysis = json.load(f).get("analysis", "")
+            outcome["claude_summary"] = analysis[:SIMILAR_TRAVELLERS_CONFIG["summary_chars"]].strip()
+        except Exception as e:
+            print(f"Warning: Could not read {analysis_file}: {e}")
+
+    _outcome_cache[str(session_dir)] = (signature, outcome)
+    return outcome
+
+
+def find_similar_travellers(conversation_embedding: np.ndarray, top_k: Optional[int] = None,
+                            exclude_session_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Find past sessions whose conversations are closest to this one.
+
+    Args:
+        conversation_embedding: Embedding of the finished conversation
+        top_k: Number of sessions to return, defaults to SIMILAR_TRAVELLERS_CONFIG
+        exclude_session_id: Session to leave out (usually the current one)
+
+    Returns:
+        Dict[str, Any]: travellers (session_id, similarity, destination, dates, hotels,
+        claude_summary) most similar first, and elapsed_ms for the lookup
+    """
+    from vector.storage import search_vectors  # faiss is loaded on first use
+
+    started = time.perf_counter()
+    top_k = top_k or SIMILAR_TRAVELLERS_CONFIG["top_k"]
+
+    # Only conversation-level vectors; one extra in case the current session is among them
+    hits = search_vectors(conversation_embedding, top_k + 1, filters={"type": "conversation"})
+
+    travellers = []
+    for vector_id, similarity, metadata in hits:
+        session_id = metadata.get("session_id")
+        if exclude_session_id and session_id == exclude_session_id:
+            continue
+        if similarity < SIMILAR_TRAVELLERS_CONFIG["min_similarity"]:
+            break
+
+        session_dir = _session_dir(metadata)
+        outcome = load_session_outcome(session_dir) if session_dir else {}
+        travellers.append({
+            "session_id": session_id,
+            "similarity": round(similarity, 3),
+            "destination": outcome.get("destination") or metadata.get("destination"),
+            "dates": outcome.get("dates"),
+            "hotels": outcome.get("hotels", []),
+            "claude_summary": outcome.get("claude_summary", ""),
+        })
+        if len(travellers) == top_k:
+            break
+
+    return {
+        "travellers": travellers,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def save_similar_travellers(session_dir: Path, result: Dict[str, Any]) -> None:
+    """
+    Save a lookup result to the session directory for hotel ranking and Claude analysis.
+
+    Args:
+        session_dir: Path to the session directory
+        result: Result of find_similar_travellers
+    """
+    try:
+        with open(Path(session_dir) / SIMILAR_TRAVELLERS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, default=str)
+    except Exception as e:
+        print(f"Warning: Could not save similar travellers: {e}")
+
+
+def load_similar_travellers(session_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Load the similar travellers saved for a session.
+
+    Args:
+        session_dir: Path to the session directory
+
+    Returns:
+        List[Dict[str, Any]]: Similar travellers, empty if none were saved
+    """
+    travellers_file = Path(session_dir) / SIMILAR_TRAVELLERS_FILE
+    if not travellers_file.exists():
+        return []
+    try:
+        with open(travellers_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get("travellers", [])
+    except Exception as e:
+        print(f"Warning: Could not load similar travellers: {e}")
+        return []
+
+
+def similar_traveller_hotel_scores(travellers: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Score hotels by how similar the travellers were who got them near the top.
+
+    Args:
+        travellers: Similar travellers from find_similar_travellers
+
+    Returns:
+        Dict[str, float]: Hotel ID (as a string) -> summed similarity
+    """
+    scores: Dict[str, float] = {}
+    for traveller in travellers:
+        for hotel in traveller.get("hotels", []):
+            if hotel.get("hotel_id") is not None:
+                key = str(hotel["hotel_id"])
+                scores[key] = scores.get(key, 0.0) + traveller.get("similarity", 0.0)
+    return scores
+
+
+def format_similar_travellers(travellers: List[Dict[str, Any]]) -> str:
+    """
+    Format similar travellers as a prompt section.
+
+    Args:
+        travellers: Similar travellers from find_similar_travellers
+
+    Returns:
+        str: Readable summary, empty if there are none
+    """
+    if not travellers:
+        return ""
+
+    lines = []
+    for i, traveller in enumerate(travellers, 1):
+        lines.append(f"{i}. Similarity {traveller.get('similarity')}: "
+                     f"{traveller.get('destination') or 'Unknown destination'}"
+                     f"{' (' + traveller['dates'] + ')' if traveller.get('dates') else ''}")
+        hotel_names = [hotel.get("name") for hotel in traveller.get("hotels", []) if hotel.get("name")]
+        if hotel_names:
+            lines.append(f"   Top hotels: {', '.join(hotel_names)}")
+        if traveller.get("claude_summary"):
+            lines.append(f"   Earlier analysis: {' '.join(traveller['claude_summary'].split())}")
+    return "\n".join(lines)
@@ -7,10 +7,11 @@ from questions.question_bank import get_questions
 from memory.llm_conversation_memory import (
     get_conversation_memory,
     start_new_conversation,
+    resume_conversation,
     end_conversation
 )
 from vector.embeddings import embed_text
-from vector.storage import store_vector
+from memory.similar_travellers import find_similar_travellers
 
 
 class LLMMemoryWorkflow:
@@ -18,11 +19,13 @@ class LLMMemoryWorkflow:
     Simple workflow that uses LLM for all understanding and memory.
     """
 
-    def __init__(self, session_id: str = None):
-        """Initialize with LLM-powered conversation memory."""
+    def __init__(self, session_id: str = None, resume: bool = False):
+        """Initialize with LLM-powered conversation memory (resumed from its turn log with resume)."""
         self.questions = get_questions()
-        self.memory = start_new_conversation(session_id)
-        self.suggestion_count = {}  # Track suggestions per question
+        self.memory = resume_conversation(session_id) if resume else start_new_conversation(session_id)
+        self.suggestion_count = {  # Track suggestions per question
+            turn.question_id: 1 for turn in self.memory.conversation_history if turn.suggestions_offered
+        }
 
     def validate_answer(self, question_id: str, question_text: str,
                        answer: str) -> Tuple[str, List[Dict[str, str]]]:
@@ -53,7 +56,7 @@ class LLMMemoryWorkflow:
             except Exception as e:
                 print(f"Warning: Could not generate suggestions: {e}")
 
-        # Add this turn to conversation memory (let LLM analyze it)
+        # Add this turn to conversation memory (the LLM analyzes it in the background)
         self.memory.add_turn(
             question_id=question_id,
             question_text=question_text,
@@ -72,7 +75,7 @@ class LLMMemoryWorkflow:
         # Replace the last turn with the improved answer
         if self.memory.conversation_history and self.memory.conversation_history[-1].question_id == question_id:
             # Remove the last turn and add updated one
-            self.memory.conversation_history.pop()
+            self.memory.remove_last_turn()
 
         # Add the improved answer (no suggestions this time)
         self.memory.add_turn(
@@ -95,24 +98,40 @@ class LLMMemoryWorkflow:
         """
         Process the completed conversation using LLM insights.
         """
+        # Turn analyses run in the background while the interview goes on; collect them first
+        self.memory.wait_for_analyses()
+
         # Get LLM synthesis of the conversation
         insights = self.memory.synthesize_conversation_insights()
 
         # Get conversation embedding
-        conversation_embedding = self.memory.get_conversation_embedding()
+        conversation_embedding = self.memory.get_conversation_embedding(insights)
 
-        # Store conversation vector if embedding successful
+        # Find similar past travellers, then store this conversation vector for future lookups
         conversation_vector_id = None
+        similar_travellers = {"travellers": [], "elapsed_ms": 0.0}
         if conversation_embedding is not None:
             try:
+                similar_travellers = find_similar_travellers(
+                    conversation_embedding, exclude_session_id=self.memory.session_id
+                )
+            except Exception as e:
+                print(f"Warning: Could not look up similar travellers: {e}")
+
+            try:
+                from vector.storage import store_vector  # faiss is loaded on first use
+
                 metadata = {
-                    "session_id": self.memory.session_id,
+                    "type": "conversation",
                     "conversation_type": "hotel_preference_interview",
                     "destination": insights.get("destination"),
                     "trip_type": insights.get("trip_type"),
-                    "budget": insights.get("budget")
+                    "budget": insights.get("budget"),
+                    "text": self.memory.get_conversation_text(insights),
                 }
-                conversation_vector_id = store_vector("conversation", conversation_embedding)
+                conversation_vector_id = store_vector(
+                    "conversation", conversation_embedding, self.memory.session_id, metadata=metadata
+                )
             except Exception as e:
                 print(f"Warning: Could not store conversation vector: {e}")
 
@@ -133,6 +152,9 @@ class LLMMemoryWorkflow:
             "conversation_embedding": conversation_embedding,
             "conversation_vector_id": conversation_vector_id,
 
+            # Nearest past sessions: destinations, top hotels and earlier analyses
+            "similar_travellers": similar_travellers,
+
             # Full conversation for reference
             "conversation_summary": self.memory._build_conversation_summary(),
 
@@ -156,7 +178,8 @@ class LLMMemoryWorkflow:
 
         # Save conversation to disk
         try:
-            conversation_file = end_conversation()
+            # The conversation vector is already stored above
+            conversation_file = end_conversation(store_embedding=False)
             if conversation_file:
                 processed_data["conversation_file"] = str(conversation_file)
         except Exception as e:
@@ -179,6 +202,11 @@ def create_llm_workflow(session_id: str = None) -> LLMMemoryWorkflow:
     return LLMMemoryWorkflow(session_id)
 
 
+def resume_llm_workflow(session_id: str) -> LLMMemoryWorkflow:
+    """Resume an interrupted LLM-powered workflow from its turn log."""
+    return LLMMemoryWorkflow(session_id, resume=True)
+
+
 def analyze_saved_conversation(conversation_file: str) -> Dict[str, Any]:
     """
     Analyze a saved conversation file.
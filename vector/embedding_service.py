@@ -0,0 +1,272 @@
+"""
+Embedding worker pool for server deployments.
+
+A few worker processes each hold one copy of the embedding model; callers in
+any thread submit texts to a dispatcher, which merges concurrent requests
+arriving within a short window into one batch. Model inference then runs
+outside this process's GIL and each model is loaded once per worker rather
+than once per session.
+"""
+import atexit
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from config import VECTOR_CONFIG
+
+
+def _worker(backend: str, config_overrides: Dict, requests: multiprocessing.Queue,
+            results: multiprocessing.Queue) -> None:
+    """Worker process: load the model once, then encode batches until told to stop."""
+    VECTOR_CONFIG.update(config_overrides)
+    from vector.embeddings import load_embedding_model
+
+    try:
+        model = load_embedding_model(backend)
+    except Exception as e:
+        results.put((None, None, f"Could not load embedding model: {e}"))
+        return
+    results.put((None, None, None))
+
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        batch_id, texts = item
+        try:
+            embeddings = np.asarray(model.encode(texts, normalize_embeddings=True), dtype='float32')
+            results.put((batch_id, embeddings, None))
+        except Exception as e:
+            results.put((batch_id, None, str(e)))
+
+
+class EmbeddingService:
+    """
+    Process pool serving embeddings, with the same encode() interface as the models.
+    """
+
+    def __init__(self, workers: int = 2, batch_window_ms: float = 5.0, max_batch: int = 64,
+                 timeout: float = 60.0, backend: Optional[str] = None):
+        """
+        Start the worker processes and the dispatcher and collector threads.
+
+        Args:
+            workers: Number of worker processes (each loads its own model)
+            batch_window_ms: How long the dispatcher waits for more requests to merge
+            max_batch: Maximum texts per merged batch
+            timeout: Seconds a caller waits for its embeddings
+            backend: Embedding backend, defaults to VECTOR_CONFIG["embedding_backend"]
+        """
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.stats = {"requests": 0, "batches": 0, "texts": 0}
+
+        # spawn: don't fork a process that already runs threads (or holds a torch model)
+        context = multiprocessing.get_context("spawn")
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        config_overrides = {key: VECTOR_CONFIG[key] for key in ("embedding_model", "vector_dimension",
+                                                                "onnx_model_dir", "onnx_threads")}
+        self._workers = [
+            context.Process(target=_worker, name=f"embedding-worker-{i}", daemon=True,
+                            args=(backend or VECTOR_CONFIG["embedding_backend"], config_overrides,
+                                  self._requests, self._results))
+            for i in range(workers)
+        ]
+        for process in self._workers:
+            process.start()
+
+        # Caller requests waiting to be merged, and merged batches waiting for a worker
+        self._pending: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._in_flight: Dict[int, List[Tuple[Future, List[int]]]] = {}
+        self._in_flight_lock = threading.Lock()
+        self._batch_ids = itertools.count()
+        # Set once a worker is ready or every worker has failed
+        self._ready = threading.Event()
+        self._settled = threading.Event()
+        self._failed_workers = 0
+        self._error: Optional[str] = None
+        self._closed = False
+
+        self._collector = threading.Thread(target=self._collect, name="embedding-service-collector", daemon=True)
+        self._collector.start()
+        threading.Thread(target=self._dispatch, name="embedding-service-dispatcher", daemon=True).start()
+        atexit.register(self.close)
+
+    def encode(self, texts: Union[str, List[str]], normalize_embeddings: bool = True) -> np.ndarray:
+        """
+        Embed one text or a list of texts on the worker pool.
+
+        Args:
+            texts: Text or list of texts
+            normalize_embeddings: Accepted for interface compatibility; workers always normalize
+
+        Returns:
+            np.ndarray: One vector for a single text, otherwise a matrix
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return np.empty((0, VECTOR_CONFIG["vector_dimension"]), dtype='float32')
+
+        future = self.submit(texts)
+        embeddings = future.result(timeout=self.timeout)
+        return embeddings[0] if single else embeddings
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for the next merged batch.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Future: Resolves to the embedding matrix for the texts, in order
+        """
+        if self._closed:
+            raise RuntimeError("Embedding service is closed")
+        if self._error:
+            raise RuntimeError(self._error)
+
+        future = Future()
+        self._pending.put((list(texts), future))
+        return future
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until at least one worker has loaded its model (or all have failed).
+
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            bool: True if a worker is ready
+        """
+        self._settled.wait(timeout)
+        return self._ready.is_set()
+
+    def _dispatch(self) -> None:
+        """Merge requests that arrive within the batching window and hand them to the workers."""
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+
+            requests = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self.batch_window
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._pending.put(None)
+                    break
+                requests.append(item)
+                size += len(item[0])
+
+            # One row per distinct text; each caller keeps the row indices of its own texts
+            rows: Dict[str, int] = {}
+            waiters = []
+            for texts, future in requests:
+                waiters.append((future, [rows.setdefault(text, len(rows)) for text in texts]))
+
+            if self._error:
+                for future, _ in waiters:
+                    future.set_exception(RuntimeError(self._error))
+                continue
+
+            batch_id = next(self._batch_ids)
+            with self._in_flight_lock:
+                self._in_flight[batch_id] = waiters
+                self.stats["requests"] += len(requests)
+                self.stats["batches"] += 1
+                self.stats["texts"] += len(rows)
+            self._requests.put((batch_id, list(rows)))
+
+    def _collect(self) -> None:
+        """Resolve callers' futures as the workers return batches."""
+        while True:
+            try:
+                batch_id, embeddings, error = self._results.get(timeout=1)
+            except queue.Empty:
+                if not self._closed and not any(process.is_alive() for process in self._workers):
+                    self._fail_all("Embedding workers exited")
+                    return
+                continue
+
+            if batch_id is None:
+                # Worker start-up report
+                if error:
+                    self._failed_workers += 1
+                    print(f"Warning: {error}")
+                    if self._failed_workers == len(self._workers):
+                        self._fail_all(error)
+                        return
+                else:
+                    self._ready.set()
+                    self._settled.set()
+                continue
+            if batch_id == -1:
+                return
+
+            with self._in_flight_lock:
+                waiters = self._in_flight.pop(batch_id, [])
+            for future, indices in waiters:
+                if error:
+                    future.set_exception(RuntimeError(f"Embedding worker failed: {error}"))
+                else:
+                    future.set_result(embeddings[indices])
+
+    def _fail_all(self, error: str) -> None:
+        """Fail every waiting and future caller (no worker is left to serve them)."""
+        self._error = error
+        self._settled.set()
+        with self._in_flight_lock:
+            waiters = [waiter for batch in self._in_flight.values() for waiter in batch]
+            self._in_flight.clear()
+        for future, _ in waiters:
+            future.set_exception(RuntimeError(error))
+
+    def close(self) -> None:
+        """Stop the dispatcher, the workers and the collector."""
+        if self._closed:
+            return
+        self._closed = True
+
+        self._pending.put(None)
+        for _ in self._workers:
+            self._requests.put(None)
+        for process in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._results.put((-1, None, None))
+        self._collector.join(timeout=5)
+
+
+def create_embedding_service() -> EmbeddingService:
+    """
+    Start an embedding service configured from VECTOR_CONFIG["embedding_service"].
+
+    Returns:
+        EmbeddingService: The running service
+    """
+    service_config = VECTOR_CONFIG["embedding_service"]
+    return EmbeddingService(
+        workers=service_config["workers"],
+        batch_window_ms=service_config["batch_window_ms"],
+        max_batch=service_config["max_batch"],
+        timeout=service_config["timeout_seconds"],
+    )
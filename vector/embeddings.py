@@ -1,32 +1,438 @@
 """
 Text embedding functionality for the hotel recommendation system.
+
+Embeddings are cached per (model, normalized text) in two levels: an
+in-process LRU in front of a SQLite store of raw float32 blobs shared by all
+processes, so replays and re-analyses don't re-run the model.
+
+sentence_transformers (and torch) are only imported when the model is first
+needed; preload_embedding_model() does that in a background thread. With
+VECTOR_CONFIG["embedding_backend"] = "onnx" an int8-quantized ONNX export of
+the same model runs on ONNX Runtime instead, without PyTorch; with "ollama"
+the embeddings come from the Ollama server, so interview processes share its
+resident model instead of loading their own. With
+VECTOR_CONFIG["embedding_service"]["workers"] set, the model runs in a pool
+of worker processes (vector.embedding_service) and this module is its client.
 """
+import json
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+
 import numpy as np
-from typing import Dict, List, Union
-from sentence_transformers import SentenceTransformer
 
-from config import VECTOR_CONFIG
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+from config import OLLAMA_CONFIG, VECTOR_CONFIG
+
+# Files of an exported ONNX model (see vector.onnx_export)
+ONNX_MODEL_FILE = "model.int8.onnx"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+ONNX_MANIFEST_FILE = "manifest.json"
+
+# SQLite's default limit on bound parameters per statement
+SQLITE_MAX_PARAMS = 999
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+"""
 
 # Initialize the embedding model (lazy loading)
 _model = None
+_model_lock = threading.Lock()
+_cache = None
 
 
-def get_embedding_model() -> SentenceTransformer:
+def normalize_text(text: str) -> str:
     """
-    Get the embedding model, loading it if necessary.
+    Normalize text before embedding and caching: Unicode NFC, trimmed,
+    whitespace runs collapsed to single spaces.
+
+    Args:
+        text: Raw text
 
     Returns:
-        SentenceTransformer: The sentence transformer model
+        str: Normalized text
+    """
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def text_hash(text: str) -> bytes:
+    """SHA-256 digest of already-normalized text."""
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache keyed by (model name, normalized text hash).
+    """
+
+    def __init__(self, db_file: Optional[Path] = None, memory_entries: int = 10_000,
+                 busy_timeout: float = 30.0):
+        """
+        Open the cache, creating the on-disk store if needed.
+
+        Args:
+            db_file: Path to the SQLite store, or None for a memory-only cache
+            memory_entries: Maximum vectors held in the in-process LRU
+            busy_timeout: Seconds to wait on another process's write lock
+        """
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        self._conn = None
+        if db_file is not None:
+            try:
+                Path(db_file).parent.mkdir(exist_ok=True, parents=True)
+                self._conn = sqlite3.connect(str(db_file), timeout=busy_timeout, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.executescript(CACHE_SCHEMA)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: Embedding cache store unavailable, using memory only: {e}")
+                self._conn = None
+
+    def get_many(self, model: str, hashes: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Look up many embeddings, memory first, then one query per chunk against disk.
+
+        Args:
+            model: Embedding model name
+            hashes: Unique text hashes
+
+        Returns:
+            Dict[bytes, np.ndarray]: Cached vectors for the hashes that were found
+        """
+        found = {}
+        with self._lock:
+            for digest in hashes:
+                vector = self._memory.get((model, digest))
+                if vector is not None:
+                    self._memory.move_to_end((model, digest))
+                    found[digest] = vector
+            self.stats["memory_hits"] += len(found)
+
+            missing = [digest for digest in hashes if digest not in found]
+            if missing and self._conn is not None:
+                try:
+                    for start in range(0, len(missing), SQLITE_MAX_PARAMS - 1):
+                        chunk = missing[start:start + SQLITE_MAX_PARAMS - 1]
+                        rows = self._conn.execute(
+                            f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                            f"AND text_hash IN ({', '.join('?' * len(chunk))})",
+                            [model, *chunk]
+                        ).fetchall()
+                        for digest, blob in rows:
+                            vector = np.frombuffer(blob, dtype='float32')
+                            found[digest] = vector
+                            self._remember(model, digest, vector)
+                            self.stats["disk_hits"] += 1
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not read embedding cache: {e}")
+
+            self.stats["misses"] += len(hashes) - len(found)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[bytes, np.ndarray]) -> None:
+        """
+        Store new embeddings in both levels (one disk transaction).
+
+        Args:
+            model: Embedding model name
+            vectors: Text hash -> vector
+        """
+        entries = {digest: np.asarray(vector, dtype='float32') for digest, vector in vectors.items()}
+        with self._lock:
+            for digest, vector in entries.items():
+                self._remember(model, digest, vector)
+
+            if self._conn is not None:
+                try:
+                    with self._conn:
+                        self._conn.executemany(
+                            "INSERT OR IGNORE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                            ((model, digest, vector.tobytes()) for digest, vector in entries.items())
+                        )
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not write embedding cache: {e}")
+
+    def _remember(self, model: str, digest: bytes, vector: np.ndarray) -> None:
+        """Add a vector to the LRU, evicting the least recently used (caller holds the lock)."""
+        vector.setflags(write=False)
+        self._memory[(model, digest)] = vector
+        self._memory.move_to_end((model, digest))
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def close(self) -> None:
+        """Close the on-disk store."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class OnnxEmbedder:
+    """
+    Sentence embeddings from an int8 ONNX export of the sentence-transformers model.
+
+    Reproduces the model's pipeline (tokenize, transformer, mean pooling over
+    the attention mask, L2 normalization) on ONNX Runtime, with the same
+    encode() interface as SentenceTransformer.
+    """
+
+    def __init__(self, model_dir: Path, threads: int = 0, batch_size: int = 32, validated: bool = True):
+        """
+        Load the exported model and tokenizer.
+
+        Args:
+            model_dir: Directory written by vector.onnx_export.export_onnx_model
+            threads: Intra-op threads (0 = ONNX Runtime default)
+            batch_size: Texts per inference call
+            validated: Refuse a model whose export validation is missing or outside
+                VECTOR_CONFIG["onnx_cosine_tolerance"] (False only while validating an export)
+        """
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The onnx embedding backend needs the onnxruntime and tokenizers packages") from e
+
+        model_dir = Path(model_dir)
+        if not (model_dir / ONNX_MODEL_FILE).exists():
+            raise FileNotFoundError(f"No ONNX model in {model_dir}; run `python main.py vectors export-onnx`")
+
+        with open(model_dir / ONNX_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest["dimension"] != VECTOR_CONFIG["vector_dimension"]:
+            raise ValueError(f"ONNX model produces {self.manifest['dimension']}-d embeddings, "
+                             f"but vector_dimension is {VECTOR_CONFIG['vector_dimension']}")
+        min_cosine = 1 - VECTOR_CONFIG["onnx_cosine_tolerance"]
+        if validated and self.manifest.get("min_cosine", -1.0) < min_cosine:
+            raise ValueError(f"ONNX model in {model_dir} did not pass validation against the PyTorch model "
+                             f"(min cosine {self.manifest.get('min_cosine', 'missing')}, need {min_cosine:.4f}); "
+                             f"run `python main.py vectors export-onnx` again")
+
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(str(model_dir / ONNX_TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.manifest["max_length"])
+        self.tokenizer.enable_padding(pad_id=self.manifest.get("pad_id", 0))
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(str(model_dir / ONNX_MODEL_FILE), options,
+                                                    providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, texts: Union[str, List[str]], normalize_embeddings: bool = True) -> np.ndarray:
+        """
+        Embed one text or a list of texts.
+
+        Args:
+            texts: Text or list of texts
+            normalize_embeddings: L2-normalize the embeddings
+
+        Returns:
+            np.ndarray: One vector for a single text, otherwise a matrix
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + self.batch_size])
+            input_ids = np.array([encoding.ids for encoding in encodings], dtype='int64')
+            attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype='int64')
+            inputs = {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": np.zeros_like(input_ids),
+            }
+            token_embeddings = self.session.run(None, {name: value for name, value in inputs.items()
+                                                       if name in self.input_names})[0]
+
+            # Mean pooling over real tokens
+            mask = attention_mask[:, :, None].astype('float32')
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled.astype('float32'))
+
+        embeddings = np.concatenate(batches) if batches else np.empty((0, self.manifest["dimension"]), dtype='float32')
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+class OllamaEmbedder:
+    """
+    Sentence embeddings from Ollama's /api/embed endpoint, with the same
+    encode() interface as SentenceTransformer.
+    """
+
+    def __init__(self, model: Optional[str] = None, batch_size: Optional[int] = None):
+        """
+        Connect to Ollama and check the model's embedding dimension.
+
+        Args:
+            model: Ollama embedding model, defaults to OLLAMA_CONFIG["embedding_model"]
+            batch_size: Texts per request, defaults to OLLAMA_CONFIG["embed_batch_size"]
+        """
+        from llm.ollama_client import OllamaClient
+
+        self.model = model or OLLAMA_CONFIG["embedding_model"]
+        self.batch_size = batch_size or OLLAMA_CONFIG["embed_batch_size"]
+        self.client = OllamaClient(verbose=False)
+
+        # Vectors of another size can't go into the index
+        dimension = len(self.client.embed(["dimension check"], self.model)[0])
+        if dimension != VECTOR_CONFIG["vector_dimension"]:
+            raise ValueError(f"Ollama model {self.model} produces {dimension}-d embeddings, but vector_dimension "
+                             f"is {VECTOR_CONFIG['vector_dimension']}; set vector_dimension and run "
+                             f"`python main.py vectors reembed`")
+
+    def encode(self, texts: Union[str, List[str]], normalize_embeddings: bool = True) -> np.ndarray:
+        """
+        Embed one text or a list of texts, batch_size texts per request.
+
+        Args:
+            texts: Text or list of texts
+            normalize_embeddings: L2-normalize the embeddings
+
+        Returns:
+            np.ndarray: One vector for a single text, otherwise a matrix
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            rows.extend(self.client.embed(texts[start:start + self.batch_size], self.model))
+
+        embeddings = np.array(rows, dtype='float32').reshape(len(texts), VECTOR_CONFIG["vector_dimension"])
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+# Anything with SentenceTransformer's encode(texts, normalize_embeddings=...) interface
+EmbeddingModel = Union["SentenceTransformer", OnnxEmbedder, OllamaEmbedder]
+
+
+def embedding_model_key(backend: Optional[str] = None) -> str:
+    """
+    Name of a backend's model, for cache keys and vector metadata.
+
+    Args:
+        backend: Embedding backend, defaults to VECTOR_CONFIG
+
+    Returns:
+        str: Model name, suffixed with the backend unless it's sentence_transformers
+    """
+    backend = backend or VECTOR_CONFIG["embedding_backend"]
+    if backend == "ollama":
+        return f"{OLLAMA_CONFIG['embedding_model']}@ollama"
+    model_name = VECTOR_CONFIG["embedding_model"]
+    return model_name if backend == "sentence_transformers" else f"{model_name}@{backend}"
+
+
+def load_embedding_model(backend: Optional[str] = None) -> EmbeddingModel:
+    """
+    Load a fresh embedding model for a backend (no singleton; see get_embedding_model).
+
+    Args:
+        backend: "sentence_transformers", "onnx" or "ollama", defaults to VECTOR_CONFIG
+
+    Returns:
+        EmbeddingModel: A model with an encode() method
+    """
+    backend = backend or VECTOR_CONFIG["embedding_backend"]
+
+    if backend == "sentence_transformers":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(VECTOR_CONFIG["embedding_model"])
+    if backend == "onnx":
+        return OnnxEmbedder(VECTOR_CONFIG["onnx_model_dir"], VECTOR_CONFIG["onnx_threads"])
+    if backend == "ollama":
+        return OllamaEmbedder()
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def get_embedding_model() -> EmbeddingModel:
+    """
+    Get the embedding model for the configured backend, loading it if necessary
+    (waits for a preload in progress). With the embedding service enabled this is
+    the worker pool, which has the same encode() interface.
+
+    Returns:
+        EmbeddingModel: A model with an encode() method
     """
     global _model
 
     if _model is None:
-        model_name = VECTOR_CONFIG["embedding_model"]
-        _model = SentenceTransformer(model_name)
+        with _model_lock:
+            if _model is None:
+                if VECTOR_CONFIG["embedding_service"]["workers"]:
+                    from vector.embedding_service import create_embedding_service
+                    _model = create_embedding_service()
+                else:
+                    _model = load_embedding_model()
 
     return _model
 
 
+def preload_embedding_model() -> threading.Thread:
+    """
+    Load the embedding model in a background thread, so the first embed call doesn't wait for it.
+
+    Returns:
+        threading.Thread: The daemon thread doing the load
+    """
+    def run():
+        try:
+            model = get_embedding_model()
+            if hasattr(model, "wait_ready"):
+                model.wait_ready()
+        except Exception as e:
+            print(f"Warning: Could not preload embedding model: {str(e)}")
+
+    thread = threading.Thread(target=run, name="embedding-model-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Get the embedding cache, opening it if necessary.
+
+    Returns:
+        Optional[EmbeddingCache]: The cache, or None if disabled in VECTOR_CONFIG
+    """
+    global _cache
+
+    cache_config = VECTOR_CONFIG["embedding_cache"]
+    if not cache_config["enabled"]:
+        return None
+
+    if _cache is None:
+        _cache = EmbeddingCache(cache_config["path"], cache_config["memory_entries"],
+                                VECTOR_CONFIG["lock_timeout_seconds"])
+
+    return _cache
+
+
 def embed_text(text: str) -> np.ndarray:
     """
     Embed a text string using the sentence transformer model.
@@ -37,30 +443,45 @@ def embed_text(text: str) -> np.ndarray:
     Returns:
         np.ndarray: The embedding vector
     """
-    model = get_embedding_model()
-
-    # Generate embedding
-    embedding = model.encode(text, normalize_embeddings=True)
-
-    return embedding
+    return embed_batch([text])[0]
 
 
 def embed_batch(texts: List[str]) -> np.ndarray:
     """
     Embed a batch of text strings.
 
+    Duplicate texts (after normalization) are embedded once, and all cached
+    texts are looked up in bulk; only the misses go through the model, in one
+    encode call.
+
     Args:
         texts: List of text strings to embed
 
     Returns:
         np.ndarray: Matrix of embedding vectors
     """
-    model = get_embedding_model()
+    model_name = embedding_model_key()
+    normalized = [normalize_text(text) for text in texts]
+    hashes = [text_hash(text) for text in normalized]
+
+    # One entry per distinct text, in first-seen order
+    unique = dict(zip(hashes, normalized))
+
+    cache = get_embedding_cache()
+    vectors = cache.get_many(model_name, list(unique)) if cache else {}
 
-    # Generate embeddings
-    embeddings = model.encode(texts, normalize_embeddings=True)
+    missing = [digest for digest in unique if digest not in vectors]
+    if missing:
+        # Generate embeddings
+        encoded = get_embedding_model().encode([unique[digest] for digest in missing], normalize_embeddings=True)
+        new_vectors = dict(zip(missing, np.asarray(encoded, dtype='float32')))
+        if cache:
+            cache.put_many(model_name, new_vectors)
+        vectors.update(new_vectors)
 
-    return embeddings
+    if not hashes:
+        return np.empty((0, VECTOR_CONFIG["vector_dimension"]), dtype='float32')
+    return np.stack([vectors[digest] for digest in hashes])
 
 
 def similarity(embedding1: np.ndarray, embedding2: np.ndarray) -> float:
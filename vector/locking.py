@@ -0,0 +1,87 @@
+"""
+Cross-process writer lock for the vector store.
+Uses flock on POSIX and msvcrt byte-range locking on Windows.
+"""
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Reentrant exclusive lock on a lock file, held across threads and processes.
+    """
+
+    def __init__(self, path: Path, timeout: float = 30.0):
+        """
+        Initialize the lock (the lock file is opened on first acquire).
+
+        Args:
+            path: Path to the lock file
+            timeout: Seconds to wait for the lock before raising TimeoutError
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self) -> None:
+        """Acquire the lock, waiting up to the timeout."""
+        deadline = time.monotonic() + self.timeout
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out waiting for lock {self.path}")
+
+        if self._depth == 0:
+            try:
+                self._lock_file(deadline)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        """Release one level of the lock; the file lock is dropped at the outermost level."""
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_file()
+        self._thread_lock.release()
+
+    def _lock_file(self, deadline: float) -> None:
+        """Take the OS-level lock, polling so the timeout applies."""
+        if self._file is None:
+            self._file = open(self.path, 'a+b')
+
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                time.sleep(0.01)
+
+    def _unlock_file(self) -> None:
+        """Drop the OS-level lock."""
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
@@ -0,0 +1,513 @@
+"""
+SQLite-backed metadata for the vector store.
+Each vector's metadata is a row keyed by vector ID and FAISS position, with
+indexed columns for the fields we filter on and the full metadata as JSON.
+"""
+import json
+import sqlite3
+import threading
+import uuid
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable, Tuple, Union
+
+# Columns promoted out of the JSON blob so they can be indexed
+INDEXED_COLUMNS = ["question_id", "session_id", "destination", "created_at", "type"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL UNIQUE,
+    question_id TEXT,
+    session_id TEXT,
+    destination TEXT,
+    created_at TEXT,
+    type TEXT,
+    metadata TEXT NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS store_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_vectors_question_id ON vectors(question_id);
+CREATE INDEX IF NOT EXISTS idx_vectors_session_id ON vectors(session_id);
+CREATE INDEX IF NOT EXISTS idx_vectors_destination ON vectors(destination COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_vectors_created_at ON vectors(created_at);
+CREATE INDEX IF NOT EXISTS idx_vectors_type ON vectors(type);
+"""
+
+# Created after the deleted column exists (it is added to pre-tombstone databases first)
+TOMBSTONE_INDEX = "CREATE INDEX IF NOT EXISTS idx_vectors_deleted ON vectors(position) WHERE deleted = 1"
+
+# SQLite's default limit on bound parameters is 999 on older builds
+MAX_SQL_PARAMS = 900
+
+UUID_EPOCH = datetime(1582, 10, 15)
+
+# Equality filters (a value or a list of allowed values) and date-range bounds
+EQUALITY_FILTERS = ["question_id", "session_id", "destination", "type"]
+RANGE_FILTERS = {"created_after": ">=", "created_before": "<"}
+
+
+def _local_iso(value: datetime) -> str:
+    """ISO form of a time as naive local time, the convention of created_at (datetime.now())."""
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _created_at(metadata: Dict[str, Any]) -> Optional[str]:
+    """Get an ISO creation time (naive local time), decoding legacy uuid1 'timestamp' values."""
+    if metadata.get("created_at"):
+        return metadata["created_at"]
+
+    timestamp = metadata.get("timestamp")
+    if not timestamp:
+        return None
+    try:
+        legacy = uuid.UUID(timestamp)
+        if legacy.version == 1:
+            # uuid1 time is 100ns intervals since the Gregorian epoch (UTC)
+            created = UUID_EPOCH + timedelta(microseconds=legacy.time // 10)
+            return _local_iso(created.replace(tzinfo=timezone.utc))
+    except ValueError:
+        pass
+    return timestamp
+
+
+def _vector_type(metadata: Dict[str, Any]) -> str:
+    """Classify a vector as a per-question answer or a whole conversation."""
+    if metadata.get("type"):
+        return metadata["type"]
+    if metadata.get("conversation_type") or metadata.get("question_id") == "conversation":
+        return "conversation"
+    return "answer"
+
+
+def to_row(vector_id: str, position: int, metadata: Dict[str, Any]) -> Tuple:
+    """
+    Build a vectors table row from a metadata dict.
+
+    Args:
+        vector_id: The vector ID
+        position: FAISS position of the vector
+        metadata: Free-form metadata
+
+    Returns:
+        Tuple: Values in table column order
+    """
+    return (
+        vector_id,
+        position,
+        metadata.get("question_id"),
+        metadata.get("session_id"),
+        metadata.get("destination"),
+        _created_at(metadata),
+        _vector_type(metadata),
+        json.dumps(metadata, default=str),
+    )
+
+
+def _as_list(value: Union[Any, List[Any]]) -> List[Any]:
+    """Wrap a single filter value in a list."""
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _as_iso(value: Union[str, datetime]) -> str:
+    """Normalize a date-range bound to the ISO form stored in created_at."""
+    return _local_iso(value) if isinstance(value, datetime) else str(value)
+
+
+def _check_filters(filters: Dict[str, Any]) -> None:
+    """Reject filter keys that have no indexed column."""
+    unknown = set(filters) - set(EQUALITY_FILTERS) - set(RANGE_FILTERS)
+    if unknown:
+        raise ValueError(f"Unsupported metadata filters: {', '.join(sorted(unknown))}")
+
+
+def filter_clause(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """
+    Build a SQL WHERE clause for metadata filters.
+
+    Args:
+        filters: Column -> value or list of values (question_id, session_id,
+            destination, type), plus created_after / created_before bounds
+
+    Returns:
+        Tuple[str, List[Any]]: WHERE clause (without the keyword) and its parameters
+    """
+    _check_filters(filters)
+    clauses, params = [], []
+
+    for column in EQUALITY_FILTERS:
+        if column not in filters:
+            continue
+        values = _as_list(filters[column])
+        collate = " COLLATE NOCASE" if column == "destination" else ""
+        clauses.append(f"{column}{collate} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+
+    for key, operator in RANGE_FILTERS.items():
+        if filters.get(key) is not None:
+            clauses.append(f"created_at {operator} ?")
+            params.append(_as_iso(filters[key]))
+
+    return " AND ".join(clauses) or "1", params
+
+
+def matches_filters(metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """
+    Check metadata against filters in Python, with the same semantics as filter_clause.
+
+    Args:
+        metadata: Free-form metadata
+        filters: Filters as accepted by filter_clause
+
+    Returns:
+        bool: True if the metadata passes every filter
+    """
+    _check_filters(filters)
+    row = dict(zip(INDEXED_COLUMNS, to_row("", 0, metadata)[2:7]))
+
+    for column in EQUALITY_FILTERS:
+        if column not in filters:
+            continue
+        value = row[column]
+        allowed = _as_list(filters[column])
+        if column == "destination":
+            value = value.lower() if isinstance(value, str) else value
+            allowed = [v.lower() for v in allowed]
+        if value not in allowed:
+            return False
+
+    created_at = row["created_at"]
+    if filters.get("created_after") is not None:
+        if created_at is None or created_at < _as_iso(filters["created_after"]):
+            return False
+    if filters.get("created_before") is not None:
+        if created_at is None or created_at >= _as_iso(filters["created_before"]):
+            return False
+    return True
+
+
+class MetadataStore:
+    """
+    Vector metadata in SQLite with keyed and bulk lookups.
+    """
+
+    def __init__(self, db_file: Path, read_only: bool = False, busy_timeout: float = 30.0):
+        """
+        Open (and create if needed) the metadata database.
+
+        Args:
+            db_file: Path to the SQLite database
+            read_only: Open without write access
+            busy_timeout: Seconds to wait on another process's write lock
+        """
+        self.db_file = Path(db_file)
+        self.read_only = read_only
+
+        # The connection is shared by every thread using the store; transactions take turns
+        self._lock = threading.RLock()
+
+        if read_only:
+            self._conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True,
+                                         timeout=busy_timeout, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(str(self.db_file), timeout=busy_timeout, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            if not self._has_column("deleted"):
+                self._conn.execute("ALTER TABLE vectors ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute(TOMBSTONE_INDEX)
+            self._conn.commit()
+            self._localize_legacy_created_at()
+
+        # Databases from before tombstones (opened read-only) have no deleted column
+        self._live = " AND deleted = 0" if self._has_column("deleted") else ""
+
+        # Tombstoned positions, reloaded when any connection commits a change
+        self._deleted_positions = np.empty(0, dtype='int64')
+        self._deleted_version = None
+
+    def _localize_legacy_created_at(self) -> None:
+        """Re-derive created_at of legacy uuid1 rows once; older versions decoded them as UTC."""
+        if self.state("created_at") == "local":
+            return
+
+        updates = []
+        rows = self._conn.execute("SELECT id, metadata FROM vectors WHERE metadata LIKE '%\"timestamp\"%'")
+        for vector_id, meta in rows.fetchall():
+            meta = json.loads(meta)
+            if not meta.get("created_at"):
+                updates.append((_created_at(meta), vector_id))
+
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE vectors SET created_at = ? WHERE id = ?", updates)
+            self._conn.execute("INSERT OR REPLACE INTO store_state (key, value) VALUES ('created_at', 'local')")
+
+    def _has_column(self, column: str) -> bool:
+        """Check whether the vectors table has a column."""
+        return any(row[1] == column for row in self._conn.execute("PRAGMA table_info(vectors)"))
+
+    def count(self) -> int:
+        """Number of metadata rows."""
+        return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def insert(self, vector_id: str, position: int, metadata: Dict[str, Any]) -> None:
+        """
+        Insert metadata for one vector.
+
+        Args:
+            vector_id: The vector ID
+            position: FAISS position of the vector
+            metadata: Free-form metadata
+        """
+        self.insert_many([(vector_id, position, metadata)])
+
+    def insert_many(self, entries: Iterable[Tuple[str, int, Dict[str, Any]]], replace: bool = False) -> None:
+        """
+        Insert metadata for many vectors in one transaction.
+
+        Args:
+            entries: (vector_id, position, metadata) tuples
+            replace: Overwrite existing rows instead of ignoring them
+        """
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"{verb} INTO vectors (id, position, {', '.join(INDEXED_COLUMNS)}, metadata) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (to_row(vector_id, position, metadata) for vector_id, position, metadata in entries)
+            )
+
+    def get(self, vector_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Keyed lookup of one vector's metadata.
+
+        Args:
+            vector_id: The vector ID
+
+        Returns:
+            Optional[Dict[str, Any]]: The metadata or None if not found
+        """
+        row = self._conn.execute(f"SELECT metadata FROM vectors WHERE id = ?{self._live}", (vector_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, vector_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Bulk lookup of metadata by vector ID.
+
+        Args:
+            vector_ids: Vector IDs to fetch
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Metadata for the IDs that exist
+        """
+        found = {}
+        for chunk in _chunks(vector_ids):
+            rows = self._conn.execute(
+                f"SELECT id, metadata FROM vectors WHERE id IN ({', '.join('?' * len(chunk))}){self._live}", chunk
+            )
+            found.update((vector_id, json.loads(meta)) for vector_id, meta in rows)
+        return found
+
+    def get_by_positions(self, positions: List[int],
+                         epoch: Optional[int] = None) -> Optional[Dict[int, Tuple[str, Dict[str, Any]]]]:
+        """
+        Bulk fetch of (vector_id, metadata) for search hits.
+
+        Args:
+            positions: FAISS positions returned by a search
+            epoch: Compaction epoch of the index the positions came from; if given, the
+                lookup runs in one read transaction and fails when positions were rewritten
+
+        Returns:
+            Optional[Dict[int, Tuple[str, Dict[str, Any]]]]: Position -> (vector ID, metadata),
+            or None if the epoch no longer matches
+        """
+        found = {}
+        with self._lock:
+            if epoch is not None:
+                self._conn.execute("BEGIN")
+            try:
+                if epoch is not None and self.epoch() != epoch:
+                    return None
+                for chunk in _chunks([int(p) for p in positions]):
+                    rows = self._conn.execute(
+                        f"SELECT position, id, metadata FROM vectors "
+                        f"WHERE position IN ({', '.join('?' * len(chunk))}){self._live}",
+                        chunk
+                    )
+                    found.update((position, (vector_id, json.loads(meta))) for position, vector_id, meta in rows)
+            finally:
+                if epoch is not None:
+                    self._conn.execute("COMMIT")
+        return found
+
+    def iter_live(self) -> Iterable[Tuple[str, int, Dict[str, Any]]]:
+        """
+        Iterate over the metadata of every live vector, in position order.
+
+        Returns:
+            Iterable[Tuple[str, int, Dict[str, Any]]]: (vector_id, position, metadata) tuples
+        """
+        rows = self._conn.execute(f"SELECT id, position, metadata FROM vectors WHERE 1 = 1{self._live} "
+                                  f"ORDER BY position")
+        for vector_id, position, meta in rows:
+            yield vector_id, position, json.loads(meta)
+
+    def positions_matching(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Get the FAISS positions of vectors whose metadata passes the filters.
+
+        Args:
+            filters: Filters as accepted by filter_clause
+
+        Returns:
+            np.ndarray: Sorted int64 positions
+        """
+        where, params = filter_clause(filters)
+        rows = self._conn.execute(f"SELECT position FROM vectors WHERE {where}{self._live} ORDER BY position",
+                                  params)
+        return np.fromiter((row[0] for row in rows), dtype='int64')
+
+    def mark_deleted(self, vector_ids: Optional[List[str]] = None,
+                     filters: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Tombstone vectors by ID or by metadata filters.
+
+        Args:
+            vector_ids: Vector IDs to delete
+            filters: Filters as accepted by filter_clause
+
+        Returns:
+            int: Number of vectors newly tombstoned
+        """
+        deleted = 0
+        with self._lock, self._conn:
+            for chunk in _chunks(list(vector_ids or [])):
+                deleted += self._conn.execute(
+                    f"UPDATE vectors SET deleted = 1 WHERE id IN ({', '.join('?' * len(chunk))}) AND deleted = 0",
+                    chunk
+                ).rowcount
+            if filters:
+                where, params = filter_clause(filters)
+                deleted += self._conn.execute(
+                    f"UPDATE vectors SET deleted = 1 WHERE {where} AND deleted = 0", params
+                ).rowcount
+        # Our own commits don't change data_version, so force a reload
+        self._deleted_version = None
+        return deleted
+
+    def deleted_positions(self) -> np.ndarray:
+        """
+        Get the positions of tombstoned vectors, cached until the database changes.
+
+        Returns:
+            np.ndarray: Sorted int64 positions
+        """
+        if not self._live:
+            return self._deleted_positions
+
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._deleted_version:
+            rows = self._conn.execute("SELECT position FROM vectors WHERE deleted = 1 ORDER BY position")
+            self._deleted_positions = np.fromiter((row[0] for row in rows), dtype='int64')
+            self._deleted_version = version
+        return self._deleted_positions
+
+    def epoch(self) -> int:
+        """Compaction epoch: incremented every time positions are rewritten."""
+        return int(self.state("epoch") or 0)
+
+    def state(self, key: str) -> Optional[str]:
+        """
+        Read a store_state value.
+
+        Args:
+            key: State key
+
+        Returns:
+            Optional[str]: The value, or None if unset (or the table predates it)
+        """
+        try:
+            row = self._conn.execute("SELECT value FROM store_state WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def compact(self, kept_positions: np.ndarray, epoch: int, index_name: str) -> None:
+        """
+        Drop tombstoned rows and renumber the rest to match a compacted index, in one transaction.
+
+        Args:
+            kept_positions: Sorted old positions of the live vectors; row i moves to position i
+            epoch: New compaction epoch
+            index_name: Snapshot file holding the compacted index (to finish an interrupted swap)
+        """
+        moves = [(-(new + 1), int(old)) for new, old in enumerate(kept_positions) if new != old]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM vectors WHERE deleted = 1")
+            # Park moved rows at negative positions first so the UNIQUE constraint never trips
+            self._conn.executemany("UPDATE vectors SET position = ? WHERE position = ?", moves)
+            self._conn.execute("UPDATE vectors SET position = -position - 1 WHERE position < 0")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO store_state (key, value) VALUES (?, ?)",
+                [("epoch", str(epoch)), ("compacted_index", index_name)]
+            )
+        self._deleted_version = None
+
+    def delete_from_position(self, position: int) -> int:
+        """
+        Delete rows at or beyond a position (orphans whose vectors never reached the index).
+
+        Args:
+            position: First position to delete
+
+        Returns:
+            int: Number of rows deleted
+        """
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM vectors WHERE position >= ?", (position,)).rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+def _chunks(values: List[Any]) -> Iterable[List[Any]]:
+    """Split values into chunks that fit SQLite's parameter limit."""
+    for start in range(0, len(values), MAX_SQL_PARAMS):
+        yield values[start:start + MAX_SQL_PARAMS]
+
+
+def migrate_json_metadata(metadata_json: Path, metadata_store: MetadataStore) -> int:
+    """
+    Import a legacy metadata.json (vector ID -> metadata with _index) into SQLite.
+
+    The JSON file is renamed to metadata.json.migrated afterwards.
+
+    Args:
+        metadata_json: Path to the legacy metadata file
+        metadata_store: Destination metadata store
+
+    Returns:
+        int: Number of rows migrated
+    """
+    with open(metadata_json, 'r') as f:
+        legacy = json.load(f)
+
+    entries = []
+    for vector_id, meta in legacy.items():
+        meta = dict(meta)
+        position = meta.pop("_index", None)
+        if position is not None:
+            entries.append((vector_id, position, meta))
+
+    metadata_store.insert_many(entries)
+    metadata_json.rename(metadata_json.with_name(metadata_json.name + ".migrated"))
+    return len(entries)
@@ -0,0 +1,152 @@
+"""
+Export the sentence-transformers embedding model to int8-quantized ONNX.
+
+Run once on a machine with PyTorch (`python main.py vectors export-onnx`);
+hosts using VECTOR_CONFIG["embedding_backend"] = "onnx" then only need
+onnxruntime and tokenizers. The export is checked against the PyTorch model
+and rejected unless every validation text stays within
+VECTOR_CONFIG["onnx_cosine_tolerance"], so ONNX and PyTorch embeddings can
+share one index.
+"""
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from config import VECTOR_CONFIG
+from vector.embeddings import (ONNX_MANIFEST_FILE, ONNX_MODEL_FILE, ONNX_TOKENIZER_FILE,
+                               OnnxEmbedder, load_embedding_model)
+
+# Hotel-preference style texts the export is validated on
+VALIDATION_TEXTS = [
+    "Paris, somewhere central near the Marais",
+    "From June 3rd to June 8th",
+    "Two adults and a toddler",
+    "Around $200 per night, flexible for the right place",
+    "Pool, gym and breakfast included; no smoking rooms please",
+    "Quiet boutique hotel with friendly staff and a rooftop bar",
+    "Hotel preference conversation:\nWhere are you going? Lisbon\nWhen? Late September for five nights",
+    "I want a beachfront resort in Bali with a spa, kids club and airport shuttle for a family of four",
+    "a",
+    "",
+]
+
+
+def compare_embeddings(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """
+    Compare two sets of normalized embeddings row by row.
+
+    Args:
+        reference: Embeddings from the PyTorch model
+        candidate: Embeddings of the same texts from another backend
+
+    Returns:
+        Dict[str, float]: min_cosine and mean_cosine over the rows
+    """
+    cosines = np.einsum('nd,nd->n', reference, candidate)
+    return {"min_cosine": float(cosines.min()), "mean_cosine": float(cosines.mean())}
+
+
+def export_onnx_model(output_dir: Optional[Path] = None, opset: int = 14,
+                      validation_texts: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Export, quantize and validate the configured embedding model.
+
+    The model is built in a temporary sibling directory and only replaces
+    output_dir once it passes validation; a rejected export leaves any
+    existing model in place.
+
+    Args:
+        output_dir: Target directory, defaults to VECTOR_CONFIG["onnx_model_dir"]
+        opset: ONNX opset version
+        validation_texts: Texts compared against the PyTorch model, defaults to VALIDATION_TEXTS
+
+    Returns:
+        Dict[str, Any]: The manifest written next to the model, with the measured cosines
+    """
+    output_dir = Path(output_dir or VECTOR_CONFIG["onnx_model_dir"])
+    output_dir.parent.mkdir(exist_ok=True, parents=True)
+    validation_texts = validation_texts or VALIDATION_TEXTS
+
+    staging_dir = Path(tempfile.mkdtemp(prefix=f".{output_dir.name}.", dir=output_dir.parent))
+    try:
+        manifest = _export_to(staging_dir, opset, validation_texts)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    # Swap the validated export into place
+    previous_dir = None
+    if output_dir.exists():
+        previous_dir = output_dir.with_name(f".{output_dir.name}.old")
+        shutil.rmtree(previous_dir, ignore_errors=True)
+        output_dir.rename(previous_dir)
+    staging_dir.rename(output_dir)
+    if previous_dir is not None:
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+    print(f"✅ ONNX model written to {output_dir} (min cosine {manifest['min_cosine']:.4f}, "
+          f"mean {manifest['mean_cosine']:.4f})")
+    return manifest
+
+
+def _export_to(output_dir: Path, opset: int, validation_texts: List[str]) -> Dict[str, Any]:
+    """Export, quantize and validate the model into output_dir; raise ValueError if it drifts."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    sentence_model = load_embedding_model("sentence_transformers")
+    transformer = sentence_model[0].auto_model.eval()
+    tokenizer = sentence_model[0].tokenizer
+    dimension = sentence_model.get_sentence_embedding_dimension()
+    if dimension != VECTOR_CONFIG["vector_dimension"]:
+        raise ValueError(f"{VECTOR_CONFIG['embedding_model']} produces {dimension}-d embeddings, "
+                         f"but vector_dimension is {VECTOR_CONFIG['vector_dimension']}")
+
+    # Export the transformer at float32 with dynamic batch and sequence axes
+    print(f"📦 Exporting {VECTOR_CONFIG['embedding_model']} to ONNX...")
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    float_path = output_dir / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            str(float_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]},
+            opset_version=opset,
+        )
+
+    print("🗜️  Quantizing weights to int8...")
+    quantize_dynamic(str(float_path), str(output_dir / ONNX_MODEL_FILE), weight_type=QuantType.QInt8)
+    float_path.unlink()
+
+    tokenizer.backend_tokenizer.save(str(output_dir / ONNX_TOKENIZER_FILE))
+    manifest = {
+        "model": VECTOR_CONFIG["embedding_model"],
+        "dimension": dimension,
+        "max_length": sentence_model.max_seq_length,
+        "pad_id": tokenizer.pad_token_id or 0,
+        "quantization": "int8",
+        "opset": opset,
+    }
+    with open(output_dir / ONNX_MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Reject exports that would drift from vectors already in the index
+    reference = sentence_model.encode(validation_texts, normalize_embeddings=True)
+    candidate = OnnxEmbedder(output_dir, validated=False).encode(validation_texts, normalize_embeddings=True)
+    manifest.update(compare_embeddings(reference, candidate))
+    with open(output_dir / ONNX_MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    tolerance = VECTOR_CONFIG["onnx_cosine_tolerance"]
+    if manifest["min_cosine"] < 1 - tolerance:
+        raise ValueError(f"ONNX export drifts from the PyTorch model: min cosine {manifest['min_cosine']:.4f} "
+                         f"< {1 - tolerance:.4f} (onnx_cosine_tolerance {tolerance})")
+    return manifest
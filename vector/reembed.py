@@ -0,0 +1,164 @@
+"""
+Re-embed an existing vector store with the configured embedding backend.
+
+Vectors from different models can't share an index, so switching
+VECTOR_CONFIG["embedding_backend"] (or the model behind it) means embedding
+every stored text again. Texts come from the vector metadata ("text") or,
+for vectors stored before that was recorded, from the session's
+final_responses.txt. The new store is built next to the old one and swapped
+in; the old one is kept as a backup directory. Run it with no interviews in
+progress: processes that already have the store open keep writing to the
+old directory.
+"""
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Any
+
+from config import DATA_DIR, VECTOR_CONFIG
+from questions.question_bank import get_questions
+from vector.embeddings import embed_batch, embedding_model_key
+from vector.locking import FileLock
+from vector.metadata import MetadataStore
+from vector.storage import VectorStore
+
+FINAL_RESPONSES_FILE = "final_responses.txt"
+
+
+def read_final_responses(session_dir: Path) -> Dict[str, str]:
+    """
+    Recover a session's final answers from final_responses.txt.
+
+    Args:
+        session_dir: Path to the session directory
+
+    Returns:
+        Dict[str, str]: Question ID -> answer (empty if the file is missing)
+    """
+    responses_file = Path(session_dir) / FINAL_RESPONSES_FILE
+    if not responses_file.exists():
+        return {}
+
+    # The logger writes each answer as "QUESTION ID: answer"
+    prefixes = {question["id"].replace("_", " ").upper() + ": ": question["id"] for question in get_questions()}
+    responses = {}
+    with open(responses_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            for prefix, question_id in prefixes.items():
+                if line.startswith(prefix):
+                    responses[question_id] = line[len(prefix):].rstrip("\n")
+    return responses
+
+
+def recover_text(metadata: Dict[str, Any], responses_cache: Dict[str, Dict[str, str]]) -> Optional[str]:
+    """
+    Find the text a stored vector was embedded from.
+
+    Args:
+        metadata: The vector's metadata
+        responses_cache: Session ID -> final responses, filled as sessions are read
+
+    Returns:
+        Optional[str]: The text, or None if it can't be recovered
+    """
+    if metadata.get("text"):
+        return metadata["text"]
+
+    session_id = metadata.get("session_id")
+    if not session_id:
+        return None
+    if session_id not in responses_cache:
+        session_dir = Path(metadata.get("session_dir") or Path(DATA_DIR) / "sessions" / session_id)
+        responses_cache[session_id] = read_final_responses(session_dir)
+    responses = responses_cache[session_id]
+
+    question_id = metadata.get("question_id")
+    if question_id in responses:
+        return responses[question_id]
+    if question_id == "conversation" and metadata.get("session_dir") and responses:
+        # Interview-workflow conversation vectors embed the questions and answers
+        from core.workflow import build_conversation_text
+        return build_conversation_text(responses)
+    return None
+
+
+def reembed_vector_store(db_path: Optional[str] = None, batch_size: int = 256,
+                         drop_missing: bool = False) -> Dict[str, Any]:
+    """
+    Rebuild a vector store with embeddings from the configured backend.
+
+    Writers are locked out for the whole rebuild. Vector IDs and metadata are
+    kept; vectors whose text can't be recovered are left out only with
+    drop_missing.
+
+    Args:
+        db_path: Store directory, defaults to VECTOR_CONFIG["vector_db_path"]
+        batch_size: Texts embedded and stored per batch
+        drop_missing: Proceed when some texts can't be recovered, leaving those vectors out
+
+    Returns:
+        Dict[str, Any]: reembedded and dropped counts, model, backup directory and elapsed seconds
+    """
+    started = time.perf_counter()
+    db_path = Path(db_path or VECTOR_CONFIG["vector_db_path"])
+    target_path = db_path.with_name(db_path.name + ".reembed")
+    backup_path = db_path.with_name(f"{db_path.name}.pre-reembed-{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    model = embedding_model_key()
+
+    with FileLock(db_path / "writer.lock", VECTOR_CONFIG["lock_timeout_seconds"]):
+        source = MetadataStore(db_path / "metadata.db", read_only=True,
+                               busy_timeout=VECTOR_CONFIG["lock_timeout_seconds"])
+        responses_cache: Dict[str, Dict[str, str]] = {}
+        entries, missing = [], []
+        for vector_id, _, metadata in source.iter_live():
+            text = recover_text(metadata, responses_cache)
+            if text is None:
+                missing.append(vector_id)
+            else:
+                entries.append((vector_id, text, metadata))
+        source.close()
+
+        if missing and not drop_missing:
+            raise ValueError(f"{len(missing)} vectors have no recoverable text; "
+                             f"re-run with drop_missing to leave them out")
+
+        if target_path.exists():
+            raise FileExistsError(f"{target_path} exists (an interrupted re-embed?); remove it first")
+
+        print(f"🔁 Re-embedding {len(entries)} vectors with {model}...")
+        target = VectorStore(db_path=str(target_path))
+        try:
+            for start in range(0, len(entries), batch_size):
+                batch = entries[start:start + batch_size]
+                vectors = embed_batch([text for _, text, _ in batch])
+                if vectors.shape[1] != VECTOR_CONFIG["vector_dimension"]:
+                    raise ValueError(f"{model} produces {vectors.shape[1]}-d embeddings, "
+                                     f"but vector_dimension is {VECTOR_CONFIG['vector_dimension']}")
+                target.store_batch(
+                    vectors,
+                    [{**metadata, "text": text, "embedding_model": model} for _, text, metadata in batch],
+                    vector_ids=[vector_id for vector_id, _, _ in batch],
+                )
+                print(f"   {min(start + batch_size, len(entries))}/{len(entries)}")
+            target.checkpoint()
+        except BaseException:
+            target.close()
+            shutil.rmtree(target_path, ignore_errors=True)
+            raise
+        target.close()
+
+        # Swap the rebuilt store in; the old one stays as a backup
+        db_path.rename(backup_path)
+        target_path.rename(db_path)
+
+    result = {
+        "reembedded": len(entries),
+        "dropped": len(missing),
+        "model": model,
+        "backup": str(backup_path),
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+    }
+    print(f"✅ Re-embedded {result['reembedded']} vectors ({result['dropped']} dropped) "
+          f"in {result['elapsed_seconds']}s; old store kept at {backup_path}")
+    return result
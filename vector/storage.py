@@ -3,13 +3,227 @@ Vector storage functionality for the hotel recommendation system.
 """
 import os
 import json
+import time
 import uuid
+import atexit
+import base64
+import threading
 import faiss
 import numpy as np
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
 
 from config import VECTOR_CONFIG, DATA_DIR
+from vector.locking import FileLock
+from vector.metadata import MetadataStore, migrate_json_metadata, matches_filters
+
+# Index tiers in promotion order
+INDEX_TIERS = ["flat", "hnsw", "ivfpq"]
+
+# Scalar quantizers for the flat and HNSW tiers (IVF-PQ is already compressed)
+QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+def index_tier(index: faiss.Index) -> str:
+    """
+    Get the tier name of a FAISS index.
+
+    Args:
+        index: The FAISS index
+
+    Returns:
+        str: "flat", "hnsw" or "ivfpq"
+    """
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivfpq"
+    return "flat"
+
+
+def index_quantization(index: faiss.Index) -> Optional[str]:
+    """
+    Get the scalar quantization of a FAISS index.
+
+    Args:
+        index: The FAISS index
+
+    Returns:
+        Optional[str]: "fp16", "int8" or None for full-precision (and IVF-PQ) indexes
+    """
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        for name, qtype in QUANTIZERS.items():
+            if index.sq.qtype == qtype:
+                return name
+    return None
+
+
+def target_tier(ntotal: int) -> str:
+    """
+    Get the index tier a store of the given size should use.
+
+    Args:
+        ntotal: Number of stored vectors
+
+    Returns:
+        str: Tier name based on VECTOR_CONFIG["index_tiers"] thresholds
+    """
+    tiers = VECTOR_CONFIG["index_tiers"]
+    if ntotal >= tiers["ivfpq_threshold"]:
+        return "ivfpq"
+    if ntotal >= tiers["hnsw_threshold"]:
+        return "hnsw"
+    return "flat"
+
+
+def build_index(tier: str, dimension: int, vectors: Optional[np.ndarray] = None,
+                quantization: Optional[str] = None) -> faiss.Index:
+    """
+    Create an inner-product index of the given tier, training and filling it if vectors are given.
+
+    Args:
+        tier: "flat", "hnsw" or "ivfpq"
+        dimension: Vector dimension
+        vectors: Optional float32 matrix to add (and train on, for IVF-PQ and int8)
+        quantization: Optional "fp16" or "int8" scalar quantization for the flat and HNSW tiers
+
+    Returns:
+        faiss.Index: The new index with search parameters applied
+    """
+    tiers = VECTOR_CONFIG["index_tiers"]
+    qtype = QUANTIZERS[quantization] if quantization else None
+
+    if tier == "hnsw":
+        if qtype is None:
+            index = faiss.IndexHNSWFlat(dimension, tiers["hnsw_m"], faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexHNSWSQ(dimension, qtype, tiers["hnsw_m"], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = tiers["hnsw_ef_construction"]
+    elif tier == "ivfpq":
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, tiers["ivf_nlist"], tiers["pq_m"],
+                                 tiers["pq_nbits"], faiss.METRIC_INNER_PRODUCT)
+        if vectors is not None:
+            # ~256 training points per list is plenty for k-means
+            sample_size = min(len(vectors), tiers["ivf_nlist"] * 256)
+            sample = vectors[np.random.default_rng(0).choice(len(vectors), sample_size, replace=False)]
+            index.train(sample)
+    elif qtype is not None:
+        index = faiss.IndexScalarQuantizer(dimension, qtype, faiss.METRIC_INNER_PRODUCT)
+    else:
+        index = faiss.IndexFlatIP(dimension)
+
+    if not index.is_trained:
+        # int8 learns a per-dimension range; without data, use the range of unit vectors
+        if vectors is not None and len(vectors):
+            index.train(vectors)
+        else:
+            index.train(np.stack([-np.ones(dimension), np.ones(dimension)]).astype('float32'))
+
+    if vectors is not None and len(vectors):
+        index.add(vectors)
+
+    apply_search_params(index)
+    return index
+
+
+def apply_search_params(index: faiss.Index) -> None:
+    """
+    Apply the configured efSearch / nprobe to an approximate index.
+
+    Args:
+        index: The FAISS index
+    """
+    tiers = VECTOR_CONFIG["index_tiers"]
+    tier = index_tier(index)
+    if tier == "hnsw":
+        index.hnsw.efSearch = tiers["hnsw_ef_search"]
+    elif tier == "ivfpq":
+        index.nprobe = tiers["ivf_nprobe"]
+
+
+def search_parameters(index: faiss.Index, selector: faiss.IDSelector) -> faiss.SearchParameters:
+    """
+    Build per-call search parameters that restrict a search to selected IDs.
+
+    Args:
+        index: The FAISS index
+        selector: IDs the search may return
+
+    Returns:
+        faiss.SearchParameters: Parameters of the index's type, keeping its efSearch / nprobe
+    """
+    tier = index_tier(index)
+    if tier == "hnsw":
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    if tier == "ivfpq":
+        return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    return faiss.SearchParameters(sel=selector)
+
+
+def search_subset(index: faiss.Index, query_vectors: np.ndarray, top_k: int,
+                  positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Search only the vectors at the given positions.
+
+    The restriction is applied inside the FAISS search with an ID selector, so
+    top_k is filled from matching vectors rather than post-filtered. Small
+    subsets of an HNSW index are scored exactly instead.
+
+    Args:
+        index: The FAISS index
+        query_vectors: Float32 matrix of shape (n, d)
+        top_k: Number of results per query
+        positions: Sorted int64 positions to search
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (scores, positions) of shape (n, top_k), -1 padded
+    """
+    if len(positions) == 0:
+        return (np.full((len(query_vectors), top_k), -np.inf, dtype='float32'),
+                np.full((len(query_vectors), top_k), -1, dtype='int64'))
+
+    if index_tier(index) == "hnsw" and len(positions) <= VECTOR_CONFIG["index_tiers"]["filter_exact_max"]:
+        # HNSW stores full vectors, so a small subset can be scored exactly
+        similarities = query_vectors @ index.reconstruct_batch(positions).T
+        order = np.argsort(-similarities, axis=1, kind='stable')[:, :top_k]
+        scores = np.full((len(query_vectors), top_k), -np.inf, dtype='float32')
+        indices = np.full((len(query_vectors), top_k), -1, dtype='int64')
+        scores[:, :order.shape[1]] = np.take_along_axis(similarities, order, axis=1)
+        indices[:, :order.shape[1]] = positions[order]
+        return scores, indices
+
+    selector = faiss.IDSelectorBatch(positions)
+    return index.search(query_vectors, top_k, params=search_parameters(index, selector))
+
+
+def search_excluding(index: faiss.Index, query_vectors: np.ndarray, top_k: int,
+                     excluded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Search everything except the given positions (tombstoned vectors).
+
+    Args:
+        index: The FAISS index
+        query_vectors: Float32 matrix of shape (n, d)
+        top_k: Number of results per query
+        excluded: Sorted int64 positions to skip
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (scores, positions) of shape (n, top_k), -1 padded
+    """
+    if len(excluded) == 0:
+        return index.search(query_vectors, top_k)
+
+    # Keep the inner selector referenced for the duration of the search
+    excluded_selector = faiss.IDSelectorBatch(excluded)
+    selector = faiss.IDSelectorNot(excluded_selector)
+    return index.search(query_vectors, top_k, params=search_parameters(index, selector))
 
 
 class VectorStore:
@@ -17,56 +231,322 @@ class VectorStore:
     Manages storage and retrieval of vector embeddings.
     """
 
-    def __init__(self):
-        """Initialize the vector store."""
+    def __init__(self, db_path: Optional[str] = None, read_only: bool = False):
+        """
+        Initialize the vector store.
+
+        Several processes may open the same store: writers serialize through a
+        lock file and catch up on each other's inserts before writing, and every
+        instance picks up new checkpoints and WAL inserts before searching.
+
+        Args:
+            db_path: Optional storage directory, defaults to VECTOR_CONFIG["vector_db_path"]
+            read_only: Read-mostly mode: memory-map the index, open metadata read-only, reject inserts
+        """
         self.vector_dim = VECTOR_CONFIG["vector_dimension"]
-        self.db_path = Path(VECTOR_CONFIG["vector_db_path"])
-        self.metadata_path = self.db_path / "metadata.json"
+        self.db_path = Path(db_path or VECTOR_CONFIG["vector_db_path"])
+        self.metadata_path = self.db_path / "metadata.db"
+        self.current_path = self.db_path / "CURRENT"
+        self.wal_path = self.db_path / "vectors.wal"
+        self.full_vectors_path = self.db_path / "vectors.f32"
+        self.read_only = read_only
 
         # Create storage directory if it doesn't exist
         self.db_path.mkdir(exist_ok=True, parents=True)
 
-        # Initialize or load the index
-        self._index = self._load_or_create_index()
+        # Writers hold this lock while appending or checkpointing; readers never take it
+        self._lock = FileLock(self.db_path / "writer.lock", VECTOR_CONFIG["lock_timeout_seconds"])
+        # Guards the loaded snapshot below against other threads sharing this instance
+        # (searches, writers, the maintenance thread); taken after the writer lock
+        self._state_lock = threading.RLock()
+
+        # The index snapshot named by CURRENT, and how much of the WAL has been applied on top
+        self._index: Optional[faiss.Index] = None
+        self._version = 0
+        # Compaction epoch: bumped whenever positions are renumbered
+        self._epoch = 0
+        self._current_signature: Optional[Tuple[int, int, int]] = None
+        self._checkpoint_ntotal = 0
+        self._wal_offset = 0
+
+        # A memory-mapped index can't grow, so WAL inserts go to a small in-memory delta
+        self._delta: Optional[faiss.Index] = None
+
+        # Metadata for WAL records a crashed writer never committed (read-only mode)
+        self._wal_metadata: Dict[int, Tuple[str, Dict[str, Any]]] = {}
 
-        # Initialize or load metadata
-        self._metadata = self._load_or_create_metadata()
+        # Float32 copies of quantized vectors for exact re-ranking, memory-mapped on demand
+        self._full_vectors: Optional[np.ndarray] = None
+        self._full_vectors_bytes = 0
 
-    def _load_or_create_index(self) -> faiss.IndexFlatIP:
+        # Inserts go to an append-only write-ahead log between checkpoints
+        self._wal = None
+        if read_only:
+            self._metadata = self._load_or_create_metadata()
+            self._sync(locked=False, report=True)
+        else:
+            with self._lock, self._state_lock:
+                self._metadata = self._load_or_create_metadata()
+                self._finish_compaction()
+                self._sync(locked=True, report=True)
+                # Rows whose vectors never reached the index or WAL would block their positions
+                self._metadata.delete_from_position(self._index.ntotal)
+                self._repair_full_precision()
+                self._wal = open(self.wal_path, 'ab')
+        self._last_checkpoint = time.monotonic()
+
+    def _read_current(self) -> Optional[Dict[str, Any]]:
         """
-        Load the FAISS index or create a new one if it doesn't exist.
+        Read the CURRENT pointer naming the latest index snapshot.
 
         Returns:
-            faiss.IndexFlatIP: The FAISS index
+            Optional[Dict[str, Any]]: index file, version, ntotal and tier, or None for
+            a store without versioned snapshots
         """
-        index_path = self.db_path / "index.faiss"
+        try:
+            with open(self.current_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            print(f"Error reading index pointer: {str(e)}. Using unversioned index.")
+            return None
+
+    def _stat_current(self) -> Optional[Tuple[int, int, int]]:
+        """Cheap change signature of the CURRENT pointer (replaced atomically, so the inode changes)."""
+        try:
+            stat = os.stat(self.current_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load_current(self, signature: Optional[Tuple[int, int, int]]) -> None:
+        """Switch to the index snapshot named by CURRENT and restart WAL replay from its start."""
+        pointer = self._read_current()
+        index_path = self.db_path / (pointer["index"] if pointer else "index.faiss")
+
+        # A caught-up writer already holds exactly the checkpointed vectors, so skip the re-read
+        caught_up = (not self.read_only and pointer is not None and self._index is not None and
+                     self._index.ntotal == pointer["ntotal"] and index_tier(self._index) == pointer["tier"] and
+                     index_quantization(self._index) == pointer.get("quantization") and
+                     self._epoch == pointer.get("epoch", 0))
+        if not caught_up:
+            self._index = self._load_or_create_index(index_path)
 
+        self._version = pointer["version"] if pointer else 0
+        self._epoch = pointer.get("epoch", 0) if pointer else 0
+        self._current_signature = signature
+        self._checkpoint_ntotal = self._index.ntotal
+        self._delta = None
+        self._wal_metadata = {}
+        self._wal_offset = 0
+
+    def _load_or_create_index(self, index_path: Path) -> faiss.Index:
+        """
+        Load the FAISS index or create a new one if it doesn't exist.
+
+        Args:
+            index_path: Index snapshot file
+
+        Returns:
+            faiss.Index: The FAISS index (flat, HNSW or IVF-PQ tier)
+        """
         if index_path.exists():
+            if self.read_only:
+                try:
+                    # Map the file instead of copying it, so processes share page cache
+                    index = faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                    apply_search_params(index)
+                    return index
+                except Exception as e:
+                    print(f"Could not memory-map index ({str(e)}), reading it into memory.")
             try:
                 index = faiss.read_index(str(index_path))
+                apply_search_params(index)
                 return index
             except Exception as e:
                 print(f"Error loading index: {str(e)}. Creating new index.")
 
         # Create a new index for inner product (cosine similarity with normalized vectors)
-        index = faiss.IndexFlatIP(self.vector_dim)
-        return index
+        quantization = VECTOR_CONFIG["quantization"]
+        if quantization and VECTOR_CONFIG["keep_full_precision"] and not self.read_only:
+            self.full_vectors_path.touch()
+        return build_index("flat", self.vector_dim, quantization=quantization)
+
+    def _maybe_promote(self) -> None:
+        """Migrate to an approximate index tier once the store passes its size threshold."""
+        current = index_tier(self._index)
+        target = target_tier(self._index.ntotal)
+        if INDEX_TIERS.index(target) <= INDEX_TIERS.index(current):
+            return
 
-    def _load_or_create_metadata(self) -> Dict[str, Dict[str, Any]]:
+        print(f"Promoting vector index from {current} to {target} ({self._index.ntotal} vectors)...")
+        self._index = build_index(target, self.vector_dim, self._stored_vectors(),
+                                  index_quantization(self._index))
+
+    def _stored_vectors(self) -> np.ndarray:
+        """All indexed vectors, from the full-precision copies when the store keeps them."""
+        ntotal = self._index.ntotal
+        full = self._full_precision_matrix()
+        if full is not None and len(full) >= ntotal:
+            return np.array(full[:ntotal])
+        if ntotal == 0:
+            return np.empty((0, self.vector_dim), dtype='float32')
+        return self._index.reconstruct_n(0, ntotal)
+
+    def requantize(self, quantization: Optional[str], keep_full_precision: bool = True) -> None:
+        """
+        Rebuild the index with a different scalar quantization and checkpoint it.
+
+        Args:
+            quantization: "fp16", "int8" or None for full-precision float32
+            keep_full_precision: Keep float32 copies in vectors.f32 to re-rank quantized hits
         """
-        Load metadata or create new metadata if it doesn't exist.
+        if self.read_only:
+            raise RuntimeError("Vector store was opened read-only")
+
+        with self._lock, self._state_lock:
+            self._sync(locked=True)
+            tier = index_tier(self._index)
+            if tier == "ivfpq":
+                print("IVF-PQ indexes are already product-quantized; leaving the index unchanged.")
+                return
+
+            if self._full_precision_matrix() is None and index_quantization(self._index):
+                print("Warning: no full-precision copies kept; re-encoding from quantized vectors.")
+            vectors = self._stored_vectors()
+
+            if quantization and keep_full_precision:
+                temp_path = self.full_vectors_path.with_suffix(".f32.tmp")
+                vectors.astype('float32').tofile(temp_path)
+                os.replace(temp_path, self.full_vectors_path)
+            elif self.full_vectors_path.exists():
+                self.full_vectors_path.unlink()
+            self._full_vectors, self._full_vectors_bytes = None, 0
+
+            self._index = build_index(tier, self.vector_dim, vectors, quantization)
+            self.checkpoint()
+
+    def _full_precision_rows(self) -> int:
+        """Number of complete rows in the full-precision file (0 if the store keeps none)."""
+        try:
+            return self.full_vectors_path.stat().st_size // (4 * self.vector_dim)
+        except FileNotFoundError:
+            return 0
+
+    def _append_full_precision(self, position: int, vectors: np.ndarray) -> None:
+        """Append vectors starting at a position to the full-precision file, if the store keeps one
+        (caller holds the writer lock)."""
+        if not self.full_vectors_path.exists() or self._full_precision_rows() != position:
+            # Not kept, or another writer already appended these rows
+            return
+        with open(self.full_vectors_path, 'ab') as f:
+            f.write(np.asarray(vectors, dtype='float32').tobytes())
+
+    def _repair_full_precision(self) -> None:
+        """Trim a torn row or rows past the index from the full-precision file after a crash."""
+        if not self.full_vectors_path.exists():
+            return
+        rows = min(self._full_precision_rows(), self._index.ntotal)
+        if self.full_vectors_path.stat().st_size != rows * 4 * self.vector_dim:
+            os.truncate(self.full_vectors_path, rows * 4 * self.vector_dim)
+        self._backfill_full_precision()
+
+    def _backfill_full_precision(self) -> None:
+        """
+        Append full-precision rows the index has but the file lacks (caller holds the writer lock).
+
+        Rows go missing when a writer crashes between its WAL and full-precision
+        appends. They are taken from the WAL, or reconstructed from the index for
+        positions already checkpointed.
+        """
+        if not self.full_vectors_path.exists():
+            return
+        rows = self._full_precision_rows()
+        if rows >= self._index.ntotal:
+            return
+
+        logged = {}
+        if self.wal_path.exists():
+            with open(self.wal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if record["position"] >= rows:
+                        logged[record["position"]] = np.frombuffer(base64.b64decode(record["vector"]),
+                                                                   dtype='float32')
+
+        vectors = []
+        for position in range(rows, self._index.ntotal):
+            if position in logged:
+                vectors.append(logged[position])
+                continue
+            try:
+                vectors.append(self._index.reconstruct(position))
+            except RuntimeError:
+                break  # the index can't reconstruct; rows stay missing and keep their quantized scores
+        if vectors:
+            self._append_full_precision(rows, np.vstack(vectors))
+
+    def _full_precision_matrix(self) -> Optional[np.ndarray]:
+        """Memory-mapped full-precision vectors, remapped when the file grows."""
+        try:
+            size = self.full_vectors_path.stat().st_size
+        except FileNotFoundError:
+            self._full_vectors, self._full_vectors_bytes = None, 0
+            return None
+
+        if size != self._full_vectors_bytes:
+            rows = size // (4 * self.vector_dim)
+            self._full_vectors = (np.memmap(self.full_vectors_path, dtype='float32', mode='r',
+                                            shape=(rows, self.vector_dim)) if rows else None)
+            self._full_vectors_bytes = size
+        return self._full_vectors
+
+    def _rerank(self, query_vectors: np.ndarray, scores: np.ndarray, indices: np.ndarray,
+                top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Re-score quantized candidates exactly from the full-precision vectors and keep the top_k."""
+        full = self._full_precision_matrix()
+        if full is None:
+            return scores[:, :top_k], indices[:, :top_k]
+
+        # Candidates without a full-precision row (e.g. just inserted by another writer) keep their score
+        exact_rows = (indices != -1) & (indices < len(full))
+        candidates = full[np.where(exact_rows, indices, 0)]
+        exact = np.einsum('nd,nkd->nk', query_vectors, candidates).astype('float32')
+        scores = np.where(exact_rows, exact, scores)
+        scores[indices == -1] = -np.inf
+
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+        return np.take_along_axis(scores, order, axis=1), np.take_along_axis(indices, order, axis=1)
+
+    def _load_or_create_metadata(self) -> MetadataStore:
+        """
+        Open the SQLite metadata, migrating a legacy metadata.json store on first use.
 
         Returns:
-            Dict[str, Dict[str, Any]]: Dictionary mapping vector IDs to metadata
+            MetadataStore: Metadata keyed by vector ID and FAISS position
         """
-        if self.metadata_path.exists():
+        legacy_path = self.db_path / "metadata.json"
+
+        if self.read_only:
+            if self.metadata_path.exists():
+                return MetadataStore(self.metadata_path, read_only=True,
+                                     busy_timeout=VECTOR_CONFIG["lock_timeout_seconds"])
+            # Nothing written yet (or not migrated); an empty in-memory store keeps lookups working
+            return MetadataStore(Path(":memory:"))
+
+        metadata = MetadataStore(self.metadata_path, busy_timeout=VECTOR_CONFIG["lock_timeout_seconds"])
+        if legacy_path.exists() and metadata.count() == 0:
             try:
-                with open(self.metadata_path, 'r') as f:
-                    return json.load(f)
+                migrated = migrate_json_metadata(legacy_path, metadata)
+                print(f"Migrated {migrated} vector metadata entries from metadata.json to SQLite.")
             except Exception as e:
-                print(f"Error loading metadata: {str(e)}. Creating new metadata.")
+                print(f"Error migrating metadata: {str(e)}. Starting with empty metadata.")
 
-        return {}
+        return metadata
 
     def store(self, vector: np.ndarray, metadata: Dict[str, Any] = None) -> str:
         """
@@ -79,74 +559,216 @@ class VectorStore:
         Returns:
             str: The ID of the stored vector
         """
-        # Generate a unique ID
-        vector_id = str(uuid.uuid4())
+        return self.store_batch(np.asarray(vector).reshape(1, -1), [metadata])[0]
 
-        # Ensure vector is a numpy array with the right shape
-        vector = np.array(vector).astype('float32').reshape(1, -1)
+    def store_batch(self, vectors: np.ndarray, metadata: Optional[List[Dict[str, Any]]] = None,
+                    vector_ids: Optional[List[str]] = None) -> List[str]:
+        """
+        Store many vectors in one write: one lock, one index add, one WAL append
+        and one metadata transaction.
 
-        # Add to the index
-        self._index.add(vector)
+        Args:
+            vectors: Matrix of shape (n, d)
+            metadata: Optional metadata per vector
+            vector_ids: Optional IDs to keep (e.g. when re-embedding a store), generated otherwise
 
-        # Store metadata
-        if metadata is None:
-            metadata = {}
+        Returns:
+            List[str]: The IDs of the stored vectors, in input order
+        """
+        if self.read_only:
+            raise RuntimeError("Vector store was opened read-only")
 
-        # Get the index of the added vector
-        vector_index = self._index.ntotal - 1
+        vectors = np.ascontiguousarray(np.asarray(vectors, dtype='float32').reshape(-1, self.vector_dim))
+        if not len(vectors):
+            return []
 
-        # Store metadata with both ID and index for retrieval
-        self._metadata[vector_id] = {
-            **metadata,
-            "_index": vector_index,
-        }
+        # Generate unique IDs
+        vector_ids = list(vector_ids or (str(uuid.uuid4()) for _ in range(len(vectors))))
 
-        # Save the index and metadata
-        self._save()
+        created_at = datetime.now().isoformat()
+        metadata = [{"created_at": created_at, **(entry or {})}
+                    for entry in (metadata or [None] * len(vectors))]
 
-        return vector_id
+        with self._lock, self._state_lock:
+            # Apply other writers' inserts first so positions stay consistent across processes
+            self._sync(locked=True)
 
-    def search(self, query_vector: np.ndarray, top_k: int = 5) -> List[Tuple[str, float, Dict[str, Any]]]:
+            # Add to the index; the new vectors take the next consecutive positions
+            first_position = self._index.ntotal
+            self._index.add(vectors)
+            positions = range(first_position, first_position + len(vectors))
+
+            # Log the inserts first, then commit their metadata rows keyed by ID and position;
+            # the full index is only rewritten at checkpoints
+            self._append_wal(list(zip(vector_ids, positions, vectors, metadata)))
+            self._append_full_precision(first_position, vectors)
+            self._metadata.insert_many(zip(vector_ids, positions, metadata))
+            self._maybe_checkpoint()
+
+        return vector_ids
+
+    def search(self, query_vector: np.ndarray, top_k: int = 5,
+               filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
         """
         Search for similar vectors.
 
         Args:
             query_vector: The query vector
             top_k: Number of results to return
+            filters: Optional metadata filters, e.g. {"question_id": "stay_experience"},
+                {"type": "conversation", "destination": "Paris"} or
+                {"created_after": "2025-01-01"}; values may be lists of allowed values
 
         Returns:
             List[Tuple[str, float, Dict[str, Any]]]: List of (id, similarity, metadata) tuples
         """
-        # Ensure query vector is a numpy array with the right shape
-        query_vector = np.array(query_vector).astype('float32').reshape(1, -1)
+        ids, scores, metadata = self.search_batch(query_vector, top_k, filters)
+        return [
+            (vector_id, float(score), metadata[vector_id])
+            for vector_id, score in zip(ids[0], scores[0])
+            if vector_id is not None
+        ]
 
-        # Search in the index
-        scores, indices = self._index.search(query_vector, top_k)
+    def search_batch(self, query_vectors: np.ndarray, top_k: int = 5,
+                     filters: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, Dict[str, Any]]]:
+        """
+        Search for similar vectors for many queries in one FAISS call.
 
-        # Get the metadata for the search results
-        results = []
+        Args:
+            query_vectors: Query matrix of shape (n, d), or a single vector
+            top_k: Number of results per query
+            filters: Optional metadata filters (see search)
 
-        for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            # Skip if no valid index
-            if idx == -1:
-                continue
+        Returns:
+            Tuple[np.ndarray, np.ndarray, Dict[str, Dict[str, Any]]]: Vector IDs (object array
+            of shape (n, top_k), None where there is no hit), similarities (float32, same
+            shape, -inf where there is no hit) and metadata keyed by the returned IDs
+        """
+        # Ensure queries are a float32 matrix with one row per query
+        query_vectors = np.asarray(query_vectors, dtype='float32').reshape(-1, self.vector_dim)
+        ids = np.full((len(query_vectors), top_k), None, dtype=object)
 
-            # Find the vector ID with this index
-            vector_id = None
-            for vid, meta in self._metadata.items():
-                if meta.get("_index") == idx:
-                    vector_id = vid
-                    break
+        deadline = time.monotonic() + VECTOR_CONFIG["lock_timeout_seconds"]
+        while True:
+            snapshot = self._search_snapshot(query_vectors, top_k, filters)
+            if snapshot is not None:
+                break
+            # A compaction renumbered positions after our snapshot; wait for its pointer swap
+            if time.monotonic() >= deadline:
+                raise TimeoutError("Vector store compaction did not finish")
+            time.sleep(0.01)
+
+        scores, indices, unique_positions, hits = snapshot
+        valid = indices != -1
+        id_table = np.array([hits.get(position, (None,))[0] for position in unique_positions.tolist()],
+                            dtype=object)
+
+        # Scatter IDs back to (query, rank) slots; unresolved positions stay None
+        ids[valid] = id_table[np.searchsorted(unique_positions, indices[valid])]
+        scores[np.equal(ids, None)] = -np.inf
+
+        metadata = {vector_id: meta for vector_id, meta in hits.values()}
+        return ids, scores, metadata
+
+    def _search_snapshot(self, query_vectors: np.ndarray, top_k: int, filters: Optional[Dict[str, Any]]):
+        """
+        Search the current snapshot and resolve its hits.
+
+        Returns:
+            Optional[Tuple]: (scores, positions, distinct hit positions, hits), or None if a
+            compaction renumbered positions since the snapshot was loaded
+        """
+        # Other threads' catch-up, inserts and compactions swap or grow the index, so hold
+        # the snapshot still while searching it
+        with self._state_lock:
+            # Pick up checkpoints and inserts from other processes (two stats when nothing changed)
+            self._sync()
+            index, delta, checkpoint_ntotal = self._index, self._delta, self._checkpoint_ntotal
+            epoch, wal_metadata = self._epoch, dict(self._wal_metadata)
+
+            # Resolve filters to positions so the ANN search only visits matching vectors;
+            # otherwise skip tombstoned vectors
+            positions, excluded = None, None
+            if filters:
+                positions = self._filter_positions(filters, wal_metadata)
+                if len(positions) == 0:
+                    empty = np.full((len(query_vectors), top_k), -1, dtype='int64')
+                    return np.full(empty.shape, -np.inf, dtype='float32'), empty, empty[:0, 0], {}
+            else:
+                excluded = self._metadata.deleted_positions()
+
+            # Quantized indexes fetch extra candidates and re-rank them at full precision
+            rerank = index_quantization(index) is not None and self.full_vectors_path.exists()
+            fetch_k = top_k * VECTOR_CONFIG["rerank_factor"] if rerank else top_k
+
+            # Search in the index
+            scores, indices = self._search_index(index, delta, checkpoint_ntotal, query_vectors, fetch_k,
+                                                 positions, excluded)
+            if rerank:
+                scores, indices = self._rerank(query_vectors, scores, indices, top_k)
+        scores = np.array(scores, dtype='float32')
+
+        # Fetch ID and metadata for the distinct hits in one keyed query
+        unique_positions = np.unique(indices[indices != -1])
+        hits = self._resolve_positions(unique_positions.tolist(), epoch, wal_metadata)
+        if hits is None:
+            return None
+        return scores, indices, unique_positions, hits
+
+    def _resolve_positions(self, positions: List[int], epoch: int,
+                           wal_metadata: Dict[int, Tuple[str, Dict[str, Any]]]) -> Optional[Dict[int, Tuple[str, Dict[str, Any]]]]:
+        """Bulk-resolve FAISS positions of the snapshot at epoch to (vector ID, metadata); None if the epoch changed."""
+        hits = self._metadata.get_by_positions(positions, epoch=epoch)
+        if hits is None:
+            return None
+        for position in positions:
+            if position not in hits and position in wal_metadata:
+                hits[position] = wal_metadata[position]
+        return hits
 
-            if vector_id is not None:
-                # Clone metadata dict and remove internal fields
-                metadata = self._metadata[vector_id].copy()
-                if "_index" in metadata:
-                    del metadata["_index"]
+    def _filter_positions(self, filters: Dict[str, Any],
+                          wal_metadata: Dict[int, Tuple[str, Dict[str, Any]]]) -> np.ndarray:
+        """Positions whose metadata passes the filters, including uncommitted WAL records."""
+        positions = self._metadata.positions_matching(filters)
+        overlay = [position for position, (_, metadata) in wal_metadata.items()
+                   if matches_filters(metadata, filters)]
+        if overlay:
+            positions = np.union1d(positions, np.asarray(overlay, dtype='int64'))
+        return positions
 
-                results.append((vector_id, float(score), metadata))
+    @staticmethod
+    def _search_index(index: faiss.Index, delta: Optional[faiss.Index], checkpoint_ntotal: int,
+                      query_vectors: np.ndarray, top_k: int, positions: Optional[np.ndarray] = None,
+                      excluded: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Search a snapshot (restricted to positions, or skipping excluded ones), merging in its read-only WAL delta."""
+        if excluded is None:
+            excluded = np.empty(0, dtype='int64')
+        if positions is None:
+            scores, indices = search_excluding(index, query_vectors, top_k,
+                                               excluded[excluded < index.ntotal])
+        else:
+            scores, indices = search_subset(index, query_vectors, top_k,
+                                            positions[positions < index.ntotal])
+        if delta is None or delta.ntotal == 0:
+            return scores, indices
 
-        return results
+        if positions is None:
+            delta_excluded = excluded[excluded >= checkpoint_ntotal] - checkpoint_ntotal
+            delta_scores, delta_indices = search_excluding(delta, query_vectors, top_k, delta_excluded)
+        else:
+            delta_positions = positions[positions >= checkpoint_ntotal] - checkpoint_ntotal
+            delta_scores, delta_indices = search_subset(delta, query_vectors, top_k, delta_positions)
+        delta_indices = np.where(delta_indices == -1, -1, delta_indices + checkpoint_ntotal)
+
+        scores = np.concatenate([scores, delta_scores], axis=1)
+        indices = np.concatenate([indices, delta_indices], axis=1)
+        scores[indices == -1] = -np.inf
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+        return np.take_along_axis(scores, order, axis=1), np.take_along_axis(indices, order, axis=1)
+
+    def _ntotal(self) -> int:
+        """Total vectors, including the read-only WAL delta."""
+        return self._index.ntotal + (self._delta.ntotal if self._delta is not None else 0)
 
     def get(self, vector_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -158,53 +780,493 @@ class VectorStore:
         Returns:
             Optional[Dict[str, Any]]: The metadata or None if not found
         """
-        if vector_id in self._metadata:
-            # Clone metadata dict and remove internal fields
-            metadata = self._metadata[vector_id].copy()
-            if "_index" in metadata:
-                del metadata["_index"]
+        metadata = self._metadata.get(vector_id)
+        if metadata is None:
+            for wal_id, wal_metadata in self._wal_metadata.values():
+                if wal_id == vector_id:
+                    return dict(wal_metadata)
+        return metadata
+
+    def get_many(self, vector_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metadata for many vectors in one lookup.
+
+        Args:
+            vector_ids: The IDs of the vectors
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Metadata for the IDs that exist
+        """
+        return self._metadata.get_many(list(vector_ids))
+
+    def _append_wal(self, entries: List[Tuple[str, int, np.ndarray, Dict[str, Any]]]) -> None:
+        """Append insert records to the write-ahead log in one write (caller holds the writer lock)."""
+        records = b"".join(
+            (json.dumps({
+                "id": vector_id,
+                "position": position,
+                # The snapshot this record follows, so replay can tell log generations apart
+                "version": self._version,
+                "vector": base64.b64encode(vector.astype('float32').tobytes()).decode('ascii'),
+                "metadata": metadata,
+            }, default=str) + "\n").encode('utf-8')
+            for vector_id, position, vector, metadata in entries
+        )
+        self._wal.write(records)
+        self._wal.flush()
+        if VECTOR_CONFIG["wal_fsync"]:
+            os.fsync(self._wal.fileno())
+        # Appends land at the shared end of file, so take the size rather than our own offset
+        self._wal_offset = os.fstat(self._wal.fileno()).st_size
+
+    def _sync(self, locked: bool = False, report: bool = False) -> None:
+        """
+        Catch up with other processes: switch to a newer checkpoint and apply new WAL records.
+
+        Args:
+            locked: The caller holds the writer lock, so a torn WAL tail is a crashed
+                writer's and can be truncated
+            report: Print how many vectors were recovered
+        """
+        with self._state_lock:
+            signature = self._stat_current()
+            if (self._index is None or signature != self._current_signature or
+                    (locked and self._missed_checkpoint())):
+                self._load_current(signature)
+
+            try:
+                wal_size = self.wal_path.stat().st_size
+            except FileNotFoundError:
+                wal_size = 0
+            if wal_size < self._wal_offset:
+                # Truncated by a checkpoint, whose CURRENT swap happened first
+                self._load_current(self._stat_current())
+            if wal_size > self._wal_offset:
+                if not self._replay_wal(truncate=locked and not self.read_only, report=report):
+                    # The WAL restarted after a checkpoint we didn't notice: reload it and replay again
+                    self._load_current(self._stat_current())
+                    self._replay_wal(truncate=locked and not self.read_only, report=report)
+
+            # A checkpoint may have swapped CURRENT and truncated the WAL while we read it
+            signature = self._stat_current()
+            if signature != self._current_signature:
+                self._load_current(signature)
+                self._replay_wal(truncate=locked and not self.read_only, report=report)
+
+            if locked and not self.read_only:
+                self._backfill_full_precision()
+
+    def _missed_checkpoint(self) -> bool:
+        """
+        Whether CURRENT names a different snapshot than the loaded one, by content.
+
+        The stat signature can repeat (a reused inode with the same size and
+        mtime on a filesystem with coarse timestamps), so writers check this
+        before appending.
+        """
+        pointer = self._read_current()
+        if pointer is None:
+            return self._version != 0
+        return (pointer["version"], pointer.get("epoch", 0)) != (self._version, self._epoch)
+
+    def _replay_wal(self, truncate: bool = False, report: bool = False) -> bool:
+        """
+        Apply WAL records past the current offset (crash recovery and cross-process catch-up).
+
+        Args:
+            truncate: Drop a torn tail left by a crashed writer
+            report: Print how many vectors were recovered
+
+        Returns:
+            bool: False if the records skip positions (the WAL restarted after a newer checkpoint)
+        """
+        if not self.wal_path.exists():
+            return True
+
+        replayed = 0
+        valid_bytes = self._wal_offset
+        missing_rows = []
+        gap = False
+        with open(self.wal_path, 'rb') as f:
+            f.seek(self._wal_offset)
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash (or a write still in progress);
+                    # everything before it is intact
+                    break
+
+                version = record.get("version", self._version)
+                if version < self._version:
+                    # Logged before our snapshot, whose checkpoint hasn't truncated the log yet
+                    # (or crashed before it could); these vectors are in the snapshot already.
+                    # Don't move the offset past them: the log restarts from the top.
+                    break
+
+                position = record["position"]
+                if version > self._version or position > self._ntotal():
+                    # Gap: the log was truncated under us and restarted from a newer checkpoint
+                    gap = True
+                    break
+                valid_bytes += len(line)
+
+                # Positions below ntotal are already in the checkpoint (or were applied earlier)
+                if position == self._ntotal():
+                    vector = np.frombuffer(base64.b64decode(record["vector"]), dtype='float32').reshape(1, -1)
+                    if self.read_only:
+                        if self._delta is None:
+                            self._delta = faiss.IndexFlatIP(self.vector_dim)
+                        self._delta.add(vector)
+                    else:
+                        # Full-precision rows are written under the writer lock only (see _sync)
+                        self._index.add(vector)
+                    replayed += 1
 
-            return metadata
+                missing_rows.append((record["id"], position, record["metadata"]))
 
-        return None
+        self._wal_offset = valid_bytes
 
-    def _save(self) -> None:
-        """Save the index and metadata to disk."""
-        # Save the index
-        index_path = self.db_path / "index.faiss"
-        faiss.write_index(self._index, str(index_path))
+        if missing_rows:
+            if self.read_only:
+                # Metadata rows are normally committed; keep any the writer lost in memory
+                known = self._metadata.get_by_positions([row[1] for row in missing_rows])
+                for vector_id, position, metadata in missing_rows:
+                    if position not in known:
+                        self._wal_metadata[position] = (vector_id, metadata)
+            else:
+                self._metadata.insert_many(missing_rows)
 
-        # Save the metadata
-        with open(self.metadata_path, 'w') as f:
-            json.dump(self._metadata, f)
+        # Drop any torn tail (or a crashed checkpoint's stale records) so new appends start on a
+        # clean record boundary; never after a gap: the records past it are valid, only newer
+        # than our snapshot
+        if truncate and not gap and valid_bytes < self.wal_path.stat().st_size:
+            with open(self.wal_path, 'r+b') as f:
+                f.truncate(valid_bytes)
 
+        if replayed and report:
+            print(f"Recovered {replayed} vectors from write-ahead log.")
+        return not gap
 
-# Singleton instance
+    def _maybe_checkpoint(self) -> None:
+        """Checkpoint when the WAL passes its size or age threshold."""
+        wal_age = time.monotonic() - self._last_checkpoint
+
+        if (self._wal_offset >= VECTOR_CONFIG["wal_checkpoint_bytes"] or
+                wal_age >= VECTOR_CONFIG["wal_checkpoint_seconds"]):
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """
+        Write a new index snapshot, swap the CURRENT pointer to it, then truncate the WAL
+        (metadata is already in SQLite). Readers keep searching their old snapshot until
+        they notice the swap.
+        """
+        if self.read_only:
+            raise RuntimeError("Vector store was opened read-only")
+
+        with self._lock, self._state_lock:
+            self._sync(locked=True)
+            self._maybe_promote()
+
+            version = self._version + 1
+            index_name = f"index.{version:06d}.faiss"
+            temp_index_path = self.db_path / f"{index_name}.tmp"
+            faiss.write_index(self._index, str(temp_index_path))
+            os.replace(temp_index_path, self.db_path / index_name)
+
+            self._write_current(self._pointer(self._index, index_name, version, self._epoch))
+
+            self._version = version
+            self._current_signature = self._stat_current()
+            self._checkpoint_ntotal = self._index.ntotal
+
+            # Checkpoint is durable, so the logged inserts are no longer needed
+            os.truncate(self.wal_path, 0)
+            self._wal_offset = 0
+            self._last_checkpoint = time.monotonic()
+
+            self._prune_snapshots()
+
+    def _pointer(self, index: faiss.Index, index_name: str, version: int, epoch: int) -> Dict[str, Any]:
+        """Build the CURRENT pointer for an index snapshot."""
+        return {"index": index_name, "version": version, "ntotal": index.ntotal, "tier": index_tier(index),
+                "quantization": index_quantization(index), "epoch": epoch}
+
+    def _write_current(self, pointer: Dict[str, Any]) -> None:
+        """Atomically swap the CURRENT pointer."""
+        temp_current_path = self.current_path.with_suffix(".tmp")
+        with open(temp_current_path, 'w', encoding='utf-8') as f:
+            json.dump(pointer, f)
+        os.replace(temp_current_path, self.current_path)
+
+    def delete(self, vector_ids: List[str]) -> int:
+        """
+        Delete vectors by ID. They are tombstoned at once and removed from the index at compaction.
+
+        Args:
+            vector_ids: IDs of the vectors to delete
+
+        Returns:
+            int: Number of vectors deleted
+        """
+        if self.read_only:
+            raise RuntimeError("Vector store was opened read-only")
+        with self._lock:
+            return self._metadata.mark_deleted(vector_ids=list(vector_ids))
+
+    def delete_where(self, filters: Dict[str, Any]) -> int:
+        """
+        Delete vectors whose metadata passes the filters, e.g. {"session_id": "..."} or
+        {"created_before": "2025-01-01"}.
+
+        Args:
+            filters: Metadata filters (see search)
+
+        Returns:
+            int: Number of vectors deleted
+        """
+        if self.read_only:
+            raise RuntimeError("Vector store was opened read-only")
+        if not filters:
+            raise ValueError("delete_where needs at least one filter")
+        with self._lock:
+            return self._metadata.mark_deleted(filters=filters)
+
+    def apply_retention(self) -> int:
+        """
+        Delete vectors older than the retention period in VECTOR_CONFIG["retention"].
+
+        Returns:
+            int: Number of vectors deleted
+        """
+        max_age_days = VECTOR_CONFIG["retention"]["max_age_days"]
+        if not max_age_days:
+            return 0
+        cutoff = datetime.now() - timedelta(days=max_age_days)
+        return self.delete_where({"created_before": cutoff})
+
+    def needs_compaction(self) -> bool:
+        """Check whether enough vectors are tombstoned to be worth rebuilding the index."""
+        retention = VECTOR_CONFIG["retention"]
+        deleted = len(self._metadata.deleted_positions())
+        return (deleted > 0 and deleted >= retention["compact_min_deleted"] and
+                deleted >= retention["compact_deleted_fraction"] * self._index.ntotal)
+
+    def compact(self) -> int:
+        """
+        Rebuild the index without tombstoned vectors and renumber the remaining positions.
+
+        The new snapshot (and full-precision file) is written first, then the metadata is
+        renumbered under a new epoch in one transaction, then CURRENT is swapped; a crash
+        in between is rolled forward the next time a writer opens the store.
+
+        Returns:
+            int: Number of vectors removed
+        """
+        if self.read_only:
+            raise RuntimeError("Vector store was opened read-only")
+
+        with self._lock, self._state_lock:
+            self._sync(locked=True)
+            deleted = self._metadata.deleted_positions()
+            deleted = deleted[deleted < self._index.ntotal]
+            if len(deleted) == 0:
+                return 0
+
+            kept = np.setdiff1d(np.arange(self._index.ntotal, dtype='int64'), deleted)
+            vectors = self._stored_vectors()[kept]
+            index = build_index(target_tier(len(kept)), self.vector_dim, vectors, index_quantization(self._index))
+
+            version, epoch = self._version + 1, self._epoch + 1
+            index_name = f"index.{version:06d}.faiss"
+            temp_index_path = self.db_path / f"{index_name}.tmp"
+            faiss.write_index(index, str(temp_index_path))
+            os.replace(temp_index_path, self.db_path / index_name)
+
+            compacted_full_path = self.full_vectors_path.with_suffix(".f32.compact")
+            keep_full_precision = self.full_vectors_path.exists()
+            if keep_full_precision:
+                temp_full_path = self.full_vectors_path.with_suffix(".f32.tmp")
+                vectors.astype('float32').tofile(temp_full_path)
+                os.replace(temp_full_path, compacted_full_path)
+
+            # Point of no return: positions now refer to the compacted index
+            self._metadata.compact(kept, epoch, index_name)
+            os.truncate(self.wal_path, 0)
+            self._write_current(self._pointer(index, index_name, version, epoch))
+            if keep_full_precision:
+                os.replace(compacted_full_path, self.full_vectors_path)
+
+            self._index = index
+            self._version, self._epoch = version, epoch
+            self._current_signature = self._stat_current()
+            self._checkpoint_ntotal = index.ntotal
+            self._wal_offset = 0
+            self._full_vectors, self._full_vectors_bytes = None, 0
+            self._last_checkpoint = time.monotonic()
+            self._prune_snapshots()
+
+        print(f"Compacted vector store: removed {len(deleted)} deleted vectors, {len(kept)} remain.")
+        return len(deleted)
+
+    def _finish_compaction(self) -> None:
+        """Roll forward a compaction that crashed after renumbering metadata (caller holds the writer lock)."""
+        compacted_index = self._metadata.state("compacted_index")
+        compacted_full_path = self.full_vectors_path.with_suffix(".f32.compact")
+        pointer = self._read_current()
+        epoch = self._metadata.epoch()
+
+        if compacted_index and epoch > (pointer or {}).get("epoch", 0):
+            index_path = self.db_path / compacted_index
+            if not index_path.exists():
+                print(f"Error: compacted index {compacted_index} is missing; vector search results may be wrong.")
+                return
+            print("Finishing interrupted vector store compaction...")
+            if self.wal_path.exists():
+                # Logged inserts use pre-compaction positions and are already in the snapshot
+                os.truncate(self.wal_path, 0)
+            index = faiss.read_index(str(index_path))
+            pointer = self._pointer(index, compacted_index, int(compacted_index.split(".")[1]), epoch)
+            self._write_current(pointer)
+
+        if compacted_full_path.exists():
+            if pointer is not None and pointer["index"] == compacted_index:
+                os.replace(compacted_full_path, self.full_vectors_path)
+            else:
+                # The compaction never committed
+                compacted_full_path.unlink()
+
+    def maintain(self) -> None:
+        """Apply the retention policy and compact if enough vectors are tombstoned (under the writer lock)."""
+        with self._lock:
+            deleted = self.apply_retention()
+            if deleted:
+                print(f"Retention: deleted {deleted} expired vectors.")
+            if self.needs_compaction():
+                self.compact()
+
+    def index_file(self) -> Optional[Path]:
+        """
+        Get the index snapshot this store was loaded from.
+
+        Returns:
+            Optional[Path]: Path to the snapshot file, or None if nothing was checkpointed yet
+        """
+        pointer = self._read_current()
+        index_path = self.db_path / (pointer["index"] if pointer else "index.faiss")
+        return index_path if index_path.exists() else None
+
+    def _prune_snapshots(self) -> None:
+        """Delete index snapshots older than the configured number of versions."""
+        keep_from = self._version - VECTOR_CONFIG["index_versions_kept"] + 1
+        for path in self.db_path.glob("index*.faiss"):
+            name = path.name.split(".")
+            version = int(name[1]) if len(name) == 3 and name[1].isdigit() else 0
+            if version < keep_from:
+                # Readers that still map an old snapshot keep it alive until they reload
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        """Checkpoint pending inserts and close the WAL (clean shutdown)."""
+        if self._wal is None or self._wal.closed:
+            return
+        with self._lock, self._state_lock:
+            self._sync(locked=True)
+            if self._wal_offset > 0:
+                self.checkpoint()
+        self._wal.close()
+        self._metadata.close()
+
+# Singleton instances
 _store = None
+_read_only_store = None
 
 
-def get_vector_store() -> VectorStore:
+def get_vector_store(read_only: bool = False) -> VectorStore:
     """
     Get the vector store instance.
 
+    Args:
+        read_only: Get the memory-mapped, lazily loaded read-mostly store instead,
+            for short-lived processes and parallel workers that only search
+
     Returns:
         VectorStore: The vector store
     """
-    global _store
+    global _store, _read_only_store
+
+    if read_only:
+        if _read_only_store is None:
+            _read_only_store = VectorStore(read_only=True)
+        return _read_only_store
 
     if _store is None:
         _store = VectorStore()
+        atexit.register(_store.close)
+        if VECTOR_CONFIG["retention"]["compaction_interval_seconds"]:
+            start_background_maintenance(_store)
 
     return _store
 
 
-def store_vector(question_id: str, vector: np.ndarray) -> str:
+def start_background_maintenance(store: Optional[VectorStore] = None,
+                                 interval: Optional[float] = None) -> threading.Thread:
+    """
+    Periodically apply retention and compact the store on a daemon thread.
+
+    Maintenance runs on the given store instance under its writer lock, so no
+    second copy of the index is loaded. Of the processes sharing the store, only
+    the one holding maintenance.lock does the work; the others check each
+    interval and take over when that process exits.
+
+    Args:
+        store: Store to maintain, defaults to get_vector_store()
+        interval: Seconds between runs, defaults to VECTOR_CONFIG["retention"]
+
+    Returns:
+        threading.Thread: The started thread
+    """
+    store = store or get_vector_store()
+    interval = interval or VECTOR_CONFIG["retention"]["compaction_interval_seconds"]
+    # Held for the rest of the process's life once taken (timeout 0: never wait for it)
+    maintenance_lock = FileLock(store.db_path / "maintenance.lock", timeout=0)
+
+    def run():
+        maintainer = False
+        while True:
+            time.sleep(interval)
+            if not maintainer:
+                try:
+                    maintenance_lock.acquire()
+                    maintainer = True
+                except TimeoutError:
+                    continue  # another process maintains this store
+            try:
+                store.maintain()
+            except Exception as e:
+                print(f"Warning: vector store maintenance failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name="vector-store-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+
+def store_vector(question_id: str, vector: np.ndarray, session_id: Optional[str] = None,
+                 metadata: Optional[Dict[str, Any]] = None) -> str:
     """
     Store a vector with question ID as metadata.
 
     Args:
-        question_id: The ID of the question
+        question_id: The ID of the question ("conversation" for a whole-interview vector)
         vector: The vector to store
+        session_id: Optional interview session the answer belongs to
+        metadata: Optional extra metadata (e.g. destination, session_dir)
 
     Returns:
         str: The ID of the stored vector
@@ -212,24 +1274,102 @@ def store_vector(question_id: str, vector: np.ndarray) -> str:
     store = get_vector_store()
 
     metadata = {
+        **(metadata or {}),
         "question_id": question_id,
-        "timestamp": str(uuid.uuid1()),  # Includes timestamp
+        "created_at": datetime.now().isoformat(),
     }
+    if session_id:
+        metadata["session_id"] = session_id
 
     vector_id = store.store(vector, metadata)
     return vector_id
 
 
-def search_vectors(query_vector: np.ndarray, top_k: int = 5) -> List[Tuple[str, float, Dict[str, Any]]]:
+def store_vectors(question_ids: List[str], vectors: np.ndarray, session_id: Optional[str] = None,
+                  metadata: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[str]:
+    """
+    Store many vectors in one bulk write, with question IDs as metadata.
+
+    Args:
+        question_ids: Question ID per vector ("conversation" for a whole-interview vector)
+        vectors: Matrix of shape (n, d)
+        session_id: Optional interview session the vectors belong to
+        metadata: Optional extra metadata per vector
+
+    Returns:
+        List[str]: The IDs of the stored vectors, in input order
+    """
+    store = get_vector_store()
+
+    created_at = datetime.now().isoformat()
+    entries = []
+    for question_id, extra in zip(question_ids, metadata or [None] * len(question_ids)):
+        entry = {**(extra or {}), "question_id": question_id, "created_at": created_at}
+        if session_id:
+            entry["session_id"] = session_id
+        entries.append(entry)
+
+    return store.store_batch(vectors, entries)
+
+
+def search_vectors(query_vector: np.ndarray, top_k: int = 5,
+                   filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
     """
     Search for similar vectors.
 
     Args:
         query_vector: The query vector
         top_k: Number of results to return
+        filters: Optional metadata filters (see VectorStore.search)
 
     Returns:
         List[Tuple[str, float, Dict[str, Any]]]: List of (id, similarity, metadata) tuples
     """
     store = get_vector_store()
-    return store.search(query_vector, top_k)
+    return store.search(query_vector, top_k, filters)
+
+
+def search_vectors_batch(query_vectors: np.ndarray, top_k: int = 5,
+                         filters: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, Dict[str, Any]]]:
+    """
+    Search for similar vectors for many queries at once.
+
+    Args:
+        query_vectors: Query matrix of shape (n, d)
+        top_k: Number of results per query
+        filters: Optional metadata filters (see VectorStore.search)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, Dict[str, Dict[str, Any]]]: (ids, similarities, metadata by ID),
+        see VectorStore.search_batch
+    """
+    store = get_vector_store()
+    return store.search_batch(query_vectors, top_k, filters)
+
+
+def delete_vectors(vector_ids: List[str]) -> int:
+    """
+    Delete vectors by ID.
+
+    Args:
+        vector_ids: IDs of the vectors to delete
+
+    Returns:
+        int: Number of vectors deleted
+    """
+    store = get_vector_store()
+    return store.delete(vector_ids)
+
+
+def delete_vectors_where(filters: Dict[str, Any]) -> int:
+    """
+    Delete vectors matching metadata filters, e.g. {"session_id": "..."}.
+
+    Args:
+        filters: Metadata filters (see VectorStore.search)
+
+    Returns:
+        int: Number of vectors deleted
+    """
+    store = get_vector_store()
+    return store.delete_where(filters)